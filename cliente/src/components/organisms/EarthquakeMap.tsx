@@ -2,9 +2,10 @@
 
 import type React from "react"
 import { useEffect, useState } from "react"
-import { MapContainer, TileLayer, Marker, Popup } from "react-leaflet"
+import { MapContainer, TileLayer, Marker, Popup, CircleMarker, Tooltip, useMapEvents } from "react-leaflet"
 import L from "leaflet"
 import axios from "axios"
+import { decodeColumns, type Earthquake, type EarthquakeColumns } from "../../utils/columns"
 
 // Fix for default markers in react-leaflet
 delete (L.Icon.Default.prototype as any)._getIconUrl
@@ -14,14 +15,28 @@ L.Icon.Default.mergeOptions({
   shadowUrl: "https://cdnjs.cloudflare.com/ajax/libs/leaflet/1.7.1/images/marker-shadow.png",
 })
 
-interface Earthquake {
-  id: string
-  place: string
-  magnitude: number
-  depth: number
+interface Cluster {
   latitude: number
   longitude: number
-  event_time: string
+  count: number
+  max_magnitude: number
+}
+
+interface MapView {
+  zoom: number
+  bbox: string
+}
+
+// Below this zoom the server aggregates events into grid cells
+const CLUSTER_MAX_ZOOM = 6
+// Delay before reopening a stream the server closed
+const STREAM_RETRY_MS = 5000
+
+function MapViewTracker({ onChange }: { onChange: (view: MapView) => void }) {
+  const map = useMapEvents({
+    moveend: () => onChange({ zoom: map.getZoom(), bbox: map.getBounds().toBBoxString() }),
+  })
+  return null
 }
 
 interface MapFilters {
@@ -32,6 +47,10 @@ interface MapFilters {
 
 export default function EarthquakeMap() {
   const [earthquakes, setEarthquakes] = useState<Earthquake[]>([])
+  const [clusters, setClusters] = useState<Cluster[]>([])
+  const [totalEvents, setTotalEvents] = useState(0)
+  const [view, setView] = useState<MapView>({ zoom: 2, bbox: "-180,-90,180,90" })
+  const clustered = view.zoom < CLUSTER_MAX_ZOOM
   const [loading, setLoading] = useState(false)
   const [filters, setFilters] = useState<MapFilters>({
     minMagnitude: 4.0,
@@ -42,10 +61,37 @@ export default function EarthquakeMap() {
   const fetchEarthquakes = async () => {
     setLoading(true)
     try {
-      const response = await axios.get(`${import.meta.env.VITE_API_URL}/api/earthquakes/live`, {
-        params: filters,
-      })
-      setEarthquakes(response.data)
+      if (clustered) {
+        const response = await axios.get(`${import.meta.env.VITE_API_URL}/api/earthquakes/clusters`, {
+          params: { ...filters, zoom: view.zoom, bbox: view.bbox },
+        })
+        setClusters(response.data.clusters)
+        setEarthquakes([])
+        setTotalEvents(response.data.total)
+      } else {
+        const [west, south, east, north] = view.bbox.split(",")
+        // The local store answers in pages; follow X-Next-Cursor until the last one
+        const events: Earthquake[] = []
+        let cursor: string | undefined
+        do {
+          const response = await axios.get<EarthquakeColumns>(`${import.meta.env.VITE_API_URL}/api/earthquakes/live`, {
+            params: {
+              ...filters,
+              minLatitude: south,
+              maxLatitude: north,
+              minLongitude: west,
+              maxLongitude: east,
+              format: "columns",
+              cursor,
+            },
+          })
+          events.push(...decodeColumns(response.data))
+          cursor = response.headers["x-next-cursor"]
+        } while (cursor)
+        setEarthquakes(events)
+        setClusters([])
+        setTotalEvents(events.length)
+      }
     } catch (error) {
       console.error("Error fetching earthquakes:", error)
     }
@@ -55,10 +101,61 @@ export default function EarthquakeMap() {
   useEffect(() => {
     fetchEarthquakes()
 
-    // Auto-refresh every 60 seconds
+    // Clusters auto-refresh every 60 seconds; raw events are pushed over /stream
+    if (!clustered) return
     const interval = setInterval(fetchEarthquakes, 60000)
     return () => clearInterval(interval)
-  }, [filters])
+  }, [filters, view])
+
+  useEffect(() => {
+    if (clustered) return
+
+    let source: EventSource | null = null
+    let retry: ReturnType<typeof setTimeout> | undefined
+    let lastEventId = ""
+    let stopped = false
+
+    // EventSource cannot send the Authorization header, so each connection
+    // is opened with a short-lived ticket (axios refreshes the access token)
+    const open = async () => {
+      try {
+        const response = await axios.post(`${import.meta.env.VITE_API_URL}/api/earthquakes/stream/ticket`)
+        if (stopped) return
+        const params = new URLSearchParams({
+          ticket: response.data.ticket,
+          minMagnitude: String(filters.minMagnitude),
+          bbox: view.bbox,
+        })
+        if (lastEventId) params.set("lastEventId", lastEventId)
+        source = new EventSource(`${import.meta.env.VITE_API_URL}/api/earthquakes/stream?${params}`)
+        source.addEventListener("earthquake", (event) => {
+          const message = event as MessageEvent
+          lastEventId = message.lastEventId
+          const earthquake: Earthquake = JSON.parse(message.data)
+          setEarthquakes((current) => [earthquake, ...current.filter((item) => item.id !== earthquake.id)])
+        })
+        source.onerror = () => {
+          // The browser reconnects by itself unless the server refused (expired ticket)
+          if (source?.readyState === EventSource.CLOSED && !stopped) {
+            retry = setTimeout(open, STREAM_RETRY_MS)
+          }
+        }
+      } catch (error) {
+        console.error("Error opening earthquake stream:", error)
+        // A 401 here means the session itself ended
+        if (!stopped && !(axios.isAxiosError(error) && error.response?.status === 401)) {
+          retry = setTimeout(open, STREAM_RETRY_MS)
+        }
+      }
+    }
+
+    open()
+    return () => {
+      stopped = true
+      clearTimeout(retry)
+      source?.close()
+    }
+  }, [clustered, filters.minMagnitude, view.bbox])
 
   const handleFilterChange = (e: React.ChangeEvent<HTMLInputElement>) => {
     setFilters({
@@ -141,7 +238,7 @@ export default function EarthquakeMap() {
           </div>
         </div>
         <div className="mt-4 flex items-center justify-between">
-          <span className="text-sm text-gray-600">{earthquakes.length} eventos encontrados</span>
+          <span className="text-sm text-gray-600">{totalEvents} eventos encontrados</span>
           {loading && <span className="text-sm text-blue-600">Actualizando...</span>}
         </div>
       </div>
@@ -154,6 +251,20 @@ export default function EarthquakeMap() {
               attribution='&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors'
               url="https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png"
             />
+            <MapViewTracker onChange={setView} />
+
+            {clusters.map((cluster) => (
+              <CircleMarker
+                key={`${cluster.latitude},${cluster.longitude}`}
+                center={[cluster.latitude, cluster.longitude]}
+                radius={Math.min(30, 6 + 4 * Math.log2(cluster.count))}
+                pathOptions={{ color: "white", weight: 2, fillColor: getMagnitudeColor(cluster.max_magnitude), fillOpacity: 0.8 }}
+              >
+                <Tooltip>
+                  {cluster.count} eventos · Magnitud máx. {cluster.max_magnitude.toFixed(1)}
+                </Tooltip>
+              </CircleMarker>
+            ))}
 
             {earthquakes.map((earthquake) => (
               <Marker
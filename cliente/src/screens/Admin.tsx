@@ -26,7 +26,11 @@ interface News {
 
 export default function Admin() {
   const [users, setUsers] = useState<User[]>([])
+  const [userSearch, setUserSearch] = useState("")
+  const [usersCursor, setUsersCursor] = useState<string | null>(null)
+  const [usersTotal, setUsersTotal] = useState<number | null>(null)
   const [news, setNews] = useState<News[]>([])
+  const [newsCursor, setNewsCursor] = useState<string | null>(null)
   const [activeTab, setActiveTab] = useState<"users" | "news">("users")
   const [newsForm, setNewsForm] = useState({
     title: "",
@@ -35,23 +39,44 @@ export default function Admin() {
   const [editingNews, setEditingNews] = useState<number | null>(null)
 
   useEffect(() => {
-    fetchUsers()
     fetchNews()
   }, [])
 
-  const fetchUsers = async () => {
+  // Debounced server-side search; substring match from 3 characters
+  useEffect(() => {
+    const timer = setTimeout(() => fetchUsers(), 300)
+    return () => clearTimeout(timer)
+  }, [userSearch])
+
+  const fetchUsers = async (cursor?: string) => {
     try {
-      const response = await axios.get(`${import.meta.env.VITE_API_URL}/api/users`)
-      setUsers(response.data)
+      const query = userSearch.trim()
+      const response = await axios.get(`${import.meta.env.VITE_API_URL}/api/users`, {
+        params: {
+          limit: 50,
+          sort: "-id",
+          q: query || undefined,
+          match: query.length >= 3 ? "substring" : undefined,
+          cursor,
+        },
+      })
+      setUsers(cursor ? (previous) => [...previous, ...response.data] : response.data)
+      setUsersCursor(response.headers["x-next-cursor"] ?? null)
+      if (!cursor) {
+        setUsersTotal(Number(response.headers["x-total-count"] ?? response.data.length))
+      }
     } catch (error) {
       console.error("Error fetching users:", error)
     }
   }
 
-  const fetchNews = async () => {
+  const fetchNews = async (cursor?: string) => {
     try {
-      const response = await axios.get(`${import.meta.env.VITE_API_URL}/api/news`)
-      setNews(response.data)
+      const response = await axios.get(`${import.meta.env.VITE_API_URL}/api/news`, {
+        params: { limit: 50, cursor },
+      })
+      setNews(cursor ? (previous) => [...previous, ...response.data] : response.data)
+      setNewsCursor(response.headers["x-next-cursor"] ?? null)
     } catch (error) {
       console.error("Error fetching news:", error)
     }
@@ -120,6 +145,20 @@ export default function Admin() {
       {/* Users Tab */}
       {activeTab === "users" && (
         <Card title="Gestión de Usuarios">
+          <div className="flex items-center space-x-4 mb-4">
+            <input
+              type="search"
+              value={userSearch}
+              onChange={(e) => setUserSearch(e.target.value)}
+              placeholder="Buscar por nombre o email"
+              className="form-input"
+            />
+            {usersTotal !== null && (
+              <span className="text-gray-600 text-sm">
+                {users.length} de {usersTotal}
+              </span>
+            )}
+          </div>
           <div className="overflow-x-auto">
             <table className="w-full border-collapse">
               <thead>
@@ -160,6 +199,13 @@ export default function Admin() {
               </tbody>
             </table>
           </div>
+          {usersCursor && (
+            <div className="mt-4">
+              <Button onClick={() => fetchUsers(usersCursor)} variant="secondary">
+                Cargar más
+              </Button>
+            </div>
+          )}
         </Card>
       )}
 
@@ -226,6 +272,13 @@ export default function Admin() {
                 </div>
               ))}
             </div>
+            {newsCursor && (
+              <div className="mt-4">
+                <Button onClick={() => fetchNews(newsCursor)} variant="secondary">
+                  Cargar más
+                </Button>
+              </div>
+            )}
           </Card>
         </div>
       )}
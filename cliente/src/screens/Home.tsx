@@ -24,8 +24,10 @@ export default function Home() {
 
   const fetchNews = async () => {
     try {
-      const response = await axios.get(`${import.meta.env.VITE_API_URL}/api/news`)
-      setNews(response.data.slice(0, 3)) // Solo las 3 más recientes
+      const response = await axios.get(`${import.meta.env.VITE_API_URL}/api/news`, {
+        params: { limit: 3 }, // Solo las 3 más recientes
+      })
+      setNews(response.data)
     } catch (error) {
       console.error("Error fetching news:", error)
     }
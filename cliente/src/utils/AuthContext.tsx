@@ -11,6 +11,7 @@ interface User {
   email: string
   role: string
   photo_path?: string
+  photo_url?: string
 }
 
 interface AuthContextType {
@@ -32,6 +33,58 @@ export const useAuth = () => {
   return context
 }
 
+const API_URL = import.meta.env.VITE_API_URL
+
+const storeTokens = (accessToken: string, refreshToken: string) => {
+  localStorage.setItem("token", accessToken)
+  localStorage.setItem("refresh_token", refreshToken)
+  axios.defaults.headers.common["Authorization"] = `Bearer ${accessToken}`
+}
+
+const clearTokens = () => {
+  localStorage.removeItem("token")
+  localStorage.removeItem("refresh_token")
+  delete axios.defaults.headers.common["Authorization"]
+}
+
+// Concurrent 401s share one refresh; the server rotates the refresh token on every use
+let pendingRefresh: Promise<string | null> | null = null
+
+const refreshAccessToken = (): Promise<string | null> => {
+  if (!pendingRefresh) {
+    const refreshToken = localStorage.getItem("refresh_token")
+    pendingRefresh = (async () => {
+      if (!refreshToken) return null
+      try {
+        const response = await axios.post(`${API_URL}/api/auth/refresh`, null, {
+          headers: { Authorization: `Bearer ${refreshToken}` },
+        })
+        storeTokens(response.data.access_token, response.data.refresh_token)
+        return response.data.access_token as string
+      } catch (error) {
+        clearTokens()
+        return null
+      } finally {
+        pendingRefresh = null
+      }
+    })()
+  }
+  return pendingRefresh
+}
+
+axios.interceptors.response.use(undefined, async (error) => {
+  const request = error.config
+  if (error.response?.status === 401 && request && !request._retried && !request.url?.includes("/api/auth/")) {
+    request._retried = true
+    const accessToken = await refreshAccessToken()
+    if (accessToken) {
+      request.headers["Authorization"] = `Bearer ${accessToken}`
+      return axios(request)
+    }
+  }
+  return Promise.reject(error)
+})
+
 export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children }) => {
   const [user, setUser] = useState<User | null>(null)
   const [isAuthenticated, setIsAuthenticated] = useState(false)
@@ -50,8 +103,7 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
       setUser(response.data)
       setIsAuthenticated(true)
     } catch (error) {
-      localStorage.removeItem("token")
-      delete axios.defaults.headers.common["Authorization"]
+      clearTokens()
     }
   }
 
@@ -62,9 +114,8 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
         password,
       })
 
-      const { access_token, user: userData } = response.data
-      localStorage.setItem("token", access_token)
-      axios.defaults.headers.common["Authorization"] = `Bearer ${access_token}`
+      const { access_token, refresh_token, user: userData } = response.data
+      storeTokens(access_token, refresh_token)
 
       setUser(userData)
       setIsAuthenticated(true)
@@ -75,8 +126,13 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
   }
 
   const logout = () => {
-    localStorage.removeItem("token")
-    delete axios.defaults.headers.common["Authorization"]
+    const refreshToken = localStorage.getItem("refresh_token")
+    if (refreshToken) {
+      axios
+        .post(`${API_URL}/api/auth/logout`, null, { headers: { Authorization: `Bearer ${refreshToken}` } })
+        .catch(() => {})
+    }
+    clearTokens()
     setUser(null)
     setIsAuthenticated(false)
   }
@@ -0,0 +1,42 @@
+// Decoder for the server's columnar wire format (`format=columns`)
+
+export interface Earthquake {
+  id: string
+  place: string
+  magnitude: number
+  depth: number
+  latitude: number
+  longitude: number
+  event_time: string
+}
+
+export interface EarthquakeColumns {
+  count: number
+  scale: { coordinates: number; magnitude: number; depth: number }
+  id: string[]
+  place: string[]
+  magnitude: number[]
+  depth: number[]
+  latitude: number[]
+  longitude: number[]
+  time: number[] // epoch ms, delta-encoded
+}
+
+export const decodeColumns = (columns: EarthquakeColumns): Earthquake[] => {
+  const { coordinates, magnitude, depth } = columns.scale
+  const earthquakes = new Array<Earthquake>(columns.count)
+  let eventMs = 0
+  for (let i = 0; i < columns.count; i++) {
+    eventMs += columns.time[i]
+    earthquakes[i] = {
+      id: columns.id[i],
+      place: columns.place[i],
+      magnitude: columns.magnitude[i] / magnitude,
+      depth: columns.depth[i] / depth,
+      latitude: columns.latitude[i] / coordinates,
+      longitude: columns.longitude[i] / coordinates,
+      event_time: new Date(eventMs).toISOString(),
+    }
+  }
+  return earthquakes
+}
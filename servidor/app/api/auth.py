@@ -1,11 +1,18 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
 from sqlalchemy.orm import Session
 from datetime import datetime
 from ..db.session import SessionLocal
 from ..models.user import User
 from ..schemas.user import UserRegister, UserLogin, UserUpdate
-from ..core.security import hash_password, verify_password, save_uploaded_file
+from ..core.http_cache import conditional
+from ..services.last_login import last_login_buffer
+from ..services.images import UploadError, save_photo
+from ..services.refresh_tokens import issue_tokens, rotate_tokens, revoke_family, revoke_user
+from ..core.password_pool import PoolBusy, PoolTimeout
+from ..core.security import (
+    hash_password, verify_password, needs_rehash, password_pool_error, role_claims
+)
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -29,12 +36,12 @@ def register():
         if existing_user:
             return jsonify({'message': 'Email already registered'}), 400
         
-        # Handle photo upload
+        # Handle photo upload (resized in the background)
         photo_path = None
         if 'photo' in request.files:
             file = request.files['photo']
             if file.filename:
-                photo_path = save_uploaded_file(file, 'photos')
+                photo_path = save_photo(file, 'photos')
         
         # Create new user
         user = User(
@@ -52,6 +59,12 @@ def register():
         
         return jsonify({'message': 'User registered successfully'}), 201
         
+    except UploadError as e:
+        db.rollback()
+        return jsonify({'message': str(e)}), e.status
+    except (PoolBusy, PoolTimeout) as e:
+        db.rollback()
+        return password_pool_error(e)
     except Exception as e:
         db.rollback()
         return jsonify({'message': f'Registration failed: {str(e)}'}), 500
@@ -75,25 +88,86 @@ def login():
         if not user or not verify_password(data['password'], user.password_hash):
             return jsonify({'message': 'Invalid credentials'}), 401
         
-        # Update last login
-        user.last_login = datetime.utcnow()
+        # Upgrade hashes made with an older cost while the plain password is at hand
+        if needs_rehash(user.password_hash):
+            try:
+                user.password_hash = hash_password(data['password'])
+                db.commit()
+            except (PoolBusy, PoolTimeout):
+                pass  # Try again on a later login
+        
+        # Update last login (written behind, in batches)
+        last_login = datetime.utcnow()
+        last_login_buffer.record(user.id, last_login)
+        
+        # Short-lived access token (the role travels in it so admin checks need no lookup)
+        # plus a refresh token that renews it without another password check
+        tokens = issue_tokens(db, user.id, role_claims(user))
         db.commit()
         
-        # Create access token
-        access_token = create_access_token(identity=user.id)
-        
         return jsonify({
-            'access_token': access_token,
-            'user': user.to_dict()
+            **tokens,
+            'user': dict(user.to_dict(), last_login=last_login.isoformat())
         }), 200
         
+    except (PoolBusy, PoolTimeout) as e:
+        return password_pool_error(e)
     except Exception as e:
+        db.rollback()
         return jsonify({'message': f'Login failed: {str(e)}'}), 500
     finally:
         db.close()
 
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    """Exchange a refresh token for a new access and refresh token"""
+    db: Session = SessionLocal()
+    
+    try:
+        user_id = get_jwt_identity()
+        claims = get_jwt()
+        
+        # Re-read the role so a changed role reaches the new access token
+        role = db.query(User.role).filter(User.id == user_id).scalar()
+        if role is None:
+            return jsonify({'message': 'User not found'}), 401
+        
+        tokens = rotate_tokens(db, user_id, claims.get('family'), claims['jti'], {'role': role})
+        db.commit()
+        
+        if tokens is None:
+            return jsonify({'message': 'Refresh token has been revoked'}), 401
+        
+        return jsonify(tokens), 200
+        
+    except Exception as e:
+        db.rollback()
+        return jsonify({'message': f'Token refresh failed: {str(e)}'}), 500
+    finally:
+        db.close()
+
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required(refresh=True)
+def logout():
+    """Revoke the refresh token's session"""
+    db: Session = SessionLocal()
+    
+    try:
+        revoke_family(db, get_jwt().get('family'))
+        db.commit()
+        
+        return jsonify({'message': 'Logged out'}), 200
+        
+    except Exception as e:
+        db.rollback()
+        return jsonify({'message': f'Logout failed: {str(e)}'}), 500
+    finally:
+        db.close()
+
 @auth_bp.route('/profile', methods=['GET'])
 @jwt_required()
+@conditional('users', variant=lambda: str(get_jwt_identity()))
 def get_profile():
     """Get user profile"""
     db: Session = SessionLocal()
@@ -145,19 +219,25 @@ def update_profile():
                 return jsonify({'message': 'Current password is incorrect'}), 400
             
             user.password_hash = hash_password(data['new_password'])
+            # Sign out every other session; this one keeps its refresh token
+            revoke_user(db, user.id, keep_family=get_jwt().get('family'))
         
-        # Handle photo upload
+        # Handle photo upload (resized in the background)
         if 'photo' in request.files:
             file = request.files['photo']
             if file.filename:
-                photo_path = save_uploaded_file(file, 'photos')
-                if photo_path:
-                    user.photo_path = photo_path
+                user.photo_path = save_photo(file, 'photos')
         
         db.commit()
         
         return jsonify(user.to_dict()), 200
         
+    except UploadError as e:
+        db.rollback()
+        return jsonify({'message': str(e)}), e.status
+    except (PoolBusy, PoolTimeout) as e:
+        db.rollback()
+        return password_pool_error(e)
     except Exception as e:
         db.rollback()
         return jsonify({'message': f'Failed to update profile: {str(e)}'}), 500
@@ -1,81 +1,520 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from flask_jwt_extended import get_jwt_identity, jwt_required, verify_jwt_in_request
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, or_, insert
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta
+import base64
+import json
+import numpy as np
 import requests
 from ..db.session import SessionLocal
 from ..models.earthquake import Earthquake
 from ..core.config import settings
+from ..core.cache import TTLCache
+from ..core.http_cache import conditional
+from ..core.security import decode_stream_ticket, generate_stream_ticket
+from ..services.ingestion import ingestion_worker
+from ..services.usgs_feed import FeedColumns
+from ..services.usgs_fetch import TooManyEvents, fetch_all
+from ..services.usgs_client import CircuitOpenError, usgs_client
+from ..services.rollups import get_stats
+from ..services.export import MIMETYPES, ExportError, export_chunks, export_filename, export_query
+from ..services.live_events import StreamFilter, broadcaster, poller
+from ..services.clustering import MAX_CLUSTER_ZOOM, build_cluster_grid, crop_cluster_grid
+from ..services.filters import apply_filters
+from ..services.nearby import nearby_records, nearest_events
+from ..services.wire_format import WireFormatError, encode_columns, negotiate
+from ..utils.geo import MAX_DISTANCE_KM, crosses_antimeridian, radius_bounds
 
 earthquakes_bp = Blueprint('earthquakes', __name__)
 
+HISTORY_DEFAULT_LIMIT = 1000
+HISTORY_MAX_LIMIT = 5000
+HISTORY_STREAM_CHUNK_SIZE = 1000
+STREAM_RETRY_MS = 5000
+USGS_MAX_RADIUS_KM = 20001.6
+
+# Shared cache of formatted USGS responses keyed by normalized query
+usgs_cache = TTLCache(ttl=settings.USGS_CACHE_TTL, max_entries=settings.USGS_CACHE_MAX_ENTRIES)
+
+# Aggregated cluster grids keyed by source, zoom and time window
+cluster_cache = TTLCache(ttl=settings.CLUSTER_CACHE_TTL, max_entries=settings.CLUSTER_CACHE_MAX_ENTRIES)
+
+class LivePageError(ValueError):
+    """Invalid cursor or limit for a local-store /live page"""
+
+def _live_page(args) -> dict:
+    """Read the keyset paging of a local-store /live request (as in /history)"""
+    try:
+        limit = min(int(args.get('limit', HISTORY_DEFAULT_LIMIT)), HISTORY_MAX_LIMIT)
+    except ValueError:
+        raise LivePageError('limit must be an integer')
+    if limit < 1:
+        raise LivePageError('limit must be positive')
+    
+    cursor = args.get('cursor') or None
+    if cursor:
+        try:
+            _decode_cursor(cursor)
+        except Exception:
+            raise LivePageError('Invalid cursor')
+    return {'cursor': cursor, 'limit': limit}
+
+def _local_rows(db: Session, columns: tuple, filters: dict, page: dict) -> tuple:
+    """One (event_time desc, id desc) page of the local store: (rows, next cursor or None)"""
+    query = apply_filters(db.query(*columns), filters)
+    if page['cursor']:
+        query = _apply_cursor(query, page['cursor'])
+    
+    # Fetch one extra row to know whether another page exists
+    limit = page['limit']
+    rows = query.order_by(Earthquake.event_time.desc(), Earthquake.id.desc()).limit(limit + 1).all()
+    if len(rows) > limit:
+        return rows[:limit], _encode_cursor(rows[limit - 1])
+    return rows, None
+
+def _get_local_earthquakes(filters: dict, page: dict) -> tuple:
+    """Read one page of live-window earthquakes from the ingested local store"""
+    db: Session = SessionLocal()
+    
+    try:
+        rows, next_cursor = _local_rows(db, (Earthquake,), filters, page)
+        return [eq.to_dict() for eq in rows], next_cursor
+    finally:
+        db.close()
+
+def _get_local_columns(filters: dict, page: dict) -> tuple:
+    """Read one page of live-window earthquakes from the local store as columns"""
+    db: Session = SessionLocal()
+    
+    try:
+        rows, next_cursor = _local_rows(db, (
+            Earthquake.id, Earthquake.event_time, Earthquake.source_id, Earthquake.place,
+            Earthquake.magnitude, Earthquake.depth, Earthquake.latitude, Earthquake.longitude,
+            Earthquake.updated_at
+        ), filters, page)
+        return FeedColumns.from_rows([
+            (source_id, place, magnitude, depth, latitude, longitude, event_time, updated_at)
+            for _, event_time, source_id, place, magnitude, depth, latitude, longitude, updated_at in rows
+        ]), next_cursor
+    finally:
+        db.close()
+
+def _usgs_cache_key(params: dict) -> tuple:
+    """Normalize USGS query parameters into a hashable cache key"""
+    normalized = []
+    for name, value in params.items():
+        if isinstance(value, float):
+            value = round(value, 4)
+        elif isinstance(value, str):
+            value = value.strip()
+        normalized.append((name, value))
+    return tuple(sorted(normalized))
+
+def _load_usgs_columns(filters: dict) -> FeedColumns:
+    """Load USGS columns, sharing one cached (or in-flight) response per query"""
+    params = _usgs_params(filters)
+    return usgs_cache.get_or_load(
+        _usgs_cache_key(params),
+        lambda: fetch_all(params, max_events=settings.LIVE_MAX_EVENTS)
+    )
+
+def _live_filters(args) -> dict:
+    """Read /live filters, defaulting to M4+ over the last 7 days"""
+    start_date = args.get('startDate')
+    end_date = args.get('endDate')
+    
+    # Set default dates if not provided
+    if not start_date:
+        start_date = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
+    if not end_date:
+        end_date = datetime.now().strftime('%Y-%m-%d')
+    
+    return {
+        'minMagnitude': float(args.get('minMagnitude', 4.0)),
+        'startDate': start_date,
+        'endDate': end_date,
+        'minLatitude': args.get('minLatitude'),
+        'maxLatitude': args.get('maxLatitude'),
+        'minLongitude': args.get('minLongitude'),
+        'maxLongitude': args.get('maxLongitude')
+    }
+
+def _usgs_params(filters: dict) -> dict:
+    """Build USGS API parameters from /live filters"""
+    params = {
+        'format': 'geojson',
+        'starttime': filters['startDate'],
+        'endtime': filters['endDate'],
+        'minmagnitude': filters['minMagnitude']
+    }
+    
+    # Add geographic bounds if provided
+    if filters.get('minLatitude'):
+        params['minlatitude'] = float(filters['minLatitude'])
+    if filters.get('maxLatitude'):
+        params['maxlatitude'] = float(filters['maxLatitude'])
+    if filters.get('minLongitude'):
+        params['minlongitude'] = float(filters['minLongitude'])
+    if filters.get('maxLongitude'):
+        params['maxlongitude'] = float(filters['maxLongitude'])
+    
+    # USGS expresses boxes across the date line with maxlongitude > 180
+    if 'minlongitude' in params and 'maxlongitude' in params and \
+            crosses_antimeridian(params['minlongitude'], params['maxlongitude']):
+        params['maxlongitude'] += 360
+    
+    return params
+
+def _live_source(args) -> str:
+    """Pick 'local' (ingested store) or 'usgs' for live data"""
+    return args.get('source', 'local' if settings.LIVE_FROM_LOCAL_STORE else 'usgs')
+
+def _load_live_earthquakes(filters: dict, source: str, page: dict) -> tuple:
+    """Load formatted live earthquakes from the local store (one page) or USGS"""
+    if source == 'local':
+        return _get_local_earthquakes(filters, page)
+    return _load_usgs_columns(filters).to_records(), None
+
+def _load_live_columns(filters: dict, source: str, page: dict) -> tuple:
+    """Load live earthquakes as columns from the local store (one page) or USGS"""
+    if source == 'local':
+        return _get_local_columns(filters, page)
+    return _load_usgs_columns(filters), None
+
+def _columns_response(columns: FeedColumns, fmt: str) -> Response:
+    """Build a compact parallel-array response (see services.wire_format)"""
+    body, mimetype = encode_columns(columns, fmt)
+    response = Response(body, mimetype=mimetype)
+    response.vary.add('Accept')
+    return response
+
 @earthquakes_bp.route('/live', methods=['GET'])
 @jwt_required()
 def get_live_earthquakes():
     """Get live earthquakes from USGS API"""
     try:
-        # Get query parameters
-        min_magnitude = float(request.args.get('minMagnitude', 4.0))
-        start_date = request.args.get('startDate')
-        end_date = request.args.get('endDate')
-        
-        # Set default dates if not provided
-        if not start_date:
-            start_date = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
-        if not end_date:
-            end_date = datetime.now().strftime('%Y-%m-%d')
-        
-        # Build USGS API parameters
-        params = {
-            'format': 'geojson',
-            'starttime': start_date,
-            'endtime': end_date,
-            'minmagnitude': min_magnitude,
-            'limit': 1000
-        }
-        
-        # Add geographic bounds if provided
-        if request.args.get('minLatitude'):
-            params['minlatitude'] = float(request.args.get('minLatitude'))
-        if request.args.get('maxLatitude'):
-            params['maxlatitude'] = float(request.args.get('maxLatitude'))
-        if request.args.get('minLongitude'):
-            params['minlongitude'] = float(request.args.get('minLongitude'))
-        if request.args.get('maxLongitude'):
-            params['maxlongitude'] = float(request.args.get('maxLongitude'))
-        
-        # Make request to USGS API
-        response = requests.get(settings.USGS_API_URL, params=params, timeout=30)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        # Process and format earthquake data
-        earthquakes = []
-        for feature in data.get('features', []):
-            props = feature.get('properties', {})
-            coords = feature.get('geometry', {}).get('coordinates', [])
-            
-            if len(coords) >= 3 and props.get('mag') is not None:
-                earthquake = {
-                    'id': feature.get('id', ''),
-                    'place': props.get('place', 'Unknown location'),
-                    'magnitude': float(props.get('mag', 0)),
-                    'depth': float(coords[2]) if coords[2] is not None else 0,
-                    'latitude': float(coords[1]),
-                    'longitude': float(coords[0]),
-                    'event_time': datetime.fromtimestamp(props.get('time', 0) / 1000).isoformat()
-                }
-                earthquakes.append(earthquake)
-        
-        return jsonify(earthquakes), 200
+        fmt = negotiate(request.args, request.accept_mimetypes)
+    except WireFormatError as e:
+        return jsonify({'message': str(e)}), 406
+    
+    try:
+        filters = _live_filters(request.args)
+        source = _live_source(request.args)
+        # The local store is paged like /history; USGS answers are capped by LIVE_MAX_EVENTS (413)
+        page = _live_page(request.args) if source == 'local' else None
+        if fmt != 'records':
+            columns, next_cursor = _load_live_columns(filters, source, page)
+            response = _columns_response(columns, fmt)
+        else:
+            earthquakes, next_cursor = _load_live_earthquakes(filters, source, page)
+            response = jsonify(earthquakes)
+            response.vary.add('Accept')
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response, 200
         
+    except LivePageError as e:
+        return jsonify({'message': str(e)}), 400
+    except TooManyEvents as e:
+        return jsonify({'message': str(e)}), 413
+    except CircuitOpenError as e:
+        return jsonify({'message': str(e)}), 503
     except requests.RequestException as e:
         return jsonify({'message': f'Failed to fetch earthquake data: {str(e)}'}), 500
     except Exception as e:
         return jsonify({'message': f'Error processing earthquake data: {str(e)}'}), 500
 
+def _load_cluster_grid(zoom: int, filters: dict, source: str):
+    """Bin every event of a time window into the grid for one zoom level"""
+    if source == 'local':
+        db: Session = SessionLocal()
+        try:
+            rows = apply_filters(
+                db.query(Earthquake.latitude, Earthquake.longitude, Earthquake.magnitude),
+                filters
+            ).all()
+        finally:
+            db.close()
+        points = np.asarray(rows, dtype=np.float64).reshape(-1, 3)
+        return build_cluster_grid(points[:, 0], points[:, 1], points[:, 2], zoom)
+    
+    columns = _load_usgs_columns(filters)
+    return build_cluster_grid(columns.latitude, columns.longitude, columns.magnitude, zoom)
+
+@earthquakes_bp.route('/clusters', methods=['GET'])
+@jwt_required()
+def get_earthquake_clusters():
+    """Get earthquakes aggregated into zoom-dependent grid cells"""
+    try:
+        zoom = min(max(int(request.args.get('zoom', 2)), 0), MAX_CLUSTER_ZOOM)
+        bbox = request.args.get('bbox')
+        if bbox:
+            west, south, east, north = (float(value) for value in bbox.split(','))
+        else:
+            west, south, east, north = -180.0, -90.0, 180.0, 90.0
+    except ValueError:
+        return jsonify({'message': 'zoom must be an integer and bbox must be west,south,east,north'}), 400
+    
+    try:
+        # The whole-world grid is cached per zoom and time window; bbox only crops it
+        filters = _live_filters(request.args)
+        for bound in ('minLatitude', 'maxLatitude', 'minLongitude', 'maxLongitude'):
+            filters.pop(bound)
+        source = _live_source(request.args)
+        key = (source, zoom) + tuple(sorted(filters.items()))
+        grid = cluster_cache.get_or_load(key, lambda: _load_cluster_grid(zoom, filters, source))
+        
+        return jsonify(crop_cluster_grid(grid, south, north, west, east)), 200
+        
+    except TooManyEvents as e:
+        return jsonify({'message': str(e)}), 413
+    except CircuitOpenError as e:
+        return jsonify({'message': str(e)}), 503
+    except requests.RequestException as e:
+        return jsonify({'message': f'Failed to fetch earthquake data: {str(e)}'}), 500
+    except Exception as e:
+        return jsonify({'message': f'Failed to cluster earthquakes: {str(e)}'}), 500
+
+def _event_stream(stream_filter: StreamFilter, last_sequence: int):
+    """Yield Server-Sent Events for matching new and updated earthquakes"""
+    broadcaster.subscribe()
+    try:
+        yield f'retry: {STREAM_RETRY_MS}\n\n'
+        while True:
+            events, last_sequence = broadcaster.wait(last_sequence, settings.STREAM_HEARTBEAT)
+            sent = False
+            for sequence, event in events:
+                if stream_filter.matches(event):
+                    yield f'id: {sequence}\nevent: earthquake\ndata: {json.dumps(event)}\n\n'
+                    sent = True
+            if not sent:
+                # Comment line keeps proxies from closing idle connections
+                yield ': keepalive\n\n'
+    finally:
+        broadcaster.unsubscribe()
+
+@earthquakes_bp.route('/stream/ticket', methods=['POST'])
+@jwt_required()
+def create_stream_ticket():
+    """Issue a short-lived ticket for opening the event stream"""
+    return jsonify({
+        'ticket': generate_stream_ticket(get_jwt_identity()),
+        'expires_in': settings.STREAM_TICKET_TTL
+    }), 200
+
+@earthquakes_bp.route('/stream', methods=['GET'])
+def stream_earthquakes():
+    """Push new and updated earthquakes as Server-Sent Events"""
+    # EventSource cannot send headers: it passes a ticket from /stream/ticket instead
+    ticket = request.args.get('ticket')
+    if ticket:
+        if decode_stream_ticket(ticket) is None:
+            return jsonify({'message': 'Invalid or expired stream ticket'}), 401
+    else:
+        verify_jwt_in_request()
+    
+    try:
+        min_magnitude = request.args.get('minMagnitude')
+        bbox = request.args.get('bbox')
+        stream_filter = StreamFilter(
+            float(min_magnitude) if min_magnitude else None,
+            tuple(float(value) for value in bbox.split(',')) if bbox else None
+        )
+        # EventSource resends the last id it saw when reconnecting; a new one
+        # opened with a fresh ticket passes it as lastEventId
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId') or broadcaster.sequence
+        last_sequence = min(int(last_event_id), broadcaster.sequence)
+    except ValueError:
+        return jsonify({'message': 'minMagnitude must be a number and bbox must be west,south,east,north'}), 400
+    
+    poller.ensure_running()
+    response = Response(_event_stream(stream_filter, last_sequence), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+def _local_nearby_candidates(args, latitude: float, longitude: float, radius_km: float) -> FeedColumns:
+    """Stored events inside the circle's bounding box (grid_cell index prefilter)"""
+    min_lat, max_lat, min_lon, max_lon = radius_bounds(latitude, longitude, radius_km)
+    filters = {
+        'minMagnitude': args.get('minMagnitude'),
+        'startDate': args.get('startDate'),
+        'endDate': args.get('endDate'),
+        'minLatitude': str(min_lat),
+        'maxLatitude': str(max_lat),
+        'minLongitude': str(min_lon),
+        'maxLongitude': str(max_lon)
+    }
+    db: Session = SessionLocal()
+    
+    try:
+        rows = apply_filters(db.query(
+            Earthquake.source_id, Earthquake.place, Earthquake.magnitude, Earthquake.depth,
+            Earthquake.latitude, Earthquake.longitude, Earthquake.event_time, Earthquake.updated_at
+        ), filters).limit(settings.NEARBY_MAX_CANDIDATES + 1).all()
+    finally:
+        db.close()
+    
+    if len(rows) > settings.NEARBY_MAX_CANDIDATES:
+        raise TooManyEvents(f'More than {settings.NEARBY_MAX_CANDIDATES} candidates; narrow the radius or filters')
+    return FeedColumns.from_rows(rows)
+
+def _usgs_nearby_candidates(args, latitude: float, longitude: float, radius_km: float) -> FeedColumns:
+    """Events USGS reports within the circle (its own latitude/longitude/maxradiuskm search)"""
+    filters = _live_filters(args)
+    for bound in ('minLatitude', 'maxLatitude', 'minLongitude', 'maxLongitude'):
+        filters.pop(bound)
+    params = dict(
+        _usgs_params(filters),
+        latitude=latitude,
+        longitude=longitude,
+        maxradiuskm=round(min(radius_km, USGS_MAX_RADIUS_KM), 3)
+    )
+    return usgs_cache.get_or_load(
+        _usgs_cache_key(params),
+        lambda: fetch_all(params, max_events=settings.LIVE_MAX_EVENTS)
+    )
+
+@earthquakes_bp.route('/nearby', methods=['GET'])
+@jwt_required()
+def get_nearby_earthquakes():
+    """Get earthquakes within a radius of a point, or the k nearest"""
+    try:
+        latitude = float(request.args['lat'])
+        longitude = float(request.args['lon'])
+        radius_km = float(request.args['radius_km']) if request.args.get('radius_km') else None
+        k = int(request.args['k']) if request.args.get('k') else None
+        if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+            raise ValueError
+        if radius_km is None and k is None:
+            raise ValueError
+        if radius_km is not None and not 0 < radius_km <= MAX_DISTANCE_KM:
+            raise ValueError
+        if k is not None and not 0 < k <= settings.NEARBY_MAX_K:
+            raise ValueError
+    except (KeyError, ValueError):
+        return jsonify({'message': f'lat, lon and radius_km (<= {MAX_DISTANCE_KM:.0f}) '
+                                   f'and/or k (<= {settings.NEARBY_MAX_K}) are required'}), 400
+    
+    try:
+        source = request.args.get('source', 'local')
+        load = _usgs_nearby_candidates if source == 'usgs' else _local_nearby_candidates
+        columns, distances, searched_km = nearest_events(
+            lambda radius: load(request.args, latitude, longitude, radius),
+            latitude, longitude, radius_km, k
+        )
+        
+        response = jsonify(nearby_records(columns, distances))
+        response.headers['X-Search-Radius-Km'] = f'{searched_km:.1f}'
+        return response, 200
+        
+    except TooManyEvents as e:
+        return jsonify({'message': str(e)}), 413
+    except CircuitOpenError as e:
+        return jsonify({'message': str(e)}), 503
+    except requests.RequestException as e:
+        return jsonify({'message': f'Failed to fetch earthquake data: {str(e)}'}), 500
+    except Exception as e:
+        return jsonify({'message': f'Failed to find nearby earthquakes: {str(e)}'}), 500
+
+@earthquakes_bp.route('/live/cache', methods=['GET'])
+@jwt_required()
+def get_live_cache_stats():
+    """Get USGS response cache statistics"""
+    return jsonify(usgs_cache.stats()), 200
+
+def _closing(db: Session, chunks):
+    """Close the session once a streamed response is fully sent"""
+    try:
+        yield from chunks
+    finally:
+        db.close()
+
+@earthquakes_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_earthquakes():
+    """Stream filtered earthquake history as CSV, NDJSON or Parquet"""
+    fmt = request.args.get('format', 'csv')
+    compression = request.args.get('compression')
+    db: Session = SessionLocal()
+    
+    try:
+        chunks = export_chunks(export_query(db, request.args), fmt, compression)
+    except ExportError as e:
+        db.close()
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        db.close()
+        return jsonify({'message': f'Failed to export earthquakes: {str(e)}'}), 500
+    
+    response = Response(stream_with_context(_closing(db, chunks)), mimetype=MIMETYPES[fmt])
+    if compression == 'gzip' and fmt != 'parquet':
+        response.mimetype = 'application/gzip'
+    response.headers['Content-Disposition'] = f'attachment; filename={export_filename(fmt, compression)}'
+    return response
+
+@earthquakes_bp.route('/stats', methods=['GET'])
+@jwt_required()
+def get_earthquake_stats():
+    """Get catalogue statistics from incrementally maintained rollups"""
+    db: Session = SessionLocal()
+    
+    try:
+        return jsonify(get_stats(db, request.args)), 200
+        
+    except ValueError as e:
+        return jsonify({'message': f'Invalid filter: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'message': f'Failed to get earthquake stats: {str(e)}'}), 500
+    finally:
+        db.close()
+
+@earthquakes_bp.route('/upstream', methods=['GET'])
+@jwt_required()
+def get_upstream_stats():
+    """Get USGS HTTP client pool, retry and revalidation statistics"""
+    return jsonify(usgs_client.stats()), 200
+
+@earthquakes_bp.route('/ingestion', methods=['GET'])
+@jwt_required()
+def get_ingestion_status():
+    """Get background USGS ingestion status"""
+    return jsonify(ingestion_worker.status()), 200
+
+def _earthquake_values(data: dict) -> dict:
+    """Build Earthquake column values from a client payload"""
+    return {
+        'place': data.get('place', ''),
+        'magnitude': float(data.get('magnitude', 0)),
+        'depth': float(data.get('depth', 0)),
+        'latitude': float(data.get('latitude', 0)),
+        'longitude': float(data.get('longitude', 0)),
+        'event_time': datetime.fromisoformat(data.get('event_time').replace('Z', '+00:00')),
+        'source_id': data.get('id', '')
+    }
+
+def _read_batch_payload() -> list:
+    """Read a JSON array or NDJSON request body into a list of items"""
+    if request.mimetype in ('application/x-ndjson', 'application/jsonlines'):
+        items = []
+        for line in request.get_data(as_text=True).splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                items.append(None)
+        return items
+    
+    data = request.get_json()
+    if isinstance(data, dict):
+        data = data.get('earthquakes')
+    if not isinstance(data, list):
+        raise ValueError('Expected a list of earthquakes')
+    return data
+
 @earthquakes_bp.route('/save', methods=['POST'])
 @jwt_required()
 def save_earthquake():
@@ -94,15 +533,7 @@ def save_earthquake():
             return jsonify({'message': 'Earthquake already exists'}), 409
         
         # Create new earthquake record
-        earthquake = Earthquake(
-            place=data.get('place', ''),
-            magnitude=float(data.get('magnitude', 0)),
-            depth=float(data.get('depth', 0)),
-            latitude=float(data.get('latitude', 0)),
-            longitude=float(data.get('longitude', 0)),
-            event_time=datetime.fromisoformat(data.get('event_time').replace('Z', '+00:00')),
-            source_id=data.get('id', '')
-        )
+        earthquake = Earthquake(**_earthquake_values(data))
         
         db.add(earthquake)
         db.commit()
@@ -115,54 +546,215 @@ def save_earthquake():
     finally:
         db.close()
 
+def _insert_chunk(db: Session, rows: dict, chunk: list):
+    """Insert one chunk of new rows, setting each item's status
+    
+    A concurrent writer may store some of the ids first. The ids it took are
+    then reported as duplicates and the rest of the chunk is inserted again.
+    """
+    pending = chunk
+    while pending:
+        try:
+            db.execute(insert(Earthquake), [rows[source_id][0] for source_id in pending])
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            taken = {
+                source_id for (source_id,) in db.query(Earthquake.source_id).filter(
+                    Earthquake.source_id.in_(pending)
+                )
+            }
+            if not taken:
+                # Not a duplicate id (some other constraint); report the rows as failed
+                for source_id in pending:
+                    rows[source_id][1]['status'] = 'conflict'
+                return
+            for source_id in taken:
+                rows[source_id][1]['status'] = 'duplicate'
+            pending = [source_id for source_id in pending if source_id not in taken]
+            continue
+        for source_id in pending:
+            rows[source_id][1]['status'] = 'inserted'
+        return
+
+@earthquakes_bp.route('/save/batch', methods=['POST'])
+@jwt_required()
+def save_earthquakes_batch():
+    """Save many earthquakes with one lookup and bulk inserts"""
+    try:
+        items = _read_batch_payload()
+    except Exception as e:
+        return jsonify({'message': f'Invalid batch payload: {str(e)}'}), 400
+    
+    if len(items) > settings.EARTHQUAKE_BATCH_MAX_ITEMS:
+        return jsonify({'message': f'Batch exceeds {settings.EARTHQUAKE_BATCH_MAX_ITEMS} items'}), 413
+    
+    # Validate every item before touching the database
+    results = []
+    rows = {}
+    for index, item in enumerate(items):
+        source_id = item.get('id') if isinstance(item, dict) else None
+        result = {'index': index, 'id': source_id}
+        results.append(result)
+        
+        if not source_id:
+            result.update(status='invalid', message='id is required')
+            continue
+        if not isinstance(source_id, str):
+            result.update(status='invalid', message='id must be a string')
+            continue
+        try:
+            values = _earthquake_values(item)
+        except Exception as e:
+            result.update(status='invalid', message=str(e))
+            continue
+        
+        if source_id in rows:
+            result['status'] = 'duplicate'
+            continue
+        rows[source_id] = (values, result)
+    
+    db: Session = SessionLocal()
+    chunk_size = settings.EARTHQUAKE_BATCH_CHUNK_SIZE
+    
+    try:
+        source_ids = list(rows)
+        
+        # Find existing source_ids (chunked to stay under parameter limits)
+        existing = set()
+        for start in range(0, len(source_ids), chunk_size):
+            existing.update(
+                source_id for (source_id,) in db.query(Earthquake.source_id).filter(
+                    Earthquake.source_id.in_(source_ids[start:start + chunk_size])
+                )
+            )
+        
+        new_ids = []
+        for source_id in source_ids:
+            if source_id in existing:
+                rows[source_id][1]['status'] = 'duplicate'
+            else:
+                new_ids.append(source_id)
+        
+        # Insert the rest with executemany, one transaction per chunk
+        for start in range(0, len(new_ids), chunk_size):
+            _insert_chunk(db, rows, new_ids[start:start + chunk_size])
+        
+        summary = {status: 0 for status in ('inserted', 'duplicate', 'invalid', 'conflict')}
+        for result in results:
+            summary[result['status']] += 1
+        
+        return jsonify({'summary': summary, 'results': results}), 200
+        
+    except Exception as e:
+        db.rollback()
+        return jsonify({'message': f'Failed to save earthquakes: {str(e)}'}), 500
+    finally:
+        db.close()
+
+def _encode_cursor(earthquake: Earthquake) -> str:
+    """Encode the (event_time, id) keyset position of a row"""
+    raw = f'{earthquake.event_time.isoformat()}|{earthquake.id}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def _decode_cursor(cursor: str) -> tuple:
+    """Decode a cursor produced by _encode_cursor"""
+    raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+    event_time, row_id = raw.rsplit('|', 1)
+    return datetime.fromisoformat(event_time), int(row_id)
+
+def _apply_cursor(query, cursor: str):
+    """Continue a (event_time desc, id desc) ordering after cursor"""
+    event_time, row_id = _decode_cursor(cursor)
+    return query.filter(or_(
+        Earthquake.event_time < event_time,
+        and_(Earthquake.event_time == event_time, Earthquake.id < row_id)
+    ))
+
+def _stream_history(db: Session, query, fmt: str):
+    """Yield rows as a chunked JSON array or NDJSON without materializing them"""
+    try:
+        if fmt == 'json':
+            yield '['
+        first = True
+        for earthquake in query.yield_per(HISTORY_STREAM_CHUNK_SIZE):
+            row = json.dumps(earthquake.to_dict())
+            if fmt == 'ndjson':
+                yield row + '\n'
+            else:
+                yield row if first else ',' + row
+            first = False
+            # Drop already-serialized rows from the identity map
+            db.expunge(earthquake)
+        if fmt == 'json':
+            yield ']'
+    finally:
+        db.close()
+
+def _history_variant() -> str:
+    """Representation key for /history: the query string and negotiated type"""
+    return f"{request.query_string.decode('latin-1')}|{request.headers.get('Accept', '')}"
+
 @earthquakes_bp.route('/history', methods=['GET'])
 @jwt_required()
+@conditional('earthquakes', variant=_history_variant)
 def get_earthquake_history():
     """Get earthquake history from database"""
     db: Session = SessionLocal()
+    streaming = False
     
     try:
-        # Build query filters
-        query = db.query(Earthquake)
-        
-        # Filter by magnitude
-        min_magnitude = request.args.get('minMagnitude')
-        if min_magnitude:
-            query = query.filter(Earthquake.magnitude >= float(min_magnitude))
-        
-        # Filter by date range
-        start_date = request.args.get('startDate')
-        end_date = request.args.get('endDate')
+        wire_format = negotiate(request.args, request.accept_mimetypes)
+    except WireFormatError as e:
+        db.close()
+        return jsonify({'message': str(e)}), 406
+    
+    try:
+        query = apply_filters(db.query(Earthquake), request.args)
         
-        if start_date:
-            start_datetime = datetime.strptime(start_date, '%Y-%m-%d')
-            query = query.filter(Earthquake.event_time >= start_datetime)
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                query = _apply_cursor(query, cursor)
+            except Exception:
+                return jsonify({'message': 'Invalid cursor'}), 400
         
-        if end_date:
-            end_datetime = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
-            query = query.filter(Earthquake.event_time < end_datetime)
+        # Order by event time (most recent first), id breaks ties for the keyset
+        query = query.order_by(Earthquake.event_time.desc(), Earthquake.id.desc())
         
-        # Filter by geographic bounds
-        min_lat = request.args.get('minLatitude')
-        max_lat = request.args.get('maxLatitude')
-        min_lon = request.args.get('minLongitude')
-        max_lon = request.args.get('maxLongitude')
+        # Streaming mode returns every matching row
+        fmt = request.args.get('stream')
+        if fmt:
+            if fmt not in ('json', 'ndjson'):
+                return jsonify({'message': 'stream must be json or ndjson'}), 400
+            mimetype = 'application/x-ndjson' if fmt == 'ndjson' else 'application/json'
+            streaming = True
+            return Response(stream_with_context(_stream_history(db, query, fmt)), mimetype=mimetype)
         
-        if min_lat:
-            query = query.filter(Earthquake.latitude >= float(min_lat))
-        if max_lat:
-            query = query.filter(Earthquake.latitude <= float(max_lat))
-        if min_lon:
-            query = query.filter(Earthquake.longitude >= float(min_lon))
-        if max_lon:
-            query = query.filter(Earthquake.longitude <= float(max_lon))
+        try:
+            limit = min(int(request.args.get('limit', HISTORY_DEFAULT_LIMIT)), HISTORY_MAX_LIMIT)
+        except ValueError:
+            return jsonify({'message': 'limit must be an integer'}), 400
+        if limit < 1:
+            return jsonify({'message': 'limit must be positive'}), 400
         
-        # Order by event time (most recent first)
-        earthquakes = query.order_by(Earthquake.event_time.desc()).limit(1000).all()
+        # Fetch one extra row to know whether another page exists
+        earthquakes = query.limit(limit + 1).all()
         
-        return jsonify([eq.to_dict() for eq in earthquakes]), 200
+        if wire_format != 'records':
+            response = _columns_response(FeedColumns.from_rows([
+                (eq.source_id, eq.place, eq.magnitude, eq.depth, eq.latitude, eq.longitude, eq.event_time, eq.updated_at)
+                for eq in earthquakes[:limit]
+            ]), wire_format)
+        else:
+            response = jsonify([eq.to_dict() for eq in earthquakes[:limit]])
+            response.vary.add('Accept')
+        if len(earthquakes) > limit:
+            response.headers['X-Next-Cursor'] = _encode_cursor(earthquakes[limit - 1])
+        return response, 200
         
     except Exception as e:
         return jsonify({'message': f'Failed to get earthquake history: {str(e)}'}), 500
     finally:
-        db.close()
+        if not streaming:
+            db.close()
@@ -1,38 +1,37 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, Response, request, jsonify
+from flask_jwt_extended import get_jwt_identity
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
 from ..db.session import SessionLocal
+from ..core.http_cache import not_modified
+from ..core.security import admin_required
 from ..models.news import News
-from ..models.user import User
+from ..services.news_feed import FeedError, get_feed_page, invalidate_feed
 
 news_bp = Blueprint('news', __name__)
 
-def is_admin(user_id: int) -> bool:
-    """Check if user is admin"""
-    db: Session = SessionLocal()
-    try:
-        user = db.query(User).get(user_id)
-        return user and user.role == 'admin'
-    finally:
-        db.close()
-
 @news_bp.route('/', methods=['GET'])
 def get_news():
-    """Get all news articles"""
-    db: Session = SessionLocal()
-    
+    """Get a page of news articles, newest first"""
     try:
-        news_articles = db.query(News).order_by(desc(News.date_posted)).all()
-        return jsonify([article.to_dict() for article in news_articles]), 200
-        
+        page = get_feed_page(request.args)
+        
+        # Rendered pages are cached in memory, so answering needs no database
+        response = not_modified(page['etag'])
+        if response is None:
+            response = Response(page['body'], mimetype='application/json')
+            response.set_etag(page['etag'])
+        response.headers['Cache-Control'] = 'public, no-cache'
+        if page['next_cursor']:
+            response.headers['X-Next-Cursor'] = page['next_cursor']
+        return response
+        
+    except FeedError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Failed to get news: {str(e)}'}), 500
-    finally:
-        db.close()
 
 @news_bp.route('/', methods=['POST'])
-@jwt_required()
+@admin_required
 def create_news():
     """Create news article (admin only)"""
     db: Session = SessionLocal()
@@ -40,9 +39,6 @@ def create_news():
     try:
         current_user_id = get_jwt_identity()
         
-        if not is_admin(current_user_id):
-            return jsonify({'message': 'Admin access required'}), 403
-        
         data = request.get_json()
         
         if not data.get('title') or not data.get('content'):
@@ -56,6 +52,7 @@ def create_news():
         
         db.add(news_article)
         db.commit()
+        invalidate_feed()
         
         return jsonify(news_article.to_dict()), 201
         
@@ -66,17 +63,12 @@ def create_news():
         db.close()
 
 @news_bp.route('/<int:news_id>', methods=['PUT'])
-@jwt_required()
+@admin_required
 def update_news(news_id: int):
     """Update news article (admin only)"""
     db: Session = SessionLocal()
     
     try:
-        current_user_id = get_jwt_identity()
-        
-        if not is_admin(current_user_id):
-            return jsonify({'message': 'Admin access required'}), 403
-        
         news_article = db.query(News).get(news_id)
         
         if not news_article:
@@ -90,6 +82,7 @@ def update_news(news_id: int):
             news_article.content = data['content']
         
         db.commit()
+        invalidate_feed()
         
         return jsonify(news_article.to_dict()), 200
         
@@ -100,17 +93,12 @@ def update_news(news_id: int):
         db.close()
 
 @news_bp.route('/<int:news_id>', methods=['DELETE'])
-@jwt_required()
+@admin_required
 def delete_news(news_id: int):
     """Delete news article (admin only)"""
     db: Session = SessionLocal()
     
     try:
-        current_user_id = get_jwt_identity()
-        
-        if not is_admin(current_user_id):
-            return jsonify({'message': 'Admin access required'}), 403
-        
         news_article = db.query(News).get(news_id)
         
         if not news_article:
@@ -118,6 +106,7 @@ def delete_news(news_id: int):
         
         db.delete(news_article)
         db.commit()
+        invalidate_feed()
         
         return jsonify({'message': 'News article deleted successfully'}), 200
         
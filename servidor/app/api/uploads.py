@@ -0,0 +1,41 @@
+import os
+from flask import Blueprint, jsonify, send_from_directory
+from werkzeug.security import safe_join
+from ..core.config import settings
+from ..services.images import PLACEHOLDER_PATH, VARIANT_NAMES
+from ..services.upload_store import STAGING_FOLDER, TRASH_FOLDER
+
+uploads_bp = Blueprint('uploads', __name__)
+
+# Stored paths never change content (content-addressed or unique names)
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+def _send(path: str):
+    # send_file handles If-None-Match / If-Modified-Since and Range (206)
+    return send_from_directory(
+        os.path.abspath(settings.UPLOAD_FOLDER), path, conditional=True, etag=path, max_age=IMMUTABLE_MAX_AGE
+    )
+
+@uploads_bp.route('/<path:filename>', methods=['GET'])
+def serve_upload(filename: str):
+    """Serve an uploaded file, or the placeholder while a photo variant is pending"""
+    path = safe_join(settings.UPLOAD_FOLDER, filename)
+    if path is None or filename.startswith((f'{STAGING_FOLDER}/', f'{TRASH_FOLDER}/')):
+        return jsonify({'message': 'File not found'}), 404
+
+    if os.path.isfile(path) and filename != PLACEHOLDER_PATH:
+        response = _send(filename)
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+    # A known photo whose variants are still being rendered
+    directory, _, name = filename.rpartition('/')
+    pending = name in VARIANT_NAMES and os.path.isdir(safe_join(settings.UPLOAD_FOLDER, directory))
+    if pending or filename == PLACEHOLDER_PATH:
+        response = _send(PLACEHOLDER_PATH)
+        response.cache_control.max_age = None
+        response.cache_control.no_cache = True
+        return response
+
+    return jsonify({'message': 'File not found'}), 404
@@ -1,42 +1,38 @@
-from flask import Blueprint, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import get_jwt_identity
 from sqlalchemy.orm import Session
 from ..db.session import SessionLocal
+from ..core.security import admin_required
 from ..models.user import User
+from ..services.user_search import SearchError, search_users
 
 users_bp = Blueprint('users', __name__)
 
-def is_admin(user_id: int) -> bool:
-    """Check if user is admin"""
-    db: Session = SessionLocal()
-    try:
-        user = db.query(User).get(user_id)
-        return user and user.role == 'admin'
-    finally:
-        db.close()
-
 @users_bp.route('/', methods=['GET'])
-@jwt_required()
+@admin_required
 def get_users():
-    """Get all users (admin only)"""
+    """Search and page through users (admin only)"""
     db: Session = SessionLocal()
     
     try:
-        current_user_id = get_jwt_identity()
+        page = search_users(db, request.args)
         
-        if not is_admin(current_user_id):
-            return jsonify({'message': 'Admin access required'}), 403
-        
-        users = db.query(User).all()
-        return jsonify([user.to_dict() for user in users]), 200
+        response = jsonify([user.to_dict() for user in page['users']])
+        if page['next_cursor']:
+            response.headers['X-Next-Cursor'] = page['next_cursor']
+        if page['total'] is not None:
+            response.headers['X-Total-Count'] = str(page['total'])
+        return response, 200
         
+    except SearchError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Failed to get users: {str(e)}'}), 500
     finally:
         db.close()
 
 @users_bp.route('/<int:user_id>', methods=['DELETE'])
-@jwt_required()
+@admin_required
 def delete_user(user_id: int):
     """Delete user (admin only, cannot delete other admins)"""
     db: Session = SessionLocal()
@@ -44,9 +40,6 @@ def delete_user(user_id: int):
     try:
         current_user_id = get_jwt_identity()
         
-        if not is_admin(current_user_id):
-            return jsonify({'message': 'Admin access required'}), 403
-        
         user_to_delete = db.query(User).get(user_id)
         
         if not user_to_delete:
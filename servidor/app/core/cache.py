@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+class _InFlight:
+    """Pending load shared by every caller waiting on the same key"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+class TTLCache:
+    """Thread-safe LRU cache with per-entry TTL and single-flight loading"""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        # Bumped by invalidate(); loads that started earlier are not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def _lookup(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a fresh cached value or default"""
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any):
+        """Store value, evicting the least recently used entries when full"""
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key: Hashable, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return cached value or run loader once for all concurrent callers"""
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.hits += 1
+                return entry[1]
+
+            self.misses += 1
+            pending = self._in_flight.get(key)
+            owner = pending is None
+            if owner:
+                pending = _InFlight()
+                self._in_flight[key] = pending
+                generation = self._generation
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            pending.event.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        loaded = False
+        try:
+            pending.value = loader()
+            loaded = True
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                # A result loaded across an invalidate() may be stale: return it, don't keep it
+                if loaded and generation == self._generation:
+                    self._store(key, pending.value)
+                if self._in_flight.get(key) is pending:
+                    del self._in_flight[key]
+            pending.event.set()
+
+        return pending.value
+
+    def invalidate(self, key: Hashable = None):
+        """Drop one key, or everything when key is None
+
+        Loads already in flight are not stored, and later callers start a
+        fresh load instead of joining them.
+        """
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+                self._in_flight.clear()
+            else:
+                self._entries.pop(key, None)
+                self._in_flight.pop(key, None)
+
+    def stats(self) -> dict:
+        """Return counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,55 @@
+import gzip
+from flask import request
+from .config import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+def _compressible(mimetype: str) -> bool:
+    return mimetype.startswith('text/') or mimetype.endswith(('json', 'msgpack', 'xml', 'javascript'))
+
+def _choose_encoding() -> str:
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+def compress_response(response):
+    """Compress buffered responses above COMPRESSION_MIN_SIZE with brotli or gzip
+
+    Streamed responses (exports, SSE, history streams) are left alone so their
+    chunks are not buffered. Strong ETags get an encoding suffix, since each
+    encoding is a different representation.
+    """
+    if response.status_code != 200 or response.direct_passthrough or response.is_streamed:
+        return response
+    if 'Content-Encoding' in response.headers or not _compressible(response.mimetype):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+    data = response.get_data()
+    if len(data) < settings.COMPRESSION_MIN_SIZE:
+        return response
+
+    if encoding == 'br':
+        compressed = brotli.compress(data, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    else:
+        compressed = gzip.compress(data, compresslevel=settings.COMPRESSION_GZIP_LEVEL)
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f'{etag}-{encoding}')
+    return response
+
+def init_compression(app):
+    """Register response compression on the app"""
+    app.after_request(compress_response)
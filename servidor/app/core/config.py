@@ -12,15 +12,79 @@ class Settings(BaseSettings):
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "dev-secret-key")
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "jwt-secret-key")
-    JWT_ACCESS_TOKEN_EXPIRES: int = 3600  # 1 hour
+    JWT_ACCESS_TOKEN_EXPIRES: int = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRES", "900"))  # 15 minutes
+    JWT_REFRESH_TOKEN_EXPIRES: int = int(os.getenv("JWT_REFRESH_TOKEN_EXPIRES", "2592000"))  # 30 days, renewed on each refresh
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    BCRYPT_WORKERS: int = int(os.getenv("BCRYPT_WORKERS", str(os.cpu_count() or 2)))
+    BCRYPT_MAX_QUEUE: int = int(os.getenv("BCRYPT_MAX_QUEUE", "64"))
+    BCRYPT_TIMEOUT: float = float(os.getenv("BCRYPT_TIMEOUT", "10"))  # seconds
+    LAST_LOGIN_FLUSH_INTERVAL: float = float(os.getenv("LAST_LOGIN_FLUSH_INTERVAL", "5"))  # max staleness, seconds
+    LAST_LOGIN_MAX_PENDING: int = int(os.getenv("LAST_LOGIN_MAX_PENDING", "10000"))
+    ROLE_CACHE_MAX_ENTRIES: int = int(os.getenv("ROLE_CACHE_MAX_ENTRIES", "10000"))
+    USER_SEARCH_INDEX_MAX_AGE: int = int(os.getenv("USER_SEARCH_INDEX_MAX_AGE", "60"))  # seconds before the trigram index is rebuilt
+    NEWS_CACHE_TTL: int = int(os.getenv("NEWS_CACHE_TTL", "30"))  # seconds other workers' news writes may go unseen
+    NEWS_CACHE_MAX_ENTRIES: int = int(os.getenv("NEWS_CACHE_MAX_ENTRIES", "256"))
     
     # API
     USGS_API_URL: str = os.getenv("USGS_API_URL", "https://earthquake.usgs.gov/fdsnws/event/1/query")
+    USGS_CACHE_TTL: int = int(os.getenv("USGS_CACHE_TTL", "60"))  # seconds
+    USGS_CACHE_MAX_ENTRIES: int = int(os.getenv("USGS_CACHE_MAX_ENTRIES", "256"))
+    USGS_HTTP_POOL_SIZE: int = int(os.getenv("USGS_HTTP_POOL_SIZE", "16"))
+    USGS_HTTP_CONNECT_TIMEOUT: float = float(os.getenv("USGS_HTTP_CONNECT_TIMEOUT", "5"))
+    USGS_HTTP_READ_TIMEOUT: float = float(os.getenv("USGS_HTTP_READ_TIMEOUT", "30"))
+    USGS_HTTP_RETRIES: int = int(os.getenv("USGS_HTTP_RETRIES", "3"))
+    USGS_HTTP_BACKOFF: float = float(os.getenv("USGS_HTTP_BACKOFF", "0.5"))
+    USGS_BREAKER_THRESHOLD: int = int(os.getenv("USGS_BREAKER_THRESHOLD", "5"))
+    USGS_BREAKER_COOLDOWN: int = int(os.getenv("USGS_BREAKER_COOLDOWN", "30"))  # seconds
+    USGS_REVALIDATION_ENTRIES: int = int(os.getenv("USGS_REVALIDATION_ENTRIES", "256"))
+    USGS_REVALIDATION_MAX_BYTES: int = int(os.getenv("USGS_REVALIDATION_MAX_BYTES", str(32 * 1024 * 1024)))
+    USGS_FETCH_WORKERS: int = int(os.getenv("USGS_FETCH_WORKERS", "8"))
+    USGS_WINDOW_TARGET_EVENTS: int = int(os.getenv("USGS_WINDOW_TARGET_EVENTS", "5000"))
+    USGS_MAX_EVENTS_PER_REQUEST: int = int(os.getenv("USGS_MAX_EVENTS_PER_REQUEST", "20000"))  # USGS hard limit
+    LIVE_MAX_EVENTS: int = int(os.getenv("LIVE_MAX_EVENTS", "100000"))
+    STREAM_POLL_INTERVAL: int = int(os.getenv("STREAM_POLL_INTERVAL", "30"))  # seconds
+    STREAM_HEARTBEAT: int = int(os.getenv("STREAM_HEARTBEAT", "15"))  # seconds
+    STREAM_BACKLOG: int = int(os.getenv("STREAM_BACKLOG", "1000"))
+    STREAM_WINDOW_HOURS: int = int(os.getenv("STREAM_WINDOW_HOURS", "24"))
+    STREAM_MIN_MAGNITUDE: float = float(os.getenv("STREAM_MIN_MAGNITUDE", "2.5"))
+    STREAM_TICKET_TTL: int = int(os.getenv("STREAM_TICKET_TTL", "30"))  # seconds to open the stream
+    CLUSTER_CACHE_TTL: int = int(os.getenv("CLUSTER_CACHE_TTL", "60"))  # seconds
+    CLUSTER_CACHE_MAX_ENTRIES: int = int(os.getenv("CLUSTER_CACHE_MAX_ENTRIES", "128"))
+    NEARBY_MAX_K: int = int(os.getenv("NEARBY_MAX_K", "1000"))
+    NEARBY_MAX_CANDIDATES: int = int(os.getenv("NEARBY_MAX_CANDIDATES", "200000"))
+    
+    # Ingestion
+    USGS_INGEST_ENABLED: bool = os.getenv("USGS_INGEST_ENABLED", "False").lower() == "true"
+    USGS_INGEST_INTERVAL: int = int(os.getenv("USGS_INGEST_INTERVAL", "60"))  # seconds
+    USGS_INGEST_WINDOW_DAYS: int = int(os.getenv("USGS_INGEST_WINDOW_DAYS", "30"))
+    USGS_INGEST_MIN_MAGNITUDE: float = float(os.getenv("USGS_INGEST_MIN_MAGNITUDE", "2.5"))
+    EARTHQUAKE_BATCH_MAX_ITEMS: int = int(os.getenv("EARTHQUAKE_BATCH_MAX_ITEMS", "10000"))
+    EARTHQUAKE_BATCH_CHUNK_SIZE: int = int(os.getenv("EARTHQUAKE_BATCH_CHUNK_SIZE", "500"))
+    LIVE_FROM_LOCAL_STORE: bool = os.getenv("LIVE_FROM_LOCAL_STORE", "False").lower() == "true"
+    
+    # HTTP responses
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # bytes
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+    
+    # Archive
+    EARTHQUAKE_PARTITION_START: str = os.getenv("EARTHQUAKE_PARTITION_START", "2015-01-01")  # first monthly boundary
+    EARTHQUAKE_PARTITION_AHEAD_MONTHS: int = int(os.getenv("EARTHQUAKE_PARTITION_AHEAD_MONTHS", "3"))
+    RETENTION_DAYS: int = int(os.getenv("RETENTION_DAYS", "365"))
+    RETENTION_MAX_MAGNITUDE: float = float(os.getenv("RETENTION_MAX_MAGNITUDE", "4.5"))  # older events below are compacted
+    RETENTION_BATCH_SIZE: int = int(os.getenv("RETENTION_BATCH_SIZE", "5000"))
     
     # Upload
     UPLOAD_FOLDER: str = os.getenv("UPLOAD_FOLDER", "uploads")
     MAX_CONTENT_LENGTH: int = int(os.getenv("MAX_CONTENT_LENGTH", "16777216"))  # 16MB
-    ALLOWED_EXTENSIONS: set = {'png', 'jpg', 'jpeg', 'gif'}
+    ALLOWED_EXTENSIONS: set = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+    IMAGE_MAX_BYTES: int = int(os.getenv("IMAGE_MAX_BYTES", "5242880"))  # 5MB per photo
+    IMAGE_MAX_PIXELS: int = int(os.getenv("IMAGE_MAX_PIXELS", "40000000"))
+    IMAGE_WORKERS: int = int(os.getenv("IMAGE_WORKERS", "2"))
+    IMAGE_WEBP_QUALITY: int = int(os.getenv("IMAGE_WEBP_QUALITY", "80"))
+    IMAGE_JPEG_QUALITY: int = int(os.getenv("IMAGE_JPEG_QUALITY", "85"))
+    UPLOAD_GC_INTERVAL: int = int(os.getenv("UPLOAD_GC_INTERVAL", "3600"))  # seconds
+    UPLOAD_GC_GRACE: int = int(os.getenv("UPLOAD_GC_GRACE", "3600"))  # unreferenced files kept this long
     
     # Environment
     FLASK_ENV: str = os.getenv("FLASK_ENV", "development")
@@ -0,0 +1,72 @@
+import zlib
+from functools import wraps
+from flask import request, make_response, Response
+from ..db.session import SessionLocal, engine
+from ..models.table_version import TableVersion
+
+# Suffixes the compression middleware appends to strong ETags
+ENCODING_SUFFIXES = ('', '-gzip', '-br')
+
+def table_versions(tables: tuple) -> dict:
+    """Read write counters for tables; None when versions are not tracked
+
+    Counters are maintained by MSSQL triggers, so they are shared by every
+    worker process. A table without a row has not been written since the
+    triggers were installed, and is treated as untracked.
+    """
+    if engine.dialect.name != 'mssql':
+        return None
+    db = SessionLocal()
+    try:
+        rows = dict(db.query(TableVersion.table_name, TableVersion.version).filter(
+            TableVersion.table_name.in_(tables)
+        ).all())
+    finally:
+        db.close()
+    if len(rows) != len(tables):
+        return None
+    return rows
+
+def not_modified(tag: str, vary: tuple = ('Accept-Encoding',)) -> Response:
+    """304 when If-None-Match holds tag in any encoding, otherwise None
+
+    The 304 repeats the exact tag that matched (with its encoding suffix)
+    and carries Vary itself: compress_response only handles 200 responses.
+    """
+    for suffix in ENCODING_SUFFIXES:
+        if tag + suffix in request.if_none_match:
+            response = Response(status=304)
+            response.set_etag(tag + suffix)
+            response.vary.update(vary)
+            return response
+    return None
+
+def conditional(*tables, variant=None):
+    """Answer If-None-Match with 304 before the view runs
+
+    The ETag is derived from the version counters of tables (and variant(),
+    for responses that also depend on the caller or the query), so no body
+    has to be built or hashed to validate a cached copy.
+    """
+    def decorator(view):
+        @wraps(view)
+        def decorated(*args, **kwargs):
+            versions = table_versions(tables)
+            if versions is None:
+                return view(*args, **kwargs)
+
+            tag = '-'.join(f'{table}.{versions[table]}' for table in tables)
+            if variant is not None:
+                tag += '-%08x' % zlib.crc32(variant().encode('utf-8'))
+
+            response = not_modified(tag, vary=('Accept', 'Accept-Encoding'))
+            if response is not None:
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(tag)
+                response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return decorated
+    return decorator
@@ -0,0 +1,83 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable
+
+class PoolBusy(Exception):
+    """Every worker is busy and the wait queue is full"""
+
+class PoolTimeout(Exception):
+    """The job did not finish within the allowed time"""
+
+def _native_executor(workers: int, name: str):
+    """Executor backed by OS threads, even when gevent patches threading
+
+    bcrypt releases the GIL while hashing, so native threads run hashes in
+    parallel without blocking the event loop or request threads.
+    """
+    try:
+        from gevent import monkey
+        if monkey.is_module_patched('threading'):
+            from gevent.threadpool import ThreadPoolExecutor as GeventThreadPoolExecutor
+            return GeventThreadPoolExecutor(max_workers=workers)
+    except ImportError:
+        pass
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+
+class BoundedPool:
+    """Fixed worker pool that rejects work instead of queueing without bound
+
+    At most workers + max_queue jobs are admitted; callers beyond that get
+    PoolBusy right away, so a burst of CPU-heavy jobs (password hashing)
+    cannot tie up every request thread.
+    """
+
+    def __init__(self, workers: int, max_queue: int, timeout: float, name: str):
+        self.workers = workers
+        self.capacity = workers + max_queue
+        self.timeout = timeout
+        self._executor = _native_executor(workers, name)
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def run(self, function: Callable, *args) -> Any:
+        """Run function(*args) on the pool and wait for its result"""
+        with self._lock:
+            if self.admitted - self.completed >= self.capacity:
+                self.rejected += 1
+                raise PoolBusy('Too many concurrent password operations; retry shortly')
+            self.admitted += 1
+
+        try:
+            future = self._executor.submit(function, *args)
+        except BaseException:
+            self._release()
+            raise
+        # The slot frees when the job ends, not when the caller stops waiting:
+        # a timed-out hash keeps its worker busy until it finishes
+        future.add_done_callback(self._release)
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            with self._lock:
+                self.timed_out += 1
+            raise PoolTimeout('Password operation timed out')
+
+    def _release(self, future=None):
+        with self._lock:
+            self.completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'capacity': self.capacity,
+                'in_flight': self.admitted - self.completed,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out
+            }
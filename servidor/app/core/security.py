@@ -1,22 +1,59 @@
 import bcrypt
 import jwt
-import uuid
-import os
 from datetime import datetime, timedelta
 from functools import wraps
 from flask import request, jsonify, current_app
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
 from werkzeug.utils import secure_filename
-from PIL import Image
+from .cache import TTLCache
 from .config import settings
+from .password_pool import BoundedPool, PoolBusy, PoolTimeout
+from ..db.session import SessionLocal
+from ..models.user import User
+
+ADMIN_ROLE = 'admin'
+
+# Roles that differ from (or are missing in) the tokens already issued.
+# Entries live as long as a token can, so a revoked role cannot come back
+# from a still-valid claim. Invalidation is per process: other workers
+# pick the change up at the user's next login.
+role_cache = TTLCache(ttl=settings.JWT_ACCESS_TOKEN_EXPIRES, max_entries=settings.ROLE_CACHE_MAX_ENTRIES)
+_MISSING = object()
+# Role changes flushed in a session, recorded in the cache once it commits
+ROLES_PENDING_KEY = 'role_cache_pending'
+
+# bcrypt runs here instead of on request threads; a full pool raises PoolBusy
+password_pool = BoundedPool(
+    workers=settings.BCRYPT_WORKERS,
+    max_queue=settings.BCRYPT_MAX_QUEUE,
+    timeout=settings.BCRYPT_TIMEOUT,
+    name='bcrypt'
+)
+
+def _hash(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    """Hash a password using bcrypt with BCRYPT_ROUNDS"""
+    return password_pool.run(_hash, password.encode('utf-8'), settings.BCRYPT_ROUNDS).decode('utf-8')
 
 def verify_password(password: str, hashed: str) -> bool:
     """Verify a password against its hash"""
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    return password_pool.run(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+def needs_rehash(hashed: str) -> bool:
+    """True when a stored hash was made with a different cost than BCRYPT_ROUNDS"""
+    try:
+        return int(hashed.split('$')[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+def password_pool_error(error: Exception):
+    """Response for a rejected (429) or timed-out (503) password operation"""
+    status = 429 if isinstance(error, PoolBusy) else 503
+    return jsonify({'message': str(error)}), status, {'Retry-After': '1'}
 
 def generate_token(user_id: int) -> str:
     """Generate JWT token for user"""
@@ -35,6 +72,33 @@ def decode_token(token: str) -> dict:
     except jwt.InvalidTokenError:
         raise Exception('Invalid token')
 
+STREAM_TICKET_AUDIENCE = 'earthquake-stream'
+
+def _stream_ticket_key() -> str:
+    # Signed with a key of its own, so flask_jwt_extended never accepts a ticket as a bearer token
+    return f'{settings.JWT_SECRET_KEY}:{STREAM_TICKET_AUDIENCE}'
+
+def generate_stream_ticket(user_id) -> str:
+    """Short-lived token that only opens /api/earthquakes/stream
+
+    EventSource cannot send headers, so the stream is authorized in the URL.
+    A ticket there instead of the access token: it expires within
+    STREAM_TICKET_TTL seconds and every other endpoint rejects it.
+    """
+    payload = {
+        'sub': str(user_id),
+        'aud': STREAM_TICKET_AUDIENCE,
+        'exp': datetime.utcnow() + timedelta(seconds=settings.STREAM_TICKET_TTL)
+    }
+    return jwt.encode(payload, _stream_ticket_key(), algorithm='HS256')
+
+def decode_stream_ticket(ticket: str) -> dict:
+    """Decode a stream ticket, or None when it is expired or invalid"""
+    try:
+        return jwt.decode(ticket, _stream_ticket_key(), algorithms=['HS256'], audience=STREAM_TICKET_AUDIENCE)
+    except jwt.InvalidTokenError:
+        return None
+
 def token_required(f):
     """Decorator to require JWT token"""
     @wraps(f)
@@ -61,57 +125,74 @@ def token_required(f):
     
     return decorated
 
+def role_claims(user: User) -> dict:
+    """Additional JWT claims carrying the user's role"""
+    return {'role': user.role}
+
+def invalidate_role(user_id: int, role: str = None):
+    """Record a role change (role=None when the user is deleted)"""
+    role_cache.set(int(user_id), role)
+
+def _load_role(user_id: int) -> str:
+    db = SessionLocal()
+    try:
+        user = db.query(User).get(user_id)
+        return user.role if user else None
+    finally:
+        db.close()
+
+def current_role() -> str:
+    """Role of the JWT's user, without a database round trip in the common case"""
+    user_id = int(get_jwt_identity())
+    role = role_cache.get(user_id, _MISSING)
+    if role is not _MISSING:
+        return role
+    
+    claims = get_jwt()
+    if 'role' in claims:
+        return claims['role']
+    
+    # Token issued before role claims existed: look it up once per TTL
+    role = _load_role(user_id)
+    role_cache.set(user_id, role)
+    return role
+
 def admin_required(f):
-    """Decorator to require admin role"""
+    """Decorator to require a valid JWT with the admin role"""
     @wraps(f)
     def decorated(*args, **kwargs):
-        try:
-            verify_jwt_in_request()
-            current_user_id = get_jwt_identity()
-            
-            from ..models.user import User
-            user = User.query.get(current_user_id)
-            
-            if not user or user.role != 'admin':
-                return jsonify({'message': 'Admin access required'}), 403
-                
-        except Exception as e:
-            return jsonify({'message': 'Authentication required'}), 401
+        verify_jwt_in_request()
+        
+        if current_role() != ADMIN_ROLE:
+            return jsonify({'message': 'Admin access required'}), 403
         
         return f(*args, **kwargs)
     
     return decorated
 
+def _pending_roles(target: User) -> dict:
+    return inspect(target).session.info.setdefault(ROLES_PENDING_KEY, {})
+
+@event.listens_for(User, 'after_update')
+def _role_changed(mapper, connection, target):
+    """Invalidate the cached role once an ORM update that changes it commits"""
+    if inspect(target).attrs.role.history.has_changes():
+        _pending_roles(target)[target.id] = target.role
+
+@event.listens_for(User, 'after_delete')
+def _user_deleted(mapper, connection, target):
+    _pending_roles(target)[target.id] = None
+
+@event.listens_for(Session, 'after_commit')
+def _roles_after_commit(session):
+    for user_id, role in session.info.pop(ROLES_PENDING_KEY, {}).items():
+        invalidate_role(user_id, role)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_roles_after_rollback(session):
+    session.info.pop(ROLES_PENDING_KEY, None)
+
 def allowed_file(filename: str) -> bool:
     """Check if file extension is allowed"""
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in settings.ALLOWED_EXTENSIONS
-
-def save_uploaded_file(file, folder: str = 'photos') -> str:
-    """Save uploaded file with unique name"""
-    if file and allowed_file(file.filename):
-        # Generate unique filename
-        file_extension = file.filename.rsplit('.', 1)[1].lower()
-        unique_filename = f"{uuid.uuid4().hex}.{file_extension}"
-        
-        # Create upload directory if it doesn't exist
-        upload_path = os.path.join(settings.UPLOAD_FOLDER, folder)
-        os.makedirs(upload_path, exist_ok=True)
-        
-        # Save file
-        file_path = os.path.join(upload_path, unique_filename)
-        file.save(file_path)
-        
-        # Optimize image if it's an image file
-        try:
-            with Image.open(file_path) as img:
-                # Resize if too large
-                if img.width > 800 or img.height > 800:
-                    img.thumbnail((800, 800), Image.Resampling.LANCZOS)
-                    img.save(file_path, optimize=True, quality=85)
-        except Exception:
-            pass  # Not an image or couldn't process
-        
-        return os.path.join(folder, unique_filename)
-    
-    return None
@@ -3,12 +3,18 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from ..core.config import settings
 
+# pyodbc sends executemany as one bulk parameter array instead of row by row
+engine_options = {}
+if settings.SQLALCHEMY_DATABASE_URI.startswith('mssql+pyodbc'):
+    engine_options['fast_executemany'] = True
+
 # Create engine
 engine = create_engine(
     settings.SQLALCHEMY_DATABASE_URI,
     echo=settings.FLASK_DEBUG,
     pool_pre_ping=True,
-    pool_recycle=300
+    pool_recycle=300,
+    **engine_options
 )
 
 # Create session factory
@@ -3,11 +3,17 @@ from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from .core.config import settings
+from .core.compression import init_compression
 from .db.session import engine, Base
 from .api.auth import auth_bp
 from .api.users import users_bp
 from .api.news import news_bp
 from .api.earthquakes import earthquakes_bp
+from .api.uploads import uploads_bp
+from .services.ingestion import ingestion_worker
+from .services.last_login import last_login_buffer
+from .services.images import image_pipeline
+from .services.upload_store import upload_collector
 
 def create_app():
     """Create Flask application"""
@@ -17,11 +23,13 @@ def create_app():
     app.config['SECRET_KEY'] = settings.SECRET_KEY
     app.config['JWT_SECRET_KEY'] = settings.JWT_SECRET_KEY
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = settings.JWT_ACCESS_TOKEN_EXPIRES
+    app.config['JWT_REFRESH_TOKEN_EXPIRES'] = settings.JWT_REFRESH_TOKEN_EXPIRES
     app.config['MAX_CONTENT_LENGTH'] = settings.MAX_CONTENT_LENGTH
     
     # Initialize extensions
-    CORS(app, origins=["http://localhost:5173"])
+    CORS(app, origins=["http://localhost:5173"], expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Search-Radius-Km", "ETag"])
     jwt = JWTManager(app)
+    init_compression(app)
     
     # Create upload directory
     os.makedirs(settings.UPLOAD_FOLDER, exist_ok=True)
@@ -34,6 +42,18 @@ def create_app():
     app.register_blueprint(users_bp, url_prefix='/api/users')
     app.register_blueprint(news_bp, url_prefix='/api/news')
     app.register_blueprint(earthquakes_bp, url_prefix='/api/earthquakes')
+    app.register_blueprint(uploads_bp, url_prefix='/uploads')
+    
+    # Resize uploaded photos in the background and delete unreferenced ones
+    image_pipeline.start()
+    upload_collector.start()
+    
+    # Flush buffered last_login updates periodically and at shutdown
+    last_login_buffer.start()
+    
+    # Start background USGS ingestion
+    if settings.USGS_INGEST_ENABLED:
+        ingestion_worker.start()
     
     # Health check endpoint
     @app.route('/health')
@@ -51,6 +71,7 @@ def create_app():
                 'users': '/api/users',
                 'news': '/api/news',
                 'earthquakes': '/api/earthquakes',
+                'uploads': '/uploads',
                 'health': '/health'
             }
         }), 200
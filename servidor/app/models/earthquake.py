@@ -1,9 +1,40 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from datetime import date, datetime
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, PrimaryKeyConstraint, DDL, event
 from sqlalchemy.sql import func
+from ..core.config import settings
 from ..db.session import Base
+from ..utils.geo import grid_cell
+
+# Monthly partitioning on event_time (SQL Server); scripts/maintain_earthquakes.py adds future months
+PARTITION_FUNCTION = 'PF_earthquakes_month'
+PARTITION_SCHEME = 'PS_earthquakes_month'
+
+def month_boundaries(start: date, end: date) -> list:
+    """First day of every month from start's month through end's month"""
+    boundaries = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        boundaries.append(date(year, month, 1))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return boundaries
+
+def _add_months(day: date, months: int) -> date:
+    year, month = divmod(day.month - 1 + months, 12)
+    return date(day.year + year, month + 1, 1)
+
+def _default_grid_cell(context):
+    """Derive the spatial grid cell from the inserted coordinates"""
+    params = context.get_current_parameters()
+    return grid_cell(params['latitude'], params['longitude'])
 
 class Earthquake(Base):
     __tablename__ = 'earthquakes'
+    __table_args__ = (
+        # Spatial access path: bbox queries scan only matching cells, newest first
+        Index('IX_earthquakes_grid_cell_event_time', 'grid_cell', 'event_time'),
+        # The clustered index is (event_time, id) on the partition scheme (see below)
+        PrimaryKeyConstraint('id', mssql_clustered=False),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     place = Column(String(255), nullable=False)
@@ -11,8 +42,10 @@ class Earthquake(Base):
     depth = Column(Float, nullable=False)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
+    grid_cell = Column(Integer, default=_default_grid_cell, nullable=False)
     event_time = Column(DateTime, nullable=False)
     source_id = Column(String(100), unique=True, nullable=False)
+    updated_at = Column(DateTime, nullable=True, index=True)  # USGS 'updated' (UTC)
     created_at = Column(DateTime, default=func.getdate(), nullable=False)
     
     def to_dict(self):
@@ -26,3 +59,39 @@ class Earthquake(Base):
             'event_time': self.event_time.isoformat() if self.event_time else None,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+
+@event.listens_for(Earthquake, 'before_update')
+def _refresh_grid_cell(mapper, connection, target):
+    """Keep grid_cell in sync when coordinates are revised"""
+    target.grid_cell = grid_cell(target.latitude, target.longitude)
+
+def _partition_function_sql() -> str:
+    boundaries = month_boundaries(
+        datetime.strptime(settings.EARTHQUAKE_PARTITION_START, '%Y-%m-%d').date(),
+        _add_months(date.today(), settings.EARTHQUAKE_PARTITION_AHEAD_MONTHS)
+    )
+    values = ', '.join(f"'{boundary.isoformat()}'" for boundary in boundaries)
+    return f"""
+IF NOT EXISTS (SELECT 1 FROM sys.partition_functions WHERE name = '{PARTITION_FUNCTION}')
+BEGIN
+    CREATE PARTITION FUNCTION {PARTITION_FUNCTION} (DATETIME) AS RANGE RIGHT FOR VALUES ({values});
+    CREATE PARTITION SCHEME {PARTITION_SCHEME} AS PARTITION {PARTITION_FUNCTION} ALL TO ([PRIMARY]);
+END
+"""
+
+# Ranges on event_time (every /history, /live and export query) touch only
+# the partitions they cover; the spatial index is aligned to the same scheme
+event.listen(
+    Earthquake.__table__,
+    'before_create',
+    DDL(_partition_function_sql()).execute_if(dialect='mssql')
+)
+event.listen(
+    Earthquake.__table__,
+    'after_create',
+    DDL(f"""
+CREATE CLUSTERED INDEX CIX_earthquakes_event_time ON earthquakes (event_time, id) ON {PARTITION_SCHEME} (event_time);
+CREATE INDEX IX_earthquakes_grid_cell_event_time ON earthquakes (grid_cell, event_time)
+    WITH (DROP_EXISTING = ON) ON {PARTITION_SCHEME} (event_time);
+""").execute_if(dialect='mssql')
+)
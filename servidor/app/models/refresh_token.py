@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from ..db.session import Base
+
+class RefreshToken(Base):
+    __tablename__ = 'refresh_tokens'
+
+    # One row per login session; jti is the only refresh token of the family still accepted
+    family = Column(String(36), primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    jti = Column(String(36), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
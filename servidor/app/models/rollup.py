@@ -0,0 +1,66 @@
+from sqlalchemy import Column, Integer, Date, DDL, event
+from ..db.session import Base
+from .earthquake import Earthquake
+
+# Rollup grain: 10-degree region, 0.1 magnitude bin, depth band, UTC-naive day
+REGION_DEGREES = 10
+REGION_COLUMNS = 360 // REGION_DEGREES
+REGION_ROWS = 180 // REGION_DEGREES
+DEPTH_EDGES = (0, 10, 20, 35, 70, 150, 300, 500, 700)
+
+class EarthquakeRollup(Base):
+    __tablename__ = 'earthquake_rollups'
+
+    day = Column(Date, primary_key=True)
+    region = Column(Integer, primary_key=True, autoincrement=False)
+    magnitude_bin = Column(Integer, primary_key=True, autoincrement=False)  # magnitude * 10
+    depth_bin = Column(Integer, primary_key=True, autoincrement=False)  # index into DEPTH_EDGES
+    event_count = Column(Integer, nullable=False, default=0)
+
+def _depth_bin_sql(column: str) -> str:
+    cases = ' '.join(f'WHEN {column} < {edge} THEN {index - 1}' for index, edge in enumerate(DEPTH_EDGES) if index)
+    return f'CASE {cases} ELSE {len(DEPTH_EDGES) - 1} END'
+
+def _bins_sql(alias: str) -> str:
+    row = (f'CASE WHEN {alias}.latitude >= 90 THEN {REGION_ROWS - 1} WHEN {alias}.latitude < -90 THEN 0 '
+           f'ELSE FLOOR(({alias}.latitude + 90) / {REGION_DEGREES}) END')
+    column = (f'CASE WHEN {alias}.longitude >= 180 THEN {REGION_COLUMNS - 1} WHEN {alias}.longitude < -180 THEN 0 '
+              f'ELSE FLOOR(({alias}.longitude + 180) / {REGION_DEGREES}) END')
+    return (f'CAST({alias}.event_time AS DATE) AS day, '
+            f'CAST(({row}) * {REGION_COLUMNS} + ({column}) AS INT) AS region, '
+            f'CAST(FLOOR({alias}.magnitude * 10 + 0.5) AS INT) AS magnitude_bin, '
+            f'{_depth_bin_sql(alias + ".depth")} AS depth_bin')
+
+# Session context flag set by retention compaction: deleted events stay counted
+COMPACTION_CONTEXT_KEY = 'earthquake_compaction'
+
+# Keeps rollups in step with every insert, revision and delete, including
+# bulk Core inserts that bypass ORM events
+ROLLUP_TRIGGER_SQL = f"""
+CREATE TRIGGER TR_earthquakes_rollup ON earthquakes AFTER INSERT, UPDATE, DELETE AS
+BEGIN
+    SET NOCOUNT ON;
+    IF CAST(SESSION_CONTEXT(N'{COMPACTION_CONTEXT_KEY}') AS INT) = 1 RETURN;
+    MERGE earthquake_rollups WITH (HOLDLOCK) AS r
+    USING (
+        SELECT day, region, magnitude_bin, depth_bin, SUM(delta) AS delta
+        FROM (
+            SELECT {_bins_sql('i')}, 1 AS delta FROM inserted i
+            UNION ALL
+            SELECT {_bins_sql('d')}, -1 AS delta FROM deleted d
+        ) AS changes
+        GROUP BY day, region, magnitude_bin, depth_bin
+        HAVING SUM(delta) <> 0
+    ) AS c
+    ON r.day = c.day AND r.region = c.region AND r.magnitude_bin = c.magnitude_bin AND r.depth_bin = c.depth_bin
+    WHEN MATCHED THEN UPDATE SET event_count = r.event_count + c.delta
+    WHEN NOT MATCHED THEN INSERT (day, region, magnitude_bin, depth_bin, event_count)
+        VALUES (c.day, c.region, c.magnitude_bin, c.depth_bin, c.delta);
+END
+"""
+
+event.listen(
+    Earthquake.__table__,
+    'after_create',
+    DDL(ROLLUP_TRIGGER_SQL).execute_if(dialect='mssql')
+)
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from ..db.session import Base
+
+class StoredFile(Base):
+    __tablename__ = 'stored_files'
+
+    path = Column(String(255), primary_key=True)  # relative to UPLOAD_FOLDER, e.g. photos/<sha256>
+    ref_count = Column(Integer, nullable=False, default=0)
+    released_at = Column(DateTime, nullable=True)  # UTC time ref_count last dropped to 0
@@ -0,0 +1,41 @@
+from sqlalchemy import Column, String, BigInteger, DDL, event, insert
+from ..db.session import Base
+from .earthquake import Earthquake
+from .news import News
+from .user import User
+
+class TableVersion(Base):
+    __tablename__ = 'table_versions'
+
+    table_name = Column(String(64), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+def version_trigger_sql(table_name: str) -> str:
+    """Trigger that bumps the table's version on every write statement"""
+    return f"""
+CREATE TRIGGER TR_{table_name}_version ON {table_name} AFTER INSERT, UPDATE, DELETE AS
+BEGIN
+    SET NOCOUNT ON;
+    MERGE table_versions WITH (HOLDLOCK) AS v
+    USING (SELECT '{table_name}' AS table_name) AS t ON v.table_name = t.table_name
+    WHEN MATCHED THEN UPDATE SET version = v.version + 1
+    WHEN NOT MATCHED THEN INSERT (table_name, version) VALUES (t.table_name, 1);
+END
+"""
+
+VERSIONED_TABLES = (Earthquake, News, User)
+
+@event.listens_for(TableVersion.__table__, 'after_create')
+def _seed_versions(target, connection, **kw):
+    """Start every counter at 0, so the first writes only ever update a row"""
+    connection.execute(insert(target), [
+        {'table_name': model.__tablename__, 'version': 0} for model in VERSIONED_TABLES
+    ])
+
+# Triggers see every write, including bulk Core inserts and other processes
+for model in VERSIONED_TABLES:
+    event.listen(
+        model.__table__,
+        'after_create',
+        DDL(version_trigger_sql(model.__tablename__)).execute_if(dialect='mssql')
+    )
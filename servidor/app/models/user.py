@@ -1,9 +1,19 @@
-from sqlalchemy import Column, Integer, String, DateTime, Date
+from sqlalchemy import Column, Integer, String, DateTime, Date, Index
+from sqlalchemy.orm import column_property
 from sqlalchemy.sql import func
 from ..db.session import Base
 
+# Variant linked from photo_url; /uploads serves the placeholder until it is rendered
+PHOTO_URL_VARIANT = 'card.webp'
+
 class User(Base):
     __tablename__ = 'users'
+    __table_args__ = (
+        # Prefix search and sorting in the admin user list
+        Index('IX_users_last_name', 'last_name', 'first_name'),
+        Index('IX_users_first_name', 'first_name'),
+        Index('IX_users_created_at', 'created_at'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     first_name = Column(String(100), nullable=False)
@@ -12,7 +22,8 @@ class User(Base):
     phone = Column(String(20), nullable=True)
     password_hash = Column(String(255), nullable=False)
     date_of_birth = Column(Date, nullable=True)
-    photo_path = Column(String(255), nullable=True)
+    # Old value always loaded on change, so stored-file references can be released
+    photo_path = column_property(Column(String(255), nullable=True), active_history=True)
     role = Column(String(50), default='visitor', nullable=False)
     last_login = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=func.getdate(), nullable=False)
@@ -26,6 +37,7 @@ class User(Base):
             'phone': self.phone,
             'date_of_birth': self.date_of_birth.isoformat() if self.date_of_birth else None,
             'photo_path': self.photo_path,
+            'photo_url': f'/uploads/{self.photo_path}/{PHOTO_URL_VARIANT}' if self.photo_path else None,
             'role': self.role,
             'last_login': self.last_login.isoformat() if self.last_login else None,
             'created_at': self.created_at.isoformat() if self.created_at else None
@@ -0,0 +1,65 @@
+import numpy as np
+from ..utils.geo import longitude_spans
+
+# Leaflet tiles are 256 px; one cluster cell covers CLUSTER_CELL_PIXELS on screen
+TILE_PIXELS = 256
+CLUSTER_CELL_PIXELS = 64
+MAX_CLUSTER_ZOOM = 18
+
+def cell_size_degrees(zoom: int) -> float:
+    """Return the cluster cell edge in degrees for a map zoom level"""
+    return 360.0 * CLUSTER_CELL_PIXELS / (TILE_PIXELS * 2 ** zoom)
+
+def build_cluster_grid(latitudes: np.ndarray, longitudes: np.ndarray, magnitudes: np.ndarray, zoom: int) -> dict:
+    """Aggregate event coordinates and magnitudes into grid cells
+
+    Returns parallel arrays with one entry per non-empty cell: event count,
+    maximum magnitude and centroid.
+    """
+    cell = cell_size_degrees(zoom)
+    columns = int(round(360.0 / cell))
+    rows_count = int(np.ceil(180.0 / cell))
+    column = np.clip(np.floor((longitudes + 180.0) / cell).astype(np.int64), 0, columns - 1)
+    row = np.clip(np.floor((latitudes + 90.0) / cell).astype(np.int64), 0, rows_count - 1)
+
+    cells, inverse, counts = np.unique(row * columns + column, return_inverse=True, return_counts=True)
+    max_magnitude = np.full(len(cells), -np.inf)
+    np.maximum.at(max_magnitude, inverse, magnitudes)
+
+    return {
+        'zoom': zoom,
+        'cell_size': cell,
+        'count': counts,
+        'max_magnitude': max_magnitude,
+        'latitude': np.bincount(inverse, weights=latitudes, minlength=len(cells)) / np.maximum(counts, 1),
+        'longitude': np.bincount(inverse, weights=longitudes, minlength=len(cells)) / np.maximum(counts, 1)
+    }
+
+def crop_cluster_grid(grid: dict, south: float, north: float, west: float, east: float) -> dict:
+    """Keep the cells whose centroid falls inside a (possibly date-line crossing) box"""
+    latitudes = grid['latitude']
+    longitudes = grid['longitude']
+
+    visible = (latitudes >= south) & (latitudes <= north)
+    in_longitude = np.zeros(len(longitudes), dtype=bool)
+    for first, last in longitude_spans(west, east):
+        in_longitude |= (longitudes >= first) & (longitudes <= last)
+    visible &= in_longitude
+
+    counts = grid['count'][visible]
+    return {
+        'zoom': grid['zoom'],
+        'cell_size': grid['cell_size'],
+        'total': int(counts.sum()),
+        'clusters': [
+            {
+                'latitude': round(float(latitude), 4),
+                'longitude': round(float(longitude), 4),
+                'count': int(count),
+                'max_magnitude': round(float(magnitude), 1)
+            }
+            for latitude, longitude, count, magnitude in zip(
+                latitudes[visible], longitudes[visible], counts, grid['max_magnitude'][visible]
+            )
+        ]
+    }
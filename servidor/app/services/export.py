@@ -0,0 +1,158 @@
+import csv
+import io
+import zlib
+from sqlalchemy.orm import Session
+from ..models.earthquake import Earthquake
+from .filters import apply_filters
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+    import json
+
+EXPORT_FORMATS = ('csv', 'ndjson', 'parquet')
+EXPORT_CHUNK_SIZE = 10000
+COLUMNS = ('source_id', 'place', 'magnitude', 'depth', 'latitude', 'longitude', 'event_time', 'updated_at')
+FILE_EXTENSIONS = {'csv': 'csv', 'ndjson': 'ndjson', 'parquet': 'parquet'}
+MIMETYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson', 'parquet': 'application/vnd.apache.parquet'}
+# Column codecs ParquetWriter accepts; zstd when none is given
+PARQUET_COMPRESSIONS = ('zstd', 'snappy', 'gzip', 'brotli', 'lz4', 'none')
+
+class ExportError(Exception):
+    """Export cannot be produced with the requested options"""
+
+def export_query(db: Session, args):
+    """Column-only query over filtered earthquakes, streamed with a server-side cursor"""
+    query = apply_filters(db.query(*[getattr(Earthquake, column) for column in COLUMNS]), args)
+    return query.order_by(Earthquake.event_time, Earthquake.id).yield_per(EXPORT_CHUNK_SIZE)
+
+def _chunks(rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= EXPORT_CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _csv_chunks(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for chunk in _chunks(rows):
+        writer.writerows(
+            (source_id, place, magnitude, depth, latitude, longitude,
+             event_time.isoformat() if event_time else '', updated_at.isoformat() if updated_at else '')
+            for source_id, place, magnitude, depth, latitude, longitude, event_time, updated_at in chunk
+        )
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+def _isoformat(value):
+    return value.isoformat()
+
+def _ndjson_chunks(rows):
+    for chunk in _chunks(rows):
+        records = [dict(zip(COLUMNS, row)) for row in chunk]
+        if orjson is not None:
+            yield b''.join(orjson.dumps(record) + b'\n' for record in records)
+        else:
+            yield ''.join(json.dumps(record, default=_isoformat) + '\n' for record in records).encode('utf-8')
+
+class _DrainBuffer(io.RawIOBase):
+    """Write-only sink whose contents are handed out after each row group"""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+def _parquet_chunks(rows, compression: str):
+    # Import up front so a missing dependency fails before streaming starts
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportError('Parquet export requires pyarrow')
+    # Checked here too: once the generator runs, the 200 and headers are already sent
+    compression = compression or 'zstd'
+    if compression not in PARQUET_COMPRESSIONS:
+        raise ExportError(f'compression must be one of {", ".join(PARQUET_COMPRESSIONS)} for parquet')
+    if compression != 'none' and not pa.Codec.is_available(compression):
+        raise ExportError(f'{compression} compression is not available in this pyarrow build')
+    return _parquet_stream(rows, compression, pa, pq)
+
+def _parquet_stream(rows, compression: str, pa, pq):
+    schema = pa.schema([
+        ('source_id', pa.string()),
+        ('place', pa.string()),
+        ('magnitude', pa.float64()),
+        ('depth', pa.float64()),
+        ('latitude', pa.float64()),
+        ('longitude', pa.float64()),
+        ('event_time', pa.timestamp('us')),
+        ('updated_at', pa.timestamp('us'))
+    ])
+    sink = _DrainBuffer()
+    writer = pq.ParquetWriter(sink, schema, compression=compression)
+    try:
+        for chunk in _chunks(rows):
+            columns = list(zip(*chunk))
+            writer.write_batch(pa.record_batch(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            ))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def export_chunks(rows, fmt: str, compression: str = None):
+    """Encode rows into a stream of byte chunks
+
+    CSV and NDJSON are optionally gzip-compressed; Parquet uses its own
+    column compression (zstd by default).
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f'format must be one of {", ".join(EXPORT_FORMATS)}')
+    if fmt == 'parquet':
+        return _parquet_chunks(rows, compression)
+
+    chunks = _csv_chunks(rows) if fmt == 'csv' else _ndjson_chunks(rows)
+    if compression == 'gzip':
+        return _gzip(chunks)
+    if compression:
+        raise ExportError('compression must be gzip for csv and ndjson')
+    return chunks
+
+def export_filename(fmt: str, compression: str = None) -> str:
+    name = f'earthquakes.{FILE_EXTENSIONS[fmt]}'
+    return name + '.gz' if compression == 'gzip' and fmt != 'parquet' else name
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from ..models.earthquake import Earthquake
+from ..utils.geo import GRID_COLUMNS, GRID_ROWS, grid_cell_ranges, longitude_spans
+
+def apply_filters(query, args):
+    """Apply magnitude, date range and geographic bound filters from args"""
+    # Filter by magnitude
+    min_magnitude = args.get('minMagnitude')
+    if min_magnitude:
+        query = query.filter(Earthquake.magnitude >= float(min_magnitude))
+    
+    # Filter by date range
+    start_date = args.get('startDate')
+    end_date = args.get('endDate')
+    
+    if start_date:
+        start_datetime = datetime.strptime(start_date, '%Y-%m-%d')
+        query = query.filter(Earthquake.event_time >= start_datetime)
+    
+    if end_date:
+        end_datetime = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+        query = query.filter(Earthquake.event_time < end_datetime)
+    
+    # Filter by geographic bounds
+    min_lat = args.get('minLatitude')
+    max_lat = args.get('maxLatitude')
+    min_lon = args.get('minLongitude')
+    max_lon = args.get('maxLongitude')
+    
+    if min_lat:
+        query = query.filter(Earthquake.latitude >= float(min_lat))
+    if max_lat:
+        query = query.filter(Earthquake.latitude <= float(max_lat))
+    
+    if min_lon and max_lon:
+        # Boxes across 180° (min > max, or edges beyond ±180) split into two spans
+        query = query.filter(or_(*[
+            Earthquake.longitude.between(west, east)
+            for west, east in longitude_spans(float(min_lon), float(max_lon))
+        ]))
+    else:
+        if min_lon:
+            query = query.filter(Earthquake.longitude >= float(min_lon))
+        if max_lon:
+            query = query.filter(Earthquake.longitude <= float(max_lon))
+    
+    # Narrow to the covering grid cells so the (grid_cell, event_time) index is used
+    if min_lat or max_lat or min_lon or max_lon:
+        ranges = grid_cell_ranges(
+            float(min_lat) if min_lat else -90.0,
+            float(max_lat) if max_lat else 90.0,
+            float(min_lon) if min_lon else -180.0,
+            float(max_lon) if max_lon else 180.0
+        )
+        if ranges != [(0, GRID_ROWS * GRID_COLUMNS - 1)]:
+            query = query.filter(or_(*[
+                Earthquake.grid_cell.between(first, last) for first, last in ranges
+            ]))
+    
+    return query
@@ -0,0 +1,219 @@
+import glob
+import hashlib
+import os
+import queue
+import threading
+import uuid
+from PIL import Image, ImageOps
+from ..core.config import settings
+from .upload_store import STAGING_FOLDER, touch
+
+# Variants written for every photo, largest first so each is resized from the previous one
+IMAGE_SIZES = (('full', 1200), ('card', 400), ('avatar', 128))
+IMAGE_FORMATS = (('webp', 'WEBP'), ('jpg', 'JPEG'))
+ORIGINAL_NAME = 'original'
+VARIANT_NAMES = frozenset(f'{size}.{extension}' for size, _ in IMAGE_SIZES for extension, _ in IMAGE_FORMATS)
+# Written last, so its presence means every variant is done
+LAST_VARIANT = f'{IMAGE_SIZES[-1][0]}.{IMAGE_FORMATS[-1][0]}'
+PLACEHOLDER_PATH = 'photos/placeholder.webp'
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Leading bytes of every accepted image type
+SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif')
+)
+
+class UploadError(Exception):
+    """Upload rejected before any processing"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+def sniff_image_type(head: bytes) -> str:
+    """Image type from the first bytes of a file, or None"""
+    for signature, image_type in SIGNATURES:
+        if head.startswith(signature):
+            return image_type
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+def _reject(path: str, message: str, status: int = 400):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    raise UploadError(message, status)
+
+def store_upload(file, folder: str = 'photos') -> tuple:
+    """Stream an uploaded image to disk once, rejecting bad uploads early
+
+    The type is checked from the first bytes and the size while copying, so
+    an oversized or non-image upload is refused without reading or keeping
+    all of it. Files are content-addressed: photo_path is folder/<sha256 of
+    the upload>, and an upload already stored is not written or resized
+    again. Returns (photo_path, original to resize or None).
+    """
+    if file.content_length and file.content_length > settings.IMAGE_MAX_BYTES:
+        raise UploadError('Image is too large', 413)
+
+    head = file.stream.read(STREAM_CHUNK_SIZE)
+    extension = sniff_image_type(head)
+    if extension is None or extension not in settings.ALLOWED_EXTENSIONS:
+        raise UploadError('Unsupported image type')
+
+    staging_directory = os.path.join(settings.UPLOAD_FOLDER, STAGING_FOLDER)
+    os.makedirs(staging_directory, exist_ok=True)
+    staging = os.path.join(staging_directory, f'{uuid.uuid4().hex}.part')
+
+    digest = hashlib.sha256()
+    written = 0
+    with open(staging, 'wb') as target:
+        chunk = head
+        while chunk:
+            written += len(chunk)
+            if written > settings.IMAGE_MAX_BYTES:
+                target.close()
+                _reject(staging, 'Image is too large', 413)
+            digest.update(chunk)
+            target.write(chunk)
+            chunk = file.stream.read(STREAM_CHUNK_SIZE)
+
+    # Only the header is parsed here; decoding happens in the worker
+    try:
+        with Image.open(staging) as img:
+            width, height = img.size
+    except Exception:
+        _reject(staging, 'Image could not be read')
+    if width * height > settings.IMAGE_MAX_PIXELS:
+        _reject(staging, 'Image dimensions are too large')
+
+    photo_path = f'{folder}/{digest.hexdigest()}'
+    # Registered before looking at the disk so the collector leaves it alone
+    touch(photo_path)
+
+    directory = os.path.join(settings.UPLOAD_FOLDER, photo_path)
+    original = os.path.join(directory, f'{ORIGINAL_NAME}.{extension}')
+    if os.path.exists(os.path.join(directory, LAST_VARIANT)) or os.path.exists(original):
+        os.remove(staging)
+        return photo_path, None
+
+    os.makedirs(directory, exist_ok=True)
+    os.replace(staging, original)
+    return photo_path, original
+
+def _save(img: Image.Image, path: str, image_format: str):
+    # Write beside the target and rename, so a variant is never seen half-written
+    temporary = f'{path}.tmp'
+    if image_format == 'JPEG':
+        img.convert('RGB').save(temporary, 'JPEG', quality=settings.IMAGE_JPEG_QUALITY, optimize=True, progressive=True)
+    else:
+        img.save(temporary, 'WEBP', quality=settings.IMAGE_WEBP_QUALITY, method=4)
+    os.replace(temporary, path)
+
+def render_variants(original: str):
+    """Write every size and format next to the original, then remove it"""
+    directory = os.path.dirname(original)
+    with Image.open(original) as img:
+        # JPEG can decode at 1/2, 1/4 or 1/8 scale, far cheaper than a full decode
+        largest = IMAGE_SIZES[0][1]
+        img.draft('RGB', (largest, largest))
+        img = ImageOps.exif_transpose(img)
+        img = img.convert('RGBA' if img.mode in ('RGBA', 'LA', 'P') else 'RGB')
+
+    for size, edge in IMAGE_SIZES:
+        img.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        for extension, image_format in IMAGE_FORMATS:
+            _save(img, os.path.join(directory, f'{size}.{extension}'), image_format)
+    os.remove(original)
+
+def ensure_placeholder():
+    """Write the neutral image served while variants are pending"""
+    path = os.path.join(settings.UPLOAD_FOLDER, PLACEHOLDER_PATH)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _save(Image.new('RGB', (IMAGE_SIZES[-1][1],) * 2, (208, 213, 219)), path, 'WEBP')
+
+class ImagePipeline:
+    """Background workers that resize uploaded photos
+
+    Requests only stream the original to disk and enqueue its path, so
+    their latency does not depend on the image. Originals still on disk at
+    startup (queued when the process stopped) are picked up again.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.processed = 0
+        self.errors = 0
+        self.last_error = None
+
+    def submit(self, original: str):
+        """Queue an original for resizing"""
+        with self._lock:
+            self.submitted += 1
+        self._queue.put(original)
+
+    def start(self):
+        """Start the workers and requeue unfinished originals"""
+        if any(thread.is_alive() for thread in self._threads):
+            return
+        ensure_placeholder()
+        self._threads = [
+            threading.Thread(target=self._run, name=f'image-pipeline-{index}', daemon=True)
+            for index in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        for original in glob.glob(os.path.join(settings.UPLOAD_FOLDER, '*', '*', f'{ORIGINAL_NAME}.*')):
+            self.submit(original)
+
+    def _run(self):
+        while True:
+            original = self._queue.get()
+            try:
+                if not os.path.exists(original):
+                    continue  # Same content queued twice and already rendered
+                render_variants(original)
+                with self._lock:
+                    self.processed += 1
+            except Exception as e:
+                # Drop the unusable original; the placeholder stays in place
+                try:
+                    os.remove(original)
+                except OSError:
+                    pass
+                with self._lock:
+                    self.errors += 1
+                    self.last_error = str(e)
+            finally:
+                self._queue.task_done()
+
+    def status(self) -> dict:
+        """Return queue and counter state for monitoring"""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queued': self._queue.qsize(),
+                'submitted': self.submitted,
+                'processed': self.processed,
+                'errors': self.errors,
+                'last_error': self.last_error
+            }
+
+image_pipeline = ImagePipeline(workers=settings.IMAGE_WORKERS)
+
+def save_photo(file, folder: str = 'photos') -> str:
+    """Store an uploaded photo and queue its resizing; returns photo_path at once"""
+    photo_path, original = store_upload(file, folder)
+    if original:
+        image_pipeline.submit(original)
+    return photo_path
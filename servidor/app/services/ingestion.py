@@ -0,0 +1,129 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..db.session import SessionLocal
+from ..models.earthquake import Earthquake
+from ..core.config import settings
+from .usgs_fetch import fetch_all
+
+# SQL Server caps a statement at 2100 parameters
+UPSERT_CHUNK_SIZE = 1000
+
+def get_high_water_mark(db: Session) -> datetime:
+    """Return the newest USGS 'updated' timestamp already stored"""
+    latest = db.query(func.max(Earthquake.updated_at)).scalar()
+    floor = datetime.utcnow() - timedelta(days=settings.USGS_INGEST_WINDOW_DAYS)
+    return max(latest, floor) if latest else floor
+
+def upsert_events(db: Session, events: list) -> dict:
+    """Insert new events and apply revisions to existing ones by source_id"""
+    inserted = updated = 0
+
+    for start in range(0, len(events), UPSERT_CHUNK_SIZE):
+        chunk = events[start:start + UPSERT_CHUNK_SIZE]
+        existing = {
+            eq.source_id: eq
+            for eq in db.query(Earthquake).filter(
+                Earthquake.source_id.in_([event['source_id'] for event in chunk])
+            )
+        }
+
+        for event in chunk:
+            earthquake = existing.get(event['source_id'])
+            if earthquake is None:
+                earthquake = Earthquake(**event)
+                db.add(earthquake)
+                existing[event['source_id']] = earthquake
+                inserted += 1
+            elif not earthquake.updated_at or (event['updated_at'] and event['updated_at'] > earthquake.updated_at):
+                for column, value in event.items():
+                    setattr(earthquake, column, value)
+                updated += 1
+
+        db.commit()
+
+    return {'inserted': inserted, 'updated': updated}
+
+def ingest_once(db: Session = None) -> dict:
+    """Pull every event revised since the high-water mark and persist it"""
+    owns_session = db is None
+    db = db or SessionLocal()
+
+    try:
+        since = get_high_water_mark(db)
+        params = {
+            'format': 'geojson',
+            'starttime': (datetime.utcnow() - timedelta(days=settings.USGS_INGEST_WINDOW_DAYS)).strftime('%Y-%m-%dT%H:%M:%S'),
+            'endtime': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S'),
+            'updatedafter': since.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3],
+            'minmagnitude': settings.USGS_INGEST_MIN_MAGNITUDE
+        }
+
+        # Time windows are fetched in parallel and merged by event id
+        columns = fetch_all(params)
+        result = upsert_events(db, columns.filter(columns.ids != '').to_rows())
+
+        return {'fetched': len(columns), 'since': since.isoformat(), **result}
+
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if owns_session:
+            db.close()
+
+class IngestionWorker:
+    """Daemon thread that polls USGS on a fixed interval"""
+
+    def __init__(self, interval: int):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self.runs = 0
+        self.errors = 0
+        self.last_run = None
+        self.last_result = None
+        self.last_error = None
+
+    def start(self):
+        """Start polling unless already running"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='usgs-ingestion', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        """Ask the worker to exit and wait for it"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.last_result = ingest_once()
+                self.last_error = None
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e)
+            self.runs += 1
+            self.last_run = datetime.utcnow()
+            self._stop.wait(max(0, self.interval - (time.monotonic() - started)))
+
+    def status(self) -> dict:
+        """Return worker state for monitoring"""
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'interval': self.interval,
+            'runs': self.runs,
+            'errors': self.errors,
+            'last_run': self.last_run.isoformat() if self.last_run else None,
+            'last_result': self.last_result,
+            'last_error': self.last_error
+        }
+
+ingestion_worker = IngestionWorker(interval=settings.USGS_INGEST_INTERVAL)
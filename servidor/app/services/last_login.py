@@ -0,0 +1,128 @@
+import atexit
+import threading
+from datetime import datetime
+from sqlalchemy import DateTime, Integer, column, update, values
+from ..core.config import settings
+from ..db.session import SessionLocal
+from ..models.user import User
+
+# Two parameters per row; SQL Server caps a statement at 2100
+FLUSH_CHUNK_SIZE = 1000
+
+class LastLoginBuffer:
+    """Write-behind buffer for users.last_login
+
+    Logins only record a timestamp in memory; a daemon thread writes all
+    pending timestamps every flush_interval seconds (the maximum staleness)
+    as one UPDATE ... FROM (VALUES ...) per chunk, and once more at exit.
+    """
+
+    def __init__(self, flush_interval: float, max_pending: int):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.recorded = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.errors = 0
+        self.last_error = None
+
+    def record(self, user_id: int, when: datetime):
+        """Remember a login; never touches the database"""
+        with self._lock:
+            if when > self._pending.get(user_id, datetime.min):
+                self._pending[user_id] = when
+            self.recorded += 1
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write pending timestamps now; returns the number of users updated"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        db = SessionLocal()
+        try:
+            items = list(pending.items())
+            for start in range(0, len(items), FLUSH_CHUNK_SIZE):
+                logins = values(
+                    column('id', Integer), column('last_login', DateTime), name='logins'
+                ).data(items[start:start + FLUSH_CHUNK_SIZE])
+                db.execute(
+                    update(User)
+                    .where(User.id == logins.c.id)
+                    .values(last_login=logins.c.last_login),
+                    execution_options={'synchronize_session': False}
+                )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            # Put the batch back (newer logins recorded meanwhile win) for the next attempt
+            with self._lock:
+                for user_id, when in pending.items():
+                    if when > self._pending.get(user_id, datetime.min):
+                        self._pending[user_id] = when
+                self.errors += 1
+                self.last_error = str(e)
+            raise
+        finally:
+            db.close()
+
+        with self._lock:
+            self.flushes += 1
+            self.rows_written += len(pending)
+        return len(pending)
+
+    def start(self):
+        """Start the flusher thread and flush once more at interpreter exit"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='last-login-flush', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self, timeout: float = 10):
+        """Stop the flusher and write whatever is still pending"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+        try:
+            self.flush()
+        except Exception:
+            pass
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                pass
+
+    def status(self) -> dict:
+        """Return buffer counters for monitoring"""
+        with self._lock:
+            return {
+                'pending': len(self._pending),
+                'flush_interval': self.flush_interval,
+                'recorded': self.recorded,
+                'flushes': self.flushes,
+                'rows_written': self.rows_written,
+                'errors': self.errors,
+                'last_error': self.last_error
+            }
+
+last_login_buffer = LastLoginBuffer(
+    flush_interval=settings.LAST_LOGIN_FLUSH_INTERVAL,
+    max_pending=settings.LAST_LOGIN_MAX_PENDING
+)
@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import deque
+from itertools import islice
+from datetime import datetime, timedelta
+from ..core.config import settings
+from ..utils.geo import longitude_spans
+from .usgs_fetch import fetch_window
+
+class EventBroadcaster:
+    """Fan-out of new/updated earthquakes to any number of stream subscribers
+
+    Published events go into one sequence-numbered ring buffer shared by all
+    subscribers; each connection only remembers the last sequence it sent, so
+    publishing costs the same for one or thousands of listeners. Waiting uses
+    a Condition, which gevent patches into a greenlet primitive, so idle
+    connections do not hold OS threads when served by a gevent worker.
+    """
+
+    def __init__(self, backlog: int):
+        self._events = deque(maxlen=backlog)
+        self._condition = threading.Condition()
+        self.sequence = 0
+        self.subscribers = 0
+
+    def publish(self, events: list):
+        """Append events and wake every waiting subscriber"""
+        if not events:
+            return
+        with self._condition:
+            for event in events:
+                self.sequence += 1
+                self._events.append((self.sequence, event))
+            self._condition.notify_all()
+
+    def wait(self, after: int, timeout: float) -> tuple:
+        """Return (events newer than after, latest sequence), waiting up to timeout"""
+        with self._condition:
+            if self.sequence <= after:
+                self._condition.wait(timeout)
+            # Sequences in the buffer are contiguous, so slice instead of scanning
+            skip = max(0, after - (self.sequence - len(self._events)))
+            return list(islice(self._events, skip, None)), self.sequence
+
+    def subscribe(self):
+        with self._condition:
+            self.subscribers += 1
+
+    def unsubscribe(self):
+        with self._condition:
+            self.subscribers -= 1
+
+class StreamFilter:
+    """Per-connection magnitude and bounding-box filter"""
+
+    def __init__(self, min_magnitude: float = None, bbox: tuple = None):
+        self.min_magnitude = min_magnitude
+        self.min_lat = self.max_lat = None
+        self.spans = None
+        if bbox:
+            west, south, east, north = bbox
+            self.min_lat, self.max_lat = south, north
+            self.spans = longitude_spans(west, east)
+
+    def matches(self, event: dict) -> bool:
+        if self.min_magnitude is not None and event['magnitude'] < self.min_magnitude:
+            return False
+        if self.spans is not None:
+            if not self.min_lat <= event['latitude'] <= self.max_lat:
+                return False
+            return any(west <= event['longitude'] <= east for west, east in self.spans)
+        return True
+
+class UpstreamPoller:
+    """Single background poller that publishes USGS changes to a broadcaster"""
+
+    def __init__(self, broadcaster: EventBroadcaster, interval: int):
+        self.broadcaster = broadcaster
+        self.interval = interval
+        self._seen = {}
+        self._last_poll = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self.polls = 0
+        self.errors = 0
+
+    def ensure_running(self):
+        """Start the poller on first use"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='usgs-stream-poller', daemon=True)
+                self._thread.start()
+
+    def poll_once(self) -> list:
+        """Fetch events updated since the last poll and return the changed ones"""
+        now = datetime.utcnow()
+        window_start = now - timedelta(hours=settings.STREAM_WINDOW_HOURS)
+        params = {
+            'format': 'geojson',
+            'starttime': window_start.strftime('%Y-%m-%dT%H:%M:%S'),
+            'minmagnitude': settings.STREAM_MIN_MAGNITUDE,
+            'orderby': 'time'
+        }
+        if self._last_poll:
+            # Small overlap so revisions landing during the previous poll are not missed
+            params['updatedafter'] = (self._last_poll - timedelta(seconds=self.interval)).strftime('%Y-%m-%dT%H:%M:%S')
+
+        columns, _ = fetch_window(params)
+        first_poll = self._last_poll is None
+        self._last_poll = now
+
+        changed = []
+        for record, updated, event_ms in zip(columns.to_records(), columns.updated_ms.tolist(), columns.time_ms.tolist()):
+            if self._seen.get(record['id'], (None,))[0] != updated:
+                self._seen[record['id']] = (updated, event_ms)
+                changed.append(record)
+
+        # Forget events that left the window
+        cutoff = (time.time() - settings.STREAM_WINDOW_HOURS * 3600) * 1000
+        self._seen = {event_id: seen for event_id, seen in self._seen.items() if seen[1] >= cutoff}
+
+        # The first poll only establishes the baseline of already-known events
+        return [] if first_poll else changed
+
+    def _run(self):
+        while True:
+            started = time.monotonic()
+            if self.broadcaster.subscribers > 0 or self._last_poll is None:
+                try:
+                    self.broadcaster.publish(self.poll_once())
+                except Exception:
+                    self.errors += 1
+                self.polls += 1
+            time.sleep(max(0, self.interval - (time.monotonic() - started)))
+
+broadcaster = EventBroadcaster(backlog=settings.STREAM_BACKLOG)
+poller = UpstreamPoller(broadcaster, interval=settings.STREAM_POLL_INTERVAL)
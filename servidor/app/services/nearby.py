@@ -0,0 +1,52 @@
+import numpy as np
+from ..utils.geo import EARTH_RADIUS_KM, MAX_DISTANCE_KM
+from .usgs_feed import FeedColumns
+
+# First search radius for k-nearest queries without a radius; doubled until k are found
+INITIAL_KNN_RADIUS_KM = 100.0
+
+def haversine_km(latitude: float, longitude: float, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Great-circle distance from one point to many, in kilometres"""
+    lat1, lon1 = np.radians(latitude), np.radians(longitude)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def _refine(columns: FeedColumns, latitude: float, longitude: float, radius_km: float) -> tuple:
+    """Keep candidates inside the circle, nearest first; returns (columns, distances)"""
+    distances = haversine_km(latitude, longitude, columns.latitude, columns.longitude)
+    inside = np.flatnonzero(distances <= radius_km)
+    order = inside[np.argsort(distances[inside], kind='stable')]
+    return columns.filter(order), distances[order]
+
+def nearest_events(load_candidates, latitude: float, longitude: float, radius_km: float = None, k: int = None) -> tuple:
+    """Radius matches or the k nearest events around a point
+
+    load_candidates(radius_km) returns a FeedColumns superset of the events
+    within radius_km (typically a bounding-box query); distances are then
+    computed for all candidates at once. Without a radius the search circle
+    starts at INITIAL_KNN_RADIUS_KM and doubles until it holds k events,
+    which guarantees they are the k nearest overall.
+
+    Returns (columns, distances_km, searched_radius_km).
+    """
+    if radius_km is not None:
+        columns, distances = _refine(load_candidates(radius_km), latitude, longitude, radius_km)
+    else:
+        radius_km = INITIAL_KNN_RADIUS_KM
+        while True:
+            columns, distances = _refine(load_candidates(radius_km), latitude, longitude, radius_km)
+            if len(columns) >= k or radius_km >= MAX_DISTANCE_KM:
+                break
+            radius_km = min(radius_km * 2, MAX_DISTANCE_KM)
+
+    if k is not None:
+        columns, distances = columns.filter(np.arange(min(k, len(columns)))), distances[:k]
+    return columns, distances, radius_km
+
+def nearby_records(columns: FeedColumns, distances: np.ndarray) -> list:
+    """/live-style records with their distance from the search point"""
+    return [
+        dict(record, distance_km=round(distance, 3))
+        for record, distance in zip(columns.to_records(), distances.tolist())
+    ]
@@ -0,0 +1,97 @@
+import base64
+import itertools
+import json
+import zlib
+from datetime import datetime
+from sqlalchemy import and_, event, inspect, or_
+from sqlalchemy.orm import Session, joinedload
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..db.session import SessionLocal
+from ..models.news import News
+from ..models.user import User
+
+NEWS_DEFAULT_LIMIT = 20
+NEWS_MAX_LIMIT = 100
+
+# Rendered pages keyed by (generation, limit, cursor). Writes in this
+# process start a new generation, so a render that raced a write is never
+# served; the TTL bounds how long other workers' writes stay unseen.
+news_cache = TTLCache(ttl=settings.NEWS_CACHE_TTL, max_entries=settings.NEWS_CACHE_MAX_ENTRIES)
+_generations = itertools.count()
+_generation = next(_generations)
+STALE_KEY = 'news_feed_stale'
+
+class FeedError(Exception):
+    """Invalid limit or cursor"""
+
+def invalidate_feed():
+    """Drop every cached page; call after committing a news write"""
+    global _generation
+    _generation = next(_generations)
+    news_cache.invalidate()
+
+def _encode_cursor(article: News) -> str:
+    """Encode the (date_posted, id) keyset position of an article"""
+    raw = f'{article.date_posted.isoformat()}|{article.id}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        date_posted, article_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(date_posted), int(article_id)
+    except Exception:
+        raise FeedError('Invalid cursor')
+
+def _render_page(limit: int, cursor: str) -> dict:
+    db = SessionLocal()
+    try:
+        # Authors come in the same query (only the columns author_name needs)
+        query = db.query(News).options(
+            joinedload(News.author).load_only(User.id, User.first_name, User.last_name)
+        )
+        if cursor:
+            date_posted, article_id = _decode_cursor(cursor)
+            query = query.filter(or_(
+                News.date_posted < date_posted,
+                and_(News.date_posted == date_posted, News.id < article_id)
+            ))
+        # Fetch one extra row to know whether another page exists
+        articles = query.order_by(News.date_posted.desc(), News.id.desc()).limit(limit + 1).all()
+    finally:
+        db.close()
+
+    body = json.dumps([article.to_dict() for article in articles[:limit]]).encode('utf-8')
+    return {
+        'body': body,
+        'etag': 'news-%08x-%x' % (zlib.crc32(body), len(body)),
+        'next_cursor': _encode_cursor(articles[limit - 1]) if len(articles) > limit else None
+    }
+
+def get_feed_page(args) -> dict:
+    """Rendered feed page {body, etag, next_cursor}, from the cache when possible"""
+    try:
+        limit = min(int(args.get('limit', NEWS_DEFAULT_LIMIT)), NEWS_MAX_LIMIT)
+    except ValueError:
+        raise FeedError('limit must be an integer')
+    if limit < 1:
+        raise FeedError('limit must be positive')
+
+    cursor = args.get('cursor') or None
+    if cursor:
+        _decode_cursor(cursor)
+    # Single-flight: after an invalidation one request re-renders for everyone
+    return news_cache.get_or_load((_generation, limit, cursor), lambda: _render_page(limit, cursor))
+
+@event.listens_for(User, 'after_update')
+def _author_renamed(mapper, connection, target):
+    """Cached pages embed author names; drop them once the rename commits"""
+    state = inspect(target)
+    if state.attrs.first_name.history.has_changes() or state.attrs.last_name.history.has_changes():
+        state.session.info[STALE_KEY] = True
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop(STALE_KEY, False):
+        invalidate_feed()
@@ -0,0 +1,88 @@
+import uuid
+from datetime import datetime, timedelta
+from flask_jwt_extended import create_access_token, create_refresh_token
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..db.session import SessionLocal
+from ..models.refresh_token import RefreshToken
+
+PURGE_BATCH_SIZE = 5000
+
+_PURGE_MSSQL = text('DELETE TOP (:batch) FROM refresh_tokens WHERE expires_at < :now')
+
+def _refresh_token(user_id: int, family: str, jti: str) -> str:
+    # The jti is chosen here so it can be stored without decoding the token
+    return create_refresh_token(identity=user_id, additional_claims={'family': family, 'jti': jti})
+
+def _expiry() -> datetime:
+    return datetime.utcnow() + timedelta(seconds=settings.JWT_REFRESH_TOKEN_EXPIRES)
+
+def issue_tokens(db: Session, user_id: int, claims: dict) -> dict:
+    """Start a login session: an access token plus the first refresh token of a new family"""
+    family, jti = str(uuid.uuid4()), str(uuid.uuid4())
+    # Login only inserts; expired sessions are removed by purge_expired()
+    db.add(RefreshToken(family=family, user_id=user_id, jti=jti, expires_at=_expiry()))
+    return {
+        'access_token': create_access_token(identity=user_id, additional_claims=dict(claims, family=family)),
+        'refresh_token': _refresh_token(user_id, family, jti)
+    }
+
+def rotate_tokens(db: Session, user_id: int, family: str, jti: str, claims: dict) -> dict:
+    """Swap a refresh token for a new pair, or return None if it is no longer valid
+
+    The swap is a compare-and-set on the family's primary key, so it costs
+    one index seek and two concurrent refreshes cannot both win. A token
+    that was already rotated (a replay, possibly stolen) revokes the whole
+    family.
+    """
+    new_jti = str(uuid.uuid4())
+    swapped = db.query(RefreshToken).filter(
+        RefreshToken.family == family,
+        RefreshToken.jti == jti,
+        RefreshToken.user_id == user_id,
+        RefreshToken.expires_at > datetime.utcnow()
+    ).update({'jti': new_jti, 'expires_at': _expiry()}, synchronize_session=False)
+
+    if not swapped:
+        revoke_family(db, family)
+        return None
+
+    return {
+        'access_token': create_access_token(identity=user_id, additional_claims=dict(claims, family=family)),
+        'refresh_token': _refresh_token(user_id, family, new_jti)
+    }
+
+def revoke_family(db: Session, family: str):
+    """End one login session"""
+    db.query(RefreshToken).filter(RefreshToken.family == family).delete(synchronize_session=False)
+
+def revoke_user(db: Session, user_id: int, keep_family: str = None):
+    """End every login session of a user, optionally except one"""
+    query = db.query(RefreshToken).filter(RefreshToken.user_id == user_id)
+    if keep_family:
+        query = query.filter(RefreshToken.family != keep_family)
+    query.delete(synchronize_session=False)
+
+def purge_expired(batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """Delete expired login sessions; returns how many were removed
+
+    Run periodically (scripts/maintain_earthquakes.py) rather than on login.
+    On SQL Server rows go in batches, one transaction each.
+    """
+    now = datetime.utcnow()
+    purged = 0
+    db = SessionLocal()
+    try:
+        if db.get_bind().dialect.name != 'mssql':
+            purged = db.query(RefreshToken).filter(RefreshToken.expires_at < now).delete(synchronize_session=False)
+            db.commit()
+            return purged
+        while True:
+            result = db.execute(_PURGE_MSSQL, {'batch': batch_size, 'now': now})
+            db.commit()
+            purged += result.rowcount
+            if result.rowcount < batch_size:
+                return purged
+    finally:
+        db.close()
@@ -0,0 +1,111 @@
+from datetime import date, datetime, timedelta
+from sqlalchemy import text
+from ..core.config import settings
+from ..db.session import engine
+from ..models.earthquake import PARTITION_FUNCTION, PARTITION_SCHEME, month_boundaries
+from ..models.rollup import COMPACTION_CONTEXT_KEY
+
+def existing_boundaries(connection) -> list:
+    """Monthly boundaries currently defined on the partition function"""
+    rows = connection.execute(text("""
+        SELECT CAST(v.value AS DATETIME)
+        FROM sys.partition_range_values v
+        JOIN sys.partition_functions f ON f.function_id = v.function_id
+        WHERE f.name = :name
+        ORDER BY v.boundary_id
+    """), {'name': PARTITION_FUNCTION})
+    return [value.date() for (value,) in rows]
+
+def ensure_partitions(months_ahead: int = None) -> list:
+    """Split empty partitions for upcoming months; returns the boundaries added
+
+    Splitting ahead of the data keeps each split a metadata-only operation.
+    """
+    months_ahead = settings.EARTHQUAKE_PARTITION_AHEAD_MONTHS if months_ahead is None else months_ahead
+    today = date.today()
+    year, month = divmod(today.month - 1 + months_ahead, 12)
+    last = date(today.year + year, month + 1, 1)
+
+    with engine.begin() as connection:
+        existing = existing_boundaries(connection)
+        if not existing:
+            return []
+        added = [boundary for boundary in month_boundaries(existing[-1], last) if boundary > existing[-1]]
+        for boundary in added:
+            connection.execute(text(f'ALTER PARTITION SCHEME {PARTITION_SCHEME} NEXT USED [PRIMARY]'))
+            connection.execute(text(f"ALTER PARTITION FUNCTION {PARTITION_FUNCTION}() SPLIT RANGE ('{boundary.isoformat()}')"))
+    return added
+
+def compaction_candidates(before: datetime, max_magnitude: float) -> int:
+    """Count events the retention policy would compact"""
+    with engine.connect() as connection:
+        return connection.execute(text(
+            'SELECT COUNT_BIG(*) FROM earthquakes WHERE event_time < :before AND magnitude < :max_magnitude'
+        ), {'before': before, 'max_magnitude': max_magnitude}).scalar()
+
+def compact_events(before: datetime, max_magnitude: float, batch_size: int = None) -> int:
+    """Delete old low-magnitude events, keeping them counted in earthquake_rollups
+
+    The session context flag makes TR_earthquakes_rollup skip these deletes,
+    so /stats still reflects the full catalogue. Deletes run in small
+    batches (one transaction each) to keep locks and the log short; the
+    range on event_time only reads the partitions before the cutoff.
+    """
+    batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+    deleted = 0
+    with engine.connect() as connection:
+        connection.execute(text('EXEC sp_set_session_context :key, 1'), {'key': COMPACTION_CONTEXT_KEY})
+        connection.commit()
+        try:
+            while True:
+                result = connection.execute(text(
+                    'DELETE TOP (:batch) FROM earthquakes WHERE event_time < :before AND magnitude < :max_magnitude'
+                ), {'batch': batch_size, 'before': before, 'max_magnitude': max_magnitude})
+                connection.commit()
+                deleted += result.rowcount
+                if result.rowcount < batch_size:
+                    break
+        finally:
+            # Pooled connection: clear the flag before it is reused
+            connection.rollback()
+            connection.execute(text('EXEC sp_set_session_context :key, NULL'), {'key': COMPACTION_CONTEXT_KEY})
+            connection.commit()
+    return deleted
+
+def partition_stats() -> list:
+    """Row count per monthly partition"""
+    with engine.connect() as connection:
+        boundaries = existing_boundaries(connection)
+        counts = dict(connection.execute(text("""
+            SELECT p.partition_number, p.rows
+            FROM sys.partitions p
+            JOIN sys.indexes i ON i.object_id = p.object_id AND i.index_id = p.index_id
+            WHERE p.object_id = OBJECT_ID('earthquakes') AND i.type = 1
+        """)).all())
+    # RANGE RIGHT: partition n holds [boundary n-1, boundary n)
+    return [
+        {
+            'partition': number,
+            'from': boundaries[number - 2].isoformat() if number > 1 else None,
+            'to': boundaries[number - 1].isoformat() if number <= len(boundaries) else None,
+            'rows': counts.get(number, 0)
+        }
+        for number in range(1, len(boundaries) + 2)
+    ]
+
+def run_maintenance(retention_days: int = None, max_magnitude: float = None, dry_run: bool = False) -> dict:
+    """Add upcoming partitions and compact events past the retention window"""
+    retention_days = settings.RETENTION_DAYS if retention_days is None else retention_days
+    max_magnitude = settings.RETENTION_MAX_MAGNITUDE if max_magnitude is None else max_magnitude
+    before = datetime.combine(date.today() - timedelta(days=retention_days), datetime.min.time())
+
+    summary = {
+        'cutoff': before.isoformat(),
+        'max_magnitude': max_magnitude,
+        'candidates': compaction_candidates(before, max_magnitude)
+    }
+    if dry_run:
+        return summary
+    summary['partitions_added'] = [boundary.isoformat() for boundary in ensure_partitions()]
+    summary['compacted'] = compact_events(before, max_magnitude)
+    return summary
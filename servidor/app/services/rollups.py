@@ -0,0 +1,113 @@
+import math
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..models.rollup import DEPTH_EDGES, REGION_COLUMNS, REGION_DEGREES, REGION_ROWS, EarthquakeRollup
+from ..utils.geo import longitude_spans
+
+# Magnitude bin width used by the rollups (0.1)
+MAGNITUDE_STEP = 0.1
+
+def _region_index(value: float, offset: float, count: int) -> int:
+    return min(max(int(math.floor((value + offset) / REGION_DEGREES)), 0), count - 1)
+
+def region_bounds(region: int) -> dict:
+    """Return the south-west corner and size of a rollup region"""
+    row, column = divmod(region, REGION_COLUMNS)
+    return {
+        'region': region,
+        'min_latitude': row * REGION_DEGREES - 90,
+        'min_longitude': column * REGION_DEGREES - 180,
+        'size': REGION_DEGREES
+    }
+
+def _apply_rollup_filters(query, args):
+    """Apply /history-style filters at rollup resolution
+
+    Dates filter by day, magnitudes by 0.1 bin and geographic bounds select
+    every 10-degree region the box touches.
+    """
+    if args.get('startDate'):
+        query = query.filter(EarthquakeRollup.day >= datetime.strptime(args['startDate'], '%Y-%m-%d').date())
+    if args.get('endDate'):
+        query = query.filter(EarthquakeRollup.day <= datetime.strptime(args['endDate'], '%Y-%m-%d').date())
+    if args.get('minMagnitude'):
+        query = query.filter(EarthquakeRollup.magnitude_bin >= round(float(args['minMagnitude']) * 10))
+    if args.get('maxMagnitude'):
+        query = query.filter(EarthquakeRollup.magnitude_bin <= round(float(args['maxMagnitude']) * 10))
+
+    bounds = [args.get(name) for name in ('minLatitude', 'maxLatitude', 'minLongitude', 'maxLongitude')]
+    if any(bounds):
+        min_lat = float(bounds[0]) if bounds[0] else -90.0
+        max_lat = float(bounds[1]) if bounds[1] else 90.0
+        min_lon = float(bounds[2]) if bounds[2] else -180.0
+        max_lon = float(bounds[3]) if bounds[3] else 180.0
+        regions = [
+            row * REGION_COLUMNS + column
+            for row in range(_region_index(min_lat, 90, REGION_ROWS), _region_index(max_lat, 90, REGION_ROWS) + 1)
+            for west, east in longitude_spans(min_lon, max_lon)
+            for column in range(_region_index(west, 180, REGION_COLUMNS), _region_index(east, 180, REGION_COLUMNS) + 1)
+        ]
+        query = query.filter(EarthquakeRollup.region.in_(sorted(set(regions))))
+
+    return query
+
+def _grouped(db: Session, column, args) -> list:
+    total = func.sum(EarthquakeRollup.event_count)
+    query = _apply_rollup_filters(db.query(column, total), args)
+    return [(key, int(count)) for key, count in query.group_by(column).order_by(column).all() if count]
+
+def b_value(histogram: list) -> dict:
+    """Gutenberg-Richter b-value by Aki-Utsu maximum likelihood
+
+    The completeness magnitude Mc is taken at the histogram's maximum
+    curvature (its most populated bin); the estimate uses events >= Mc with
+    the half-bin correction for binned magnitudes.
+    """
+    if not histogram:
+        return {'b_value': None, 'std_error': None, 'completeness_magnitude': None, 'events_used': 0}
+
+    completeness_bin = max(histogram, key=lambda item: item[1])[0]
+    used = [(magnitude_bin, count) for magnitude_bin, count in histogram if magnitude_bin >= completeness_bin]
+    events = sum(count for _, count in used)
+    mean = sum(magnitude_bin * count for magnitude_bin, count in used) / events / 10
+    completeness = completeness_bin / 10
+    denominator = mean - (completeness - MAGNITUDE_STEP / 2)
+
+    b = math.log10(math.e) / denominator if events > 1 and denominator > 0 else None
+    return {
+        'b_value': round(b, 3) if b is not None else None,
+        # Aki (1965) standard error
+        'std_error': round(b / math.sqrt(events), 3) if b is not None else None,
+        'completeness_magnitude': round(completeness, 1),
+        'events_used': events
+    }
+
+def get_stats(db: Session, args) -> dict:
+    """Summarize the catalogue from rollups for the given filters"""
+    histogram = _grouped(db, EarthquakeRollup.magnitude_bin, args)
+    per_day = _grouped(db, EarthquakeRollup.day, args)
+    per_region = _grouped(db, EarthquakeRollup.region, args)
+    per_depth = _grouped(db, EarthquakeRollup.depth_bin, args)
+
+    return {
+        'total': sum(count for _, count in histogram),
+        'magnitude_histogram': [
+            {'magnitude': round(magnitude_bin / 10, 1), 'count': count} for magnitude_bin, count in histogram
+        ],
+        'per_day': [{'date': day.isoformat(), 'count': count} for day, count in per_day],
+        'per_region': sorted(
+            [dict(region_bounds(region), count=count) for region, count in per_region],
+            key=lambda item: item['count'],
+            reverse=True
+        ),
+        'depth_distribution': [
+            {
+                'min_depth': DEPTH_EDGES[depth_bin],
+                'max_depth': DEPTH_EDGES[depth_bin + 1] if depth_bin + 1 < len(DEPTH_EDGES) else None,
+                'count': count
+            }
+            for depth_bin, count in per_depth
+        ],
+        'gutenberg_richter': b_value(histogram)
+    }
@@ -0,0 +1,237 @@
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import case, event, inspect, insert, text, update
+from ..core.config import settings
+from ..db.session import SessionLocal
+from ..models.stored_file import StoredFile
+from ..models.user import User
+
+# Uploads are written here first, until their content hash is known
+STAGING_FOLDER = 'staging'
+# Collected files wait here to be deleted (a dot name, so no '*' glob ever matches it)
+TRASH_FOLDER = '.trash'
+
+_ADJUST_MSSQL = text("""
+MERGE stored_files WITH (HOLDLOCK) AS f
+USING (SELECT :path AS path) AS s ON f.path = s.path
+WHEN MATCHED THEN UPDATE SET
+    ref_count = f.ref_count + :delta,
+    released_at = CASE WHEN f.ref_count + :delta <= 0 THEN GETUTCDATE() END
+WHEN NOT MATCHED THEN INSERT (path, ref_count, released_at)
+    VALUES (s.path, CASE WHEN :delta > 0 THEN :delta ELSE 0 END, CASE WHEN :delta <= 0 THEN GETUTCDATE() END);
+""")
+
+def adjust_references(connection, path: str, delta: int):
+    """Add delta references to a stored file
+
+    A file at zero references is stamped with released_at and deleted by
+    the collector once UPLOAD_GC_GRACE has passed without a new reference.
+    delta=0 just refreshes that stamp.
+    """
+    if connection.dialect.name == 'mssql':
+        connection.execute(_ADJUST_MSSQL, {'path': path, 'delta': delta})
+        return
+
+    table = StoredFile.__table__
+    count = table.c.ref_count + delta
+    result = connection.execute(
+        update(table)
+        .where(table.c.path == path)
+        .values(ref_count=count, released_at=case((count <= 0, datetime.utcnow()), else_=None))
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(table).values(
+            path=path, ref_count=max(delta, 0), released_at=None if delta > 0 else datetime.utcnow()
+        ))
+
+def touch(path: str):
+    """Register a freshly stored file so it is collected if nothing ever references it
+
+    Committed on its own session: the upload must stay protected for the
+    grace period even when the request that made it rolls back.
+    """
+    db = SessionLocal()
+    try:
+        adjust_references(db.connection(), path, 0)
+        db.commit()
+    finally:
+        db.close()
+
+@event.listens_for(User, 'after_insert')
+def _photo_added(mapper, connection, target):
+    if target.photo_path:
+        adjust_references(connection, target.photo_path, 1)
+
+@event.listens_for(User, 'after_update')
+def _photo_changed(mapper, connection, target):
+    history = inspect(target).attrs.photo_path.history
+    if not history.has_changes():
+        return
+    for path in history.deleted:
+        if path:
+            adjust_references(connection, path, -1)
+    for path in history.added:
+        if path:
+            adjust_references(connection, path, 1)
+
+@event.listens_for(User, 'after_delete')
+def _photo_removed(mapper, connection, target):
+    if target.photo_path:
+        adjust_references(connection, target.photo_path, -1)
+
+def _resolve(path: str) -> str:
+    """Absolute path of a stored file, or None if it falls outside UPLOAD_FOLDER"""
+    root = os.path.abspath(settings.UPLOAD_FOLDER)
+    target = os.path.abspath(os.path.join(root, path))
+    return target if target.startswith(root + os.sep) else None
+
+def _trash(path: str) -> str:
+    """Move a stored file or directory into TRASH_FOLDER; returns its new path or None"""
+    source = _resolve(path)
+    if source is None or not os.path.exists(source):
+        return None
+    trash = os.path.join(settings.UPLOAD_FOLDER, TRASH_FOLDER)
+    os.makedirs(trash, exist_ok=True)
+    trashed = f'{TRASH_FOLDER}/{uuid.uuid4().hex}'
+    os.rename(source, os.path.join(settings.UPLOAD_FOLDER, trashed))
+    return trashed
+
+def _restore(trashed: str, path: str):
+    try:
+        os.rename(os.path.join(settings.UPLOAD_FOLDER, trashed), _resolve(path))
+    except OSError:
+        pass
+
+def _remove(path: str) -> int:
+    """Delete a stored file or variant directory; returns the bytes freed"""
+    target = _resolve(path)
+    if target is None:
+        return 0
+    if os.path.isdir(target):
+        freed = sum(
+            os.path.getsize(os.path.join(directory, name))
+            for directory, _, names in os.walk(target) for name in names
+        )
+        shutil.rmtree(target, ignore_errors=True)
+        return freed
+    if os.path.isfile(target):
+        freed = os.path.getsize(target)
+        os.remove(target)
+        return freed
+    return 0
+
+def collect_garbage(grace: int, batch_size: int = 500) -> dict:
+    """Delete files that have had no references for longer than grace seconds"""
+    cutoff = datetime.utcnow() - timedelta(seconds=grace)
+    removed = freed = 0
+
+    db = SessionLocal()
+    try:
+        paths = [
+            path for (path,) in db.query(StoredFile.path)
+            .filter(StoredFile.ref_count <= 0, StoredFile.released_at < cutoff)
+            .limit(batch_size)
+        ]
+        for path in paths:
+            # Re-checked in the DELETE, so a file referenced meanwhile survives
+            deleted = db.query(StoredFile).filter(
+                StoredFile.path == path, StoredFile.ref_count <= 0, StoredFile.released_at < cutoff
+            ).delete(synchronize_session=False)
+            if not deleted:
+                db.rollback()
+                continue
+            # Moved aside while the deleted row is still locked: a re-upload of
+            # the same content waits in touch() and then finds no files, so it
+            # writes them again instead of trusting a directory about to vanish
+            trashed = _trash(path)
+            try:
+                db.commit()
+            except Exception:
+                db.rollback()
+                if trashed:
+                    _restore(trashed, path)
+                raise
+            if trashed:
+                freed += _remove(trashed)
+            removed += 1
+    finally:
+        db.close()
+
+    # Trash left behind by an interrupted collection
+    trash = os.path.join(settings.UPLOAD_FOLDER, TRASH_FOLDER)
+    if os.path.isdir(trash):
+        for name in os.listdir(trash):
+            freed += _remove(f'{TRASH_FOLDER}/{name}')
+
+    # Staging files left behind by interrupted uploads
+    staging = os.path.join(settings.UPLOAD_FOLDER, STAGING_FOLDER)
+    if os.path.isdir(staging):
+        for name in os.listdir(staging):
+            path = os.path.join(staging, name)
+            try:
+                if os.path.getmtime(path) < time.time() - grace:
+                    freed += os.path.getsize(path)
+                    os.remove(path)
+            except OSError:
+                pass
+
+    return {'removed': removed, 'bytes_freed': freed}
+
+class UploadCollector:
+    """Daemon thread that deletes unreferenced uploads on a fixed interval"""
+
+    def __init__(self, interval: int, grace: int):
+        self.interval = interval
+        self.grace = grace
+        self._stop = threading.Event()
+        self._thread = None
+        self.runs = 0
+        self.errors = 0
+        self.files_removed = 0
+        self.bytes_freed = 0
+        self.last_error = None
+
+    def start(self):
+        """Start collecting unless already running"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='upload-collector', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        """Ask the collector to exit and wait for it"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                result = collect_garbage(self.grace)
+                self.files_removed += result['removed']
+                self.bytes_freed += result['bytes_freed']
+                self.last_error = None
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e)
+            self.runs += 1
+
+    def status(self) -> dict:
+        """Return collector state for monitoring"""
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'interval': self.interval,
+            'grace': self.grace,
+            'runs': self.runs,
+            'errors': self.errors,
+            'files_removed': self.files_removed,
+            'bytes_freed': self.bytes_freed,
+            'last_error': self.last_error
+        }
+
+upload_collector = UploadCollector(interval=settings.UPLOAD_GC_INTERVAL, grace=settings.UPLOAD_GC_GRACE)
@@ -0,0 +1,273 @@
+import base64
+import json
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import and_, event, func, inspect, or_, text
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models.user import User
+
+USERS_DEFAULT_LIMIT = 50
+USERS_MAX_LIMIT = 200
+SORT_COLUMNS = {
+    'id': User.id,
+    'created_at': User.created_at,
+    'email': User.email,
+    'first_name': User.first_name,
+    'last_name': User.last_name
+}
+MATCH_MODES = ('prefix', 'substring')
+# Fields kept per user by the trigram index, after the id
+INDEXED_COLUMNS = ('created_at', 'email', 'first_name', 'last_name')
+TRIGRAM = 3
+# Index changes flushed in a session, applied once it commits
+PENDING_KEY = 'user_index_pending'
+# Pending change for a user whose indexed columns were not loaded: rebuild instead
+_UNKNOWN = object()
+
+# Row count from catalog metadata instead of a table scan
+_TABLE_ROWS_MSSQL = text(
+    "SELECT SUM(rows) FROM sys.partitions WHERE object_id = OBJECT_ID('users') AND index_id IN (0, 1)"
+)
+
+class SearchError(Exception):
+    """Invalid search, sort or cursor parameters"""
+
+def _trigrams(value: str) -> set:
+    return {value[i:i + TRIGRAM] for i in range(len(value) - TRIGRAM + 1)}
+
+def _sort_key(value):
+    # SQL Server's default collation compares strings case-insensitively
+    return value.lower() if isinstance(value, str) else value
+
+class UserIndex:
+    """In-process trigram index over user names and emails
+
+    Substring searches (LIKE '%q%') cannot use a B-tree index, so candidate
+    ids come from trigram posting sets instead and are then verified. This
+    process's own writes are applied through ORM events when they commit;
+    writes from other processes show up when the index is rebuilt after
+    max_age seconds.
+    """
+
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self._entries = {}
+        self._postings = {}
+        self._built_at = None
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def _add(self, entry: tuple):
+        self._entries[entry[0]] = entry
+        for trigram in _trigrams(entry[-1]):
+            self._postings.setdefault(trigram, set()).add(entry[0])
+
+    def _remove(self, user_id: int):
+        entry = self._entries.pop(user_id, None)
+        if entry is None:
+            return
+        for trigram in _trigrams(entry[-1]):
+            postings = self._postings.get(trigram)
+            if postings is not None:
+                postings.discard(user_id)
+                if not postings:
+                    del self._postings[trigram]
+
+    @staticmethod
+    def _entry(user_id, created_at, email, first_name, last_name) -> tuple:
+        searchable = f'{first_name} {last_name} {email}'.lower()
+        return (user_id, created_at, email, first_name, last_name, searchable)
+
+    def _ensure_built(self, db: Session):
+        if self._built_at is not None and time.monotonic() - self._built_at < self.max_age:
+            return
+        rows = db.query(User.id, *(getattr(User, name) for name in INDEXED_COLUMNS)).all()
+        self._entries = {}
+        self._postings = {}
+        for row in rows:
+            self._add(self._entry(*row))
+        self._built_at = time.monotonic()
+        self.builds += 1
+
+    @classmethod
+    def snapshot(cls, user: User):
+        """Entry for a flushed user, or _UNKNOWN if an indexed column is not loaded"""
+        # Read loaded values only: a lazy load here would run inside the flush
+        loaded = inspect(user).dict
+        if any(name not in loaded for name in INDEXED_COLUMNS):
+            return _UNKNOWN  # e.g. server default not fetched back
+        return cls._entry(user.id, *(loaded[name] for name in INDEXED_COLUMNS))
+
+    def apply(self, changes: dict):
+        """Apply committed changes {user_id: entry, or None once deleted} (no-op until built)"""
+        with self._lock:
+            if self._built_at is None:
+                return
+            for user_id, entry in changes.items():
+                if entry is _UNKNOWN:
+                    self._built_at = None  # rebuild on next search
+                    return
+                self._remove(user_id)
+                if entry is not None:
+                    self._add(entry)
+
+    def search(self, db: Session, query: str) -> list:
+        """Entries whose name or email contains query (at least TRIGRAM characters)"""
+        query = query.lower()
+        with self._lock:
+            self._ensure_built(db)
+            # Intersect the rarest posting sets first
+            postings = sorted((self._postings.get(trigram, set()) for trigram in _trigrams(query)), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:]) if postings else set()
+            return [self._entries[user_id] for user_id in candidates if query in self._entries[user_id][-1]]
+
+user_index = UserIndex(max_age=settings.USER_SEARCH_INDEX_MAX_AGE)
+
+def _pending(target: User) -> dict:
+    return inspect(target).session.info.setdefault(PENDING_KEY, {})
+
+@event.listens_for(User, 'after_insert')
+@event.listens_for(User, 'after_update')
+def _index_user(mapper, connection, target):
+    """Record the flushed values; a rolled-back write never reaches the index"""
+    _pending(target)[target.id] = UserIndex.snapshot(target)
+
+@event.listens_for(User, 'after_delete')
+def _unindex_user(mapper, connection, target):
+    _pending(target)[target.id] = None
+
+@event.listens_for(Session, 'after_commit')
+def _index_after_commit(session):
+    changes = session.info.pop(PENDING_KEY, None)
+    if changes:
+        user_index.apply(changes)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop(PENDING_KEY, None)
+
+def _encode_cursor(value, user_id: int) -> str:
+    """Encode the (sort value, id) keyset position of a row"""
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value, user_id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def _decode_cursor(cursor: str, sort: str) -> tuple:
+    try:
+        value, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if sort == 'created_at':
+            value = datetime.fromisoformat(value)
+        return value, int(user_id)
+    except Exception:
+        raise SearchError('Invalid cursor')
+
+def _parse(args) -> dict:
+    sort = args.get('sort', '-id')
+    descending = sort.startswith('-')
+    sort = sort.lstrip('-')
+    if sort not in SORT_COLUMNS:
+        raise SearchError(f'sort must be one of {", ".join(SORT_COLUMNS)} (prefix - for descending)')
+
+    match = args.get('match', 'prefix')
+    if match not in MATCH_MODES:
+        raise SearchError(f'match must be one of {", ".join(MATCH_MODES)}')
+
+    try:
+        limit = min(int(args.get('limit', USERS_DEFAULT_LIMIT)), USERS_MAX_LIMIT)
+    except ValueError:
+        raise SearchError('limit must be an integer')
+    if limit < 1:
+        raise SearchError('limit must be positive')
+
+    cursor = args.get('cursor')
+    return {
+        'q': (args.get('q') or '').strip(),
+        'match': match,
+        'sort': sort,
+        'descending': descending,
+        'limit': limit,
+        'cursor': _decode_cursor(cursor, sort) if cursor else None
+    }
+
+def _like_prefix(value: str) -> str:
+    escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_').replace('[', '\\[')
+    return escaped + '%'
+
+def _table_rows(db: Session) -> int:
+    if db.get_bind().dialect.name == 'mssql':
+        return int(db.execute(_TABLE_ROWS_MSSQL).scalar() or 0)
+    return db.query(func.count(User.id)).scalar()
+
+def _search_sql(db: Session, params: dict) -> tuple:
+    """Prefix search and plain listing: index seeks with a keyset on (sort column, id)"""
+    column = SORT_COLUMNS[params['sort']]
+    descending = params['descending']
+    query = db.query(User)
+
+    if params['q']:
+        pattern = _like_prefix(params['q'])
+        query = query.filter(or_(
+            User.email.like(pattern, escape='\\'),
+            User.first_name.like(pattern, escape='\\'),
+            User.last_name.like(pattern, escape='\\')
+        ))
+
+    # Totals only on the first page; clients keep them while paging
+    total = None
+    if params['cursor'] is None:
+        total = query.order_by(None).count() if params['q'] else _table_rows(db)
+
+    if params['cursor'] is not None:
+        value, user_id = params['cursor']
+        if column is User.id:
+            query = query.filter(User.id < user_id if descending else User.id > user_id)
+        elif descending:
+            query = query.filter(or_(column < value, and_(column == value, User.id < user_id)))
+        else:
+            query = query.filter(or_(column > value, and_(column == value, User.id > user_id)))
+
+    order = [column.desc(), User.id.desc()] if descending else [column.asc(), User.id.asc()]
+    if column is User.id:
+        order = order[:1]
+    # Fetch one extra row to know whether another page exists
+    users = query.order_by(*order).limit(params['limit'] + 1).all()
+    return users, total
+
+def _search_index(db: Session, params: dict) -> tuple:
+    """Substring search: trigram candidates, sorted and paged in process"""
+    position = (('id',) + INDEXED_COLUMNS).index(params['sort'])
+    matches = user_index.search(db, params['q'])
+    total = len(matches)
+
+    def key(entry):
+        return (_sort_key(entry[position]), entry[0])
+
+    matches.sort(key=key, reverse=params['descending'])
+    if params['cursor'] is not None:
+        value, user_id = params['cursor']
+        after = (_sort_key(value), user_id)
+        matches = [entry for entry in matches if (key(entry) < after if params['descending'] else key(entry) > after)]
+
+    page_ids = [entry[0] for entry in matches[:params['limit'] + 1]]
+    rows = {user.id: user for user in db.query(User).filter(User.id.in_(page_ids))} if page_ids else {}
+    return [rows[user_id] for user_id in page_ids if user_id in rows], (total if params['cursor'] is None else None)
+
+def search_users(db: Session, args) -> dict:
+    """One page of users for the admin panel
+
+    Returns the page, the cursor of the next page (or None) and the total
+    number of matches (first page only).
+    """
+    params = _parse(args)
+    if params['match'] == 'substring' and len(params['q']) >= TRIGRAM:
+        users, total = _search_index(db, params)
+    else:
+        users, total = _search_sql(db, params)
+
+    limit = params['limit']
+    next_cursor = None
+    if len(users) > limit:
+        last = users[limit - 1]
+        next_cursor = _encode_cursor(getattr(last, params['sort']), last.id)
+    return {'users': users[:limit], 'next_cursor': next_cursor, 'total': total}
@@ -0,0 +1,200 @@
+import threading
+import time
+from collections import OrderedDict
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from ..core.config import settings
+
+class CircuitOpenError(requests.RequestException):
+    """Upstream marked unhealthy; calls fail fast until the cooldown ends"""
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a single half-open probe"""
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trips = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return 'half-open'
+        return 'open'
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go upstream
+
+        A call let through while half-open is the probe; release() must
+        follow it whatever the outcome.
+        """
+        with self._lock:
+            state = self.state
+            if state == 'open' or (state == 'half-open' and self._probing):
+                raise CircuitOpenError('USGS upstream temporarily unavailable')
+            if state == 'half-open':
+                self._probing = True
+
+    def release(self):
+        """End the half-open probe, if any, without recording an outcome"""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                if self.opened_at is None:
+                    self.trips += 1
+                self.opened_at = time.monotonic()
+
+class UpstreamClient:
+    """Shared keep-alive HTTP client for USGS with retries and conditional GET
+
+    One requests.Session (and its urllib3 connection pool) is shared by all
+    threads. Bodies are remembered with their ETag/Last-Modified validators,
+    so an unchanged feed is revalidated with a 304 instead of downloaded again.
+    The remembered bodies are bounded by USGS_REVALIDATION_ENTRIES and
+    USGS_REVALIDATION_MAX_BYTES, least recently used first out.
+    """
+
+    def __init__(self):
+        retry = Retry(
+            total=settings.USGS_HTTP_RETRIES,
+            backoff_factor=settings.USGS_HTTP_BACKOFF,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        self._adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=settings.USGS_HTTP_POOL_SIZE,
+            max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount('https://', self._adapter)
+        self.session.mount('http://', self._adapter)
+        self.breaker = CircuitBreaker(settings.USGS_BREAKER_THRESHOLD, settings.USGS_BREAKER_COOLDOWN)
+        self.timeout = (settings.USGS_HTTP_CONNECT_TIMEOUT, settings.USGS_HTTP_READ_TIMEOUT)
+
+        self._validators = OrderedDict()
+        self._validator_bytes = 0
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.not_modified = 0
+        self.bytes_downloaded = 0
+        self.bytes_revalidated = 0
+
+    def _forget(self, key: tuple):
+        entry = self._validators.pop(key, None)
+        if entry is not None:
+            self._validator_bytes -= len(entry[2])
+
+    def _remember(self, key: tuple, response: requests.Response):
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        body = response.content
+        with self._lock:
+            self._forget(key)
+            # A body larger than the whole budget is simply downloaded again next time
+            if (etag or last_modified) and len(body) <= settings.USGS_REVALIDATION_MAX_BYTES:
+                self._validators[key] = (etag, last_modified, body)
+                self._validator_bytes += len(body)
+                while len(self._validators) > settings.USGS_REVALIDATION_ENTRIES or \
+                        self._validator_bytes > settings.USGS_REVALIDATION_MAX_BYTES:
+                    self._forget(next(iter(self._validators)))
+
+    def get(self, url: str, params: dict = None) -> bytes:
+        """GET url and return the body, revalidating a remembered copy when possible"""
+        self.breaker.before_call()
+        key = (url, tuple(sorted((params or {}).items())))
+
+        headers = {}
+        with self._lock:
+            self.requests += 1
+            cached = self._validators.get(key)
+            if cached:
+                self._validators.move_to_end(key)
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        try:
+            response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            retries = response.raw.retries
+            if retries is not None:
+                with self._lock:
+                    self.retries += len(retries.history)
+            if response.status_code >= 500 or response.status_code == 429:
+                response.raise_for_status()
+            # Client errors (bad parameters) are not the upstream's fault
+            self.breaker.record_success()
+        except requests.RequestException:
+            with self._lock:
+                self.errors += 1
+            self.breaker.record_failure()
+            raise
+        finally:
+            # Any other exception must not leave the half-open probe taken forever
+            self.breaker.release()
+
+        if response.status_code == 304 and cached:
+            with self._lock:
+                self.not_modified += 1
+                self.bytes_revalidated += len(cached[2])
+            return cached[2]
+
+        response.raise_for_status()
+        with self._lock:
+            self.bytes_downloaded += len(response.content)
+        self._remember(key, response)
+        return response.content
+
+    def stats(self) -> dict:
+        """Return pool, retry, breaker and revalidation counters"""
+        manager = self._adapter.poolmanager
+        pools = [pool for pool in (manager.pools.get(key) for key in manager.pools.keys()) if pool is not None]
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'errors': self.errors,
+                'retries': self.retries,
+                'not_modified': self.not_modified,
+                'bytes_downloaded': self.bytes_downloaded,
+                'bytes_revalidated': self.bytes_revalidated,
+                'validators': len(self._validators),
+                'validator_bytes': self._validator_bytes,
+                'breaker': {
+                    'state': self.breaker.state,
+                    'consecutive_failures': self.breaker.failures,
+                    'trips': self.breaker.trips
+                },
+                'pool': {
+                    'hosts': len(pools),
+                    'max_size': settings.USGS_HTTP_POOL_SIZE,
+                    'connections_opened': sum(pool.num_connections for pool in pools),
+                    'requests_sent': sum(pool.num_requests for pool in pools)
+                }
+            }
+
+usgs_client = UpstreamClient()
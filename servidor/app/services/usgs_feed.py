@@ -0,0 +1,186 @@
+import json
+import time
+from datetime import datetime
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+_NO_POINT = (None, None, None)
+
+def decode_feed(content: bytes) -> dict:
+    """Decode a USGS GeoJSON body with the fastest available decoder"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+def _local_times(time_ms: np.ndarray) -> np.ndarray:
+    """Convert epoch milliseconds to naive local datetime64[us]
+
+    Matches datetime.fromtimestamp(); zones without DST use a single offset,
+    others fall back to a per-event conversion.
+    """
+    if not time.daylight:
+        offset_ms = -time.timezone * 1000
+        return (time_ms + offset_ms).astype('datetime64[ms]').astype('datetime64[us]')
+    return np.array(
+        [datetime.fromtimestamp(value / 1000) for value in time_ms.tolist()],
+        dtype='datetime64[us]'
+    )
+
+def _epoch_ms(event_times: list) -> np.ndarray:
+    """Convert naive local datetimes back to epoch milliseconds (inverse of _local_times)"""
+    if not time.daylight:
+        offset_ms = -time.timezone * 1000
+        local_ms = np.array(event_times, dtype='datetime64[ms]').astype(np.int64)
+        return local_ms - offset_ms
+    return np.array([round(value.timestamp() * 1000) for value in event_times], dtype=np.int64)
+
+class FeedColumns:
+    """Columnar view of a USGS feed: one NumPy array per field"""
+
+    def __init__(self, ids, places, magnitude, depth, latitude, longitude, time_ms, updated_ms):
+        self.ids = ids
+        self.places = places
+        self.magnitude = magnitude
+        self.depth = depth
+        self.latitude = latitude
+        self.longitude = longitude
+        self.time_ms = time_ms
+        self.updated_ms = updated_ms
+        self._records = None
+
+    def __len__(self):
+        return len(self.magnitude)
+
+    def filter(self, mask: np.ndarray) -> 'FeedColumns':
+        """Return the rows selected by a boolean mask or index array"""
+        return FeedColumns(
+            self.ids[mask], self.places[mask], self.magnitude[mask], self.depth[mask],
+            self.latitude[mask], self.longitude[mask], self.time_ms[mask], self.updated_ms[mask]
+        )
+
+    @staticmethod
+    def concat(parts: list) -> 'FeedColumns':
+        """Stack several feeds into one"""
+        if not parts:
+            return parse_feed({})
+        fields = ('ids', 'places', 'magnitude', 'depth', 'latitude', 'longitude', 'time_ms', 'updated_ms')
+        return FeedColumns(*[np.concatenate([getattr(part, field) for part in parts]) for field in fields])
+
+    @staticmethod
+    def from_rows(rows: list) -> 'FeedColumns':
+        """Build columns from stored (source_id, place, magnitude, depth, latitude,
+        longitude, event_time, updated_at) tuples"""
+        if not rows:
+            return parse_feed({})
+        source_ids, places, magnitude, depth, latitude, longitude, event_times, updated = zip(*rows)
+        updated_ms = np.array(
+            [value if value is not None else datetime(1970, 1, 1) for value in updated], dtype='datetime64[ms]'
+        ).astype(np.int64)
+        return FeedColumns(
+            np.array(source_ids, dtype=object),
+            np.array(places, dtype=object),
+            np.array(magnitude, dtype=np.float64),
+            np.array(depth, dtype=np.float64),
+            np.array(latitude, dtype=np.float64),
+            np.array(longitude, dtype=np.float64),
+            _epoch_ms(list(event_times)),
+            updated_ms
+        )
+
+    def deduplicate(self) -> 'FeedColumns':
+        """Keep one row per event id (the most recently updated), newest events first"""
+        if not len(self):
+            return self
+        # Sort by id, then updated descending, so the first row per id is the latest revision
+        order = np.lexsort((-self.updated_ms, self.ids.astype(str)))
+        ids = self.ids[order]
+        first = np.ones(len(ids), dtype=bool)
+        first[1:] = ids[1:] != ids[:-1]
+        first |= ids == ''
+        mask = np.zeros(len(self), dtype=bool)
+        mask[order[first]] = True
+        unique = self.filter(mask)
+        return unique.filter(np.argsort(-unique.time_ms, kind='stable'))
+
+    def event_times(self) -> np.ndarray:
+        """Event times as naive local datetime64[us], like the legacy parser"""
+        return _local_times(self.time_ms)
+
+    def to_records(self) -> list:
+        """Format rows as /live payload dicts (memoized)"""
+        if self._records is None:
+            times = np.datetime_as_string(self.event_times(), unit='us').tolist()
+            self._records = [
+                {
+                    'id': source_id,
+                    'place': place,
+                    'magnitude': magnitude,
+                    'depth': depth,
+                    'latitude': latitude,
+                    'longitude': longitude,
+                    'event_time': event_time
+                }
+                for source_id, place, magnitude, depth, latitude, longitude, event_time in zip(
+                    self.ids.tolist(), self.places.tolist(), self.magnitude.tolist(), self.depth.tolist(),
+                    self.latitude.tolist(), self.longitude.tolist(), times
+                )
+            ]
+        return self._records
+
+    def to_rows(self) -> list:
+        """Format rows as Earthquake column values"""
+        event_times = self.event_times().tolist()
+        updated = self.updated_ms.astype('datetime64[ms]').astype('datetime64[us]').tolist()
+        has_updated = self.updated_ms > 0
+        return [
+            {
+                'source_id': source_id,
+                'place': place[:255],
+                'magnitude': magnitude,
+                'depth': depth,
+                'latitude': latitude,
+                'longitude': longitude,
+                'event_time': event_time,
+                'updated_at': updated_at if present else None
+            }
+            for source_id, place, magnitude, depth, latitude, longitude, event_time, updated_at, present in zip(
+                self.ids.tolist(), self.places.tolist(), self.magnitude.tolist(), self.depth.tolist(),
+                self.latitude.tolist(), self.longitude.tolist(), event_times, updated, has_updated.tolist()
+            )
+        ]
+
+def parse_feed(data: dict) -> FeedColumns:
+    """Extract a decoded USGS feed into columns and drop unusable events
+
+    Each field is pulled with one comprehension and converted to an array in
+    a single call; events without a magnitude or three coordinates are then
+    removed in bulk and missing depth becomes 0.
+    """
+    features = data.get('features') or []
+    props = [feature.get('properties') or {} for feature in features]
+    coords = [(feature.get('geometry') or {}).get('coordinates') or () for feature in features]
+    has_coords = np.array([len(point) >= 3 for point in coords], dtype=bool)
+    points = [point if len(point) >= 3 else _NO_POINT for point in coords]
+
+    longitude = np.array([point[0] for point in points], dtype=np.float64)
+    latitude = np.array([point[1] for point in points], dtype=np.float64)
+    depth = np.array([point[2] for point in points], dtype=np.float64)
+    magnitude = np.array([prop.get('mag') for prop in props], dtype=np.float64)
+
+    valid = has_coords & ~(np.isnan(longitude) | np.isnan(latitude) | np.isnan(magnitude))
+
+    columns = FeedColumns(
+        np.array([feature.get('id') or '' for feature in features], dtype=object),
+        np.array([prop.get('place') or 'Unknown location' for prop in props], dtype=object),
+        magnitude,
+        np.nan_to_num(depth, nan=0.0),
+        latitude,
+        longitude,
+        np.array([prop.get('time') or 0 for prop in props], dtype=np.int64),
+        np.array([prop.get('updated') or 0 for prop in props], dtype=np.int64)
+    )
+    return columns.filter(valid)
@@ -0,0 +1,85 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+import math
+from ..core.config import settings
+from .usgs_client import usgs_client
+from .usgs_feed import FeedColumns, decode_feed, parse_feed
+
+# Windows shorter than this are fetched whole even if USGS truncates them
+MIN_WINDOW = timedelta(minutes=1)
+TIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+# Shared pool so concurrent requests cannot multiply upstream connections
+_executor = ThreadPoolExecutor(max_workers=settings.USGS_FETCH_WORKERS, thread_name_prefix='usgs-fetch')
+
+class TooManyEvents(Exception):
+    """The query matches more events than we are willing to return"""
+
+def _count_url() -> str:
+    return settings.USGS_API_URL.rsplit('/', 1)[0] + '/count'
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', ''))
+
+def count_events(params: dict) -> int:
+    """Ask USGS how many events a query matches"""
+    query = {key: value for key, value in params.items() if key not in ('limit', 'offset', 'orderby')}
+    query['format'] = 'geojson'
+    return int(decode_feed(usgs_client.get(_count_url(), params=query))['count'])
+
+def fetch_window(params: dict) -> tuple:
+    """Fetch one query from USGS; returns (columns, raw feature count)"""
+    data = decode_feed(usgs_client.get(settings.USGS_API_URL, params=params))
+    return parse_feed(data), len(data.get('features') or [])
+
+def _split(start: datetime, end: datetime, parts: int) -> list:
+    step = (end - start) / parts
+    return [(start + step * i, end if i == parts - 1 else start + step * (i + 1)) for i in range(parts)]
+
+def fetch_all(params: dict, max_events: int = None) -> FeedColumns:
+    """Fetch every event of a query, splitting its time range into parallel windows
+
+    A count query sizes the windows; any window that still comes back full
+    is bisected and refetched. Results are merged and deduplicated by id.
+    """
+    total = count_events(params)
+    if max_events is not None and total > max_events:
+        raise TooManyEvents(f'Query matches {total} events (limit {max_events}); narrow the filters')
+    if total == 0:
+        return FeedColumns.concat([])
+
+    start = _parse_time(params['starttime'])
+    end = _parse_time(params['endtime']) if params.get('endtime') else datetime.utcnow()
+    per_window = settings.USGS_WINDOW_TARGET_EVENTS
+    limit = settings.USGS_MAX_EVENTS_PER_REQUEST
+
+    def submit(window_start: datetime, window_end: datetime):
+        window_params = dict(params, starttime=window_start.strftime(TIME_FORMAT),
+                             endtime=window_end.strftime(TIME_FORMAT), limit=limit)
+        window_params.pop('offset', None)
+        future = _executor.submit(fetch_window, window_params)
+        pending[future] = (window_start, window_end)
+
+    pending = {}
+    for window in _split(start, end, max(1, math.ceil(total / per_window))):
+        submit(*window)
+
+    parts = []
+    try:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                window_start, window_end = pending.pop(future)
+                columns, returned = future.result()
+                if returned >= limit and window_end - window_start > MIN_WINDOW:
+                    # Denser than the count suggested: split it and try again
+                    for window in _split(window_start, window_end, 2):
+                        submit(*window)
+                else:
+                    parts.append(columns)
+    except Exception:
+        for future in pending:
+            future.cancel()
+        raise
+
+    return FeedColumns.concat(parts).deduplicate()
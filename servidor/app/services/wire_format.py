@@ -0,0 +1,75 @@
+import json
+import numpy as np
+from .usgs_feed import FeedColumns
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+COLUMNS_MIMETYPE = 'application/vnd.seismic.columns+json'
+MSGPACK_MIMETYPE = 'application/vnd.seismic.columns+msgpack'
+MSGPACK_ALIASES = (MSGPACK_MIMETYPE, 'application/msgpack', 'application/x-msgpack')
+
+# Quantization steps: 1e-5 degrees (~1 m), 0.01 magnitude, 10 m depth
+COORDINATE_SCALE = 100000
+MAGNITUDE_SCALE = 100
+DEPTH_SCALE = 100
+
+class WireFormatError(Exception):
+    """Requested representation cannot be produced"""
+
+def negotiate(args, accept_mimetypes) -> str:
+    """Pick 'records', 'columns' or 'msgpack' from ?format= or the Accept header"""
+    fmt = args.get('format')
+    if fmt:
+        if fmt not in ('json', 'columns', 'msgpack'):
+            raise WireFormatError('format must be json, columns or msgpack')
+        fmt = 'records' if fmt == 'json' else fmt
+    else:
+        best = accept_mimetypes.best_match(('application/json', COLUMNS_MIMETYPE) + MSGPACK_ALIASES)
+        fmt = 'msgpack' if best in MSGPACK_ALIASES else 'columns' if best == COLUMNS_MIMETYPE else 'records'
+    if fmt == 'msgpack' and msgpack is None:
+        raise WireFormatError('MessagePack output requires the msgpack package')
+    return fmt
+
+def _quantize(values: np.ndarray, scale: int) -> list:
+    return np.rint(values * scale).astype(np.int64).tolist()
+
+def _delta(values: np.ndarray) -> list:
+    if not len(values):
+        return []
+    return np.diff(values, prepend=0).tolist()
+
+def columns_payload(columns: FeedColumns) -> dict:
+    """Parallel-array form of a set of events
+
+    Coordinates, magnitude and depth are integers (divide by the matching
+    scale); time holds epoch milliseconds, each entry a delta from the one
+    before (the first from 0), so a prefix sum restores them.
+    """
+    return {
+        'count': len(columns),
+        'scale': {'coordinates': COORDINATE_SCALE, 'magnitude': MAGNITUDE_SCALE, 'depth': DEPTH_SCALE},
+        'id': columns.ids.tolist(),
+        'place': columns.places.tolist(),
+        'magnitude': _quantize(columns.magnitude, MAGNITUDE_SCALE),
+        'depth': _quantize(columns.depth, DEPTH_SCALE),
+        'latitude': _quantize(columns.latitude, COORDINATE_SCALE),
+        'longitude': _quantize(columns.longitude, COORDINATE_SCALE),
+        'time': _delta(columns.time_ms)
+    }
+
+def encode_columns(columns: FeedColumns, fmt: str) -> tuple:
+    """Serialize events for a 'columns' or 'msgpack' response; returns (body, mimetype)"""
+    payload = columns_payload(columns)
+    if fmt == 'msgpack':
+        return msgpack.packb(payload), MSGPACK_MIMETYPE
+    if orjson is not None:
+        return orjson.dumps(payload), COLUMNS_MIMETYPE
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8'), COLUMNS_MIMETYPE
@@ -0,0 +1,86 @@
+import math
+from typing import List, Tuple
+
+# Size of a spatial grid cell in degrees; changing it requires re-running the backfill
+GRID_CELL_DEGREES = 1.0
+GRID_ROWS = int(180 / GRID_CELL_DEGREES)
+GRID_COLUMNS = int(360 / GRID_CELL_DEGREES)
+
+# Mean Earth radius (IUGG) and the farthest any two points can be apart
+EARTH_RADIUS_KM = 6371.0088
+MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM
+
+def _row(latitude: float) -> int:
+    return min(max(int(math.floor((latitude + 90) / GRID_CELL_DEGREES)), 0), GRID_ROWS - 1)
+
+def _column(longitude: float) -> int:
+    return min(max(int(math.floor((longitude + 180) / GRID_CELL_DEGREES)), 0), GRID_COLUMNS - 1)
+
+def grid_cell(latitude: float, longitude: float) -> int:
+    """Return the grid cell id containing a point (row-major, west to east)"""
+    return _row(latitude) * GRID_COLUMNS + _column(longitude)
+
+def crosses_antimeridian(min_lon: float, max_lon: float) -> bool:
+    """A box whose west edge is east of its east edge wraps across 180°"""
+    return min_lon > max_lon
+
+def wrap_longitude(longitude: float) -> float:
+    """Bring a longitude into [-180, 180]"""
+    if -180.0 <= longitude <= 180.0:
+        return longitude
+    return (longitude + 180.0) % 360.0 - 180.0
+
+def longitude_spans(min_lon: float, max_lon: float) -> List[Tuple[float, float]]:
+    """Split a longitude range into non-wrapping spans
+
+    Map viewports may report edges beyond ±180 after panning across the
+    date line; those are wrapped first.
+    """
+    if max_lon - min_lon >= 360.0:
+        return [(-180.0, 180.0)]
+    min_lon, max_lon = wrap_longitude(min_lon), wrap_longitude(max_lon)
+    if crosses_antimeridian(min_lon, max_lon):
+        return [(min_lon, 180.0), (-180.0, max_lon)]
+    return [(min_lon, max_lon)]
+
+def radius_bounds(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """Return the (min_lat, max_lat, min_lon, max_lon) box enclosing a circle
+
+    Longitude edges may fall beyond ±180 (see longitude_spans); circles that
+    contain a pole cover every longitude.
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    min_lat = latitude - math.degrees(angular)
+    max_lat = latitude + math.degrees(angular)
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+
+    ratio = math.sin(angular) / math.cos(math.radians(latitude))
+    if ratio >= 1.0:
+        return min_lat, max_lat, -180.0, 180.0
+    delta_lon = math.degrees(math.asin(ratio))
+    return min_lat, max_lat, longitude - delta_lon, longitude + delta_lon
+
+def grid_cell_ranges(min_lat: float, max_lat: float, min_lon: float, max_lon: float) -> List[Tuple[int, int]]:
+    """Return inclusive grid cell id ranges covering a bounding box
+
+    Cells of one grid row are contiguous, so a box needs at most one range
+    per row and span (two spans when it crosses the antimeridian).
+    """
+    column_spans = [(_column(west), _column(east)) for west, east in longitude_spans(min_lon, max_lon)]
+
+    ranges = []
+    for row in range(_row(min_lat), _row(max_lat) + 1):
+        base = row * GRID_COLUMNS
+        for first, last in column_spans:
+            ranges.append((base + first, base + last))
+
+    # Merge ranges that touch (full-width rows collapse into one range)
+    ranges.sort()
+    merged = [ranges[0]] if ranges else []
+    for first, last in ranges[1:]:
+        if first <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
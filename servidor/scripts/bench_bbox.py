@@ -0,0 +1,94 @@
+"""Benchmark bounding-box query latency on earthquakes as the table grows.
+
+Compares plain latitude/longitude range predicates against the grid_cell
+access path for a regional box and one crossing the antimeridian.
+
+Usage:
+    python scripts/bench_bbox.py --db "mssql+pyodbc://..." --sizes 10000 100000 1000000
+
+Run it against a scratch database: it creates and fills the earthquakes table.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+BOXES = {
+    'regional': (30.0, 46.0, 128.0, 146.0),
+    'antimeridian': (-25.0, -10.0, 170.0, -170.0),
+}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default='sqlite:///bench_bbox.db')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ['SQLALCHEMY_DATABASE_URI'] = args.db
+    os.environ.setdefault('FLASK_DEBUG', 'False')
+
+    from sqlalchemy import and_, create_engine, func, insert, or_
+    from sqlalchemy.orm import Session
+    from app.db.session import Base
+    from app.models.earthquake import Earthquake
+    from app.utils.geo import crosses_antimeridian, grid_cell_ranges
+
+    engine = create_engine(args.db)
+    Base.metadata.drop_all(engine, tables=[Earthquake.__table__])
+    Base.metadata.create_all(engine, tables=[Earthquake.__table__])
+
+    def range_filter(min_lat, max_lat, min_lon, max_lon):
+        lon = (or_(Earthquake.longitude >= min_lon, Earthquake.longitude <= max_lon)
+               if crosses_antimeridian(min_lon, max_lon)
+               else and_(Earthquake.longitude >= min_lon, Earthquake.longitude <= max_lon))
+        return and_(Earthquake.latitude >= min_lat, Earthquake.latitude <= max_lat, lon)
+
+    def grid_filter(min_lat, max_lat, min_lon, max_lon):
+        cells = or_(*[Earthquake.grid_cell.between(first, last)
+                      for first, last in grid_cell_ranges(min_lat, max_lat, min_lon, max_lon)])
+        return and_(cells, range_filter(min_lat, max_lat, min_lon, max_lon))
+
+    def timed(session, condition):
+        samples = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            count = session.query(func.count(Earthquake.id)).filter(condition).scalar()
+            samples.append((time.perf_counter() - started) * 1000)
+        return count, statistics.median(samples)
+
+    now = datetime.utcnow()
+    rows = 0
+    print(f"{'rows':>10} {'box':>13} {'matches':>8} {'range ms':>9} {'grid ms':>8}")
+    for size in sorted(args.sizes):
+        with engine.begin() as connection:
+            while rows < size:
+                batch = min(10000, size - rows)
+                connection.execute(insert(Earthquake), [
+                    {
+                        'place': 'Benchmark',
+                        'magnitude': random.uniform(2.5, 8.0),
+                        'depth': random.uniform(0, 700),
+                        'latitude': random.uniform(-90, 90),
+                        'longitude': random.uniform(-180, 180),
+                        'event_time': now - timedelta(seconds=random.randint(0, 365 * 86400)),
+                        'source_id': f'bench{rows + i}',
+                        'created_at': now
+                    }
+                    for i in range(batch)
+                ])
+                rows += batch
+
+        with Session(engine) as session:
+            for name, box in BOXES.items():
+                matches, range_ms = timed(session, range_filter(*box))
+                _, grid_ms = timed(session, grid_filter(*box))
+                print(f'{rows:>10} {name:>13} {matches:>8} {range_ms:>9.2f} {grid_ms:>8.2f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Micro-benchmark: legacy per-feature loop vs columnar USGS feed parsing.
+
+Usage:
+    python scripts/bench_feed_parse.py --events 20000 --repeat 10
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.usgs_feed import decode_feed, parse_feed
+
+def synthetic_feed(count: int) -> bytes:
+    """Build a GeoJSON body shaped like the USGS FDSN response"""
+    now_ms = int(time.time() * 1000)
+    features = [
+        {
+            'type': 'Feature',
+            'id': f'us{i:08d}',
+            'properties': {
+                'mag': round(random.uniform(2.5, 8.0), 1),
+                'place': f'{random.randint(1, 300)} km N of Somewhere',
+                'time': now_ms - random.randint(0, 30 * 86400000),
+                'updated': now_ms,
+                'status': 'reviewed',
+                'type': 'earthquake'
+            },
+            'geometry': {
+                'type': 'Point',
+                'coordinates': [random.uniform(-180, 180), random.uniform(-90, 90), random.uniform(0, 700)]
+            }
+        }
+        for i in range(count)
+    ]
+    return json.dumps({'type': 'FeatureCollection', 'features': features}).encode('utf-8')
+
+def legacy_parse(content: bytes) -> list:
+    """The original loop from get_live_earthquakes"""
+    data = json.loads(content)
+    earthquakes = []
+    for feature in data.get('features', []):
+        props = feature.get('properties', {})
+        coords = feature.get('geometry', {}).get('coordinates', [])
+        if len(coords) >= 3 and props.get('mag') is not None:
+            earthquakes.append({
+                'id': feature.get('id', ''),
+                'place': props.get('place', 'Unknown location'),
+                'magnitude': float(props.get('mag', 0)),
+                'depth': float(coords[2]) if coords[2] is not None else 0,
+                'latitude': float(coords[1]),
+                'longitude': float(coords[0]),
+                'event_time': datetime.fromtimestamp(props.get('time', 0) / 1000).isoformat()
+            })
+    return earthquakes
+
+def columnar_parse(content: bytes) -> list:
+    return parse_feed(decode_feed(content)).to_records()
+
+def columnar_only(content: bytes):
+    return parse_feed(decode_feed(content))
+
+def timed(function, content: bytes, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(content)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    content = synthetic_feed(args.events)
+    assert len(legacy_parse(content)) == len(columnar_parse(content))
+
+    legacy_ms = timed(legacy_parse, content, args.repeat)
+    records_ms = timed(columnar_parse, content, args.repeat)
+    columns_ms = timed(columnar_only, content, args.repeat)
+
+    print(f'{args.events} events, {len(content) / 1e6:.1f} MB, median of {args.repeat} runs')
+    print(f'legacy loop          {legacy_ms:8.1f} ms')
+    print(f'columnar + records   {records_ms:8.1f} ms  ({legacy_ms / records_ms:.1f}x)')
+    print(f'columnar only        {columns_ms:8.1f} ms  ({legacy_ms / columns_ms:.1f}x)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Login storm: login throughput vs tail latency of a non-auth endpoint.
+
+Runs a high-concurrency login scenario and, at the same time, a
+low-concurrency probe scenario (default: /news) through the load_test
+harness, then reports both as JSON. With bcrypt on the bounded pool, excess
+logins get 429 quickly and the probe's p99 stays close to its idle value.
+
+Usage:
+    python scripts/bench_login_storm.py --base-url http://127.0.0.1:8000 \\
+        --login-concurrency 64 --probe live --duration 30 --output storm.json
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from load_test import SCENARIOS, Scenario, get_token, git_revision, run_scenario
+
+# Unmeasured probe requests sent before the idle baseline
+PROBE_WARMUP = 20
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--email', default='bench@example.com')
+    parser.add_argument('--password', default='bench-password')
+    parser.add_argument('--login-concurrency', type=int, default=64)
+    parser.add_argument('--probe', choices=[name for name in SCENARIOS if name != 'login'], default='news')
+    parser.add_argument('--probe-concurrency', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=30, help='seconds per phase')
+    parser.add_argument('--max-rps', type=float, default=2000,
+                        help='highest request rate planned for; a faster scenario runs out of requests early')
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write JSON results here (default: stdout)')
+    args = parser.parse_args()
+
+    credentials = {'email': args.email, 'password': args.password}
+    token = get_token(args.base_url, credentials)
+    anchor = datetime.strptime(datetime.utcnow().strftime('%Y-%m-%d'), '%Y-%m-%d')
+    # Enough requests to fill --duration at --max-rps, not an open-ended plan
+    count = int(args.duration * args.max_rps) + PROBE_WARMUP
+
+    def scenario(name: str) -> Scenario:
+        return Scenario(name, args.base_url, token, credentials, args.seed, anchor)
+
+    # Both plans are built before any phase starts, so no phase is timed
+    # while another thread is still generating requests
+    probe, login = scenario(args.probe), scenario('login')
+    probe_plan, login_plan = probe.requests_for(count), login.requests_for(count)
+
+    # Phase 1: probe alone, as the baseline
+    idle = run_scenario(
+        probe, args.probe_concurrency, count, args.duration, PROBE_WARMUP, args.timeout, planned=probe_plan
+    )
+
+    # Phase 2: probe while a login storm runs
+    results = {}
+    storm = threading.Thread(target=lambda: results.update(login=run_scenario(
+        login, args.login_concurrency, count, args.duration, 0, args.timeout, planned=login_plan
+    )))
+    storm.start()
+    results['probe'] = run_scenario(
+        probe, args.probe_concurrency, count, args.duration, 0, args.timeout, planned=probe_plan
+    )
+    storm.join()
+
+    report = {
+        'meta': {
+            'started_at': datetime.utcnow().isoformat() + 'Z',
+            'base_url': args.base_url,
+            'git_revision': git_revision(),
+            'login_concurrency': args.login_concurrency,
+            'probe': args.probe,
+            'probe_concurrency': args.probe_concurrency,
+            'duration': args.duration
+        },
+        'probe_idle': idle,
+        'probe_during_storm': results['probe'],
+        'login_storm': results['login']
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + '\n')
+    else:
+        print(output)
+
+    login = results['login']
+    print(f'login: {login["rps"]} rps, statuses {login["statuses"]}; '
+          f'{args.probe} p99 idle {idle["latency_ms"]["p99"]} ms -> storm {results["probe"]["latency_ms"]["p99"]} ms',
+          file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
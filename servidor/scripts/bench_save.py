@@ -0,0 +1,64 @@
+"""Compare /save (one event per request) with /save/batch throughput.
+
+Usage:
+    python scripts/bench_save.py --url http://localhost:8000 --token <jwt> --events 300
+"""
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+import requests
+
+def synthetic_events(count: int, prefix: str) -> list:
+    """Generate unique random earthquake payloads"""
+    now = datetime.utcnow()
+    return [
+        {
+            'id': f'{prefix}{i:07d}',
+            'place': 'Benchmark region',
+            'magnitude': round(random.uniform(2.5, 8.0), 1),
+            'depth': round(random.uniform(0, 700), 1),
+            'latitude': round(random.uniform(-90, 90), 4),
+            'longitude': round(random.uniform(-180, 180), 4),
+            'event_time': (now - timedelta(seconds=random.randint(0, 86400))).isoformat()
+        }
+        for i in range(count)
+    ]
+
+def bench_single(session: requests.Session, url: str, events: list) -> float:
+    started = time.perf_counter()
+    for event in events:
+        response = session.post(f'{url}/api/earthquakes/save', json=event)
+        if response.status_code not in (201, 409):
+            raise RuntimeError(f'/save failed: {response.status_code} {response.text}')
+    return time.perf_counter() - started
+
+def bench_batch(session: requests.Session, url: str, events: list) -> float:
+    started = time.perf_counter()
+    response = session.post(f'{url}/api/earthquakes/save/batch', json=events)
+    response.raise_for_status()
+    elapsed = time.perf_counter() - started
+    print(f"  batch summary: {response.json()['summary']}")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--token', required=True)
+    parser.add_argument('--events', type=int, default=300)
+    args = parser.parse_args()
+
+    session = requests.Session()
+    session.headers['Authorization'] = f'Bearer {args.token}'
+    run_id = uuid.uuid4().hex[:8]
+
+    single = bench_single(session, args.url, synthetic_events(args.events, f'bench-s-{run_id}-'))
+    batch = bench_batch(session, args.url, synthetic_events(args.events, f'bench-b-{run_id}-'))
+
+    print(f'/save        {args.events} events in {single:.3f}s ({args.events / single:.0f} events/s)')
+    print(f'/save/batch  {args.events} events in {batch:.3f}s ({args.events / batch:.0f} events/s)')
+    print(f'speedup      {single / batch:.1f}x')
+
+if __name__ == '__main__':
+    main()
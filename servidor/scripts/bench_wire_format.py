@@ -0,0 +1,97 @@
+"""Payload size and decode time: per-event JSON vs the columnar wire format.
+
+Decode time includes rebuilding per-event objects from the columns, which is
+what the map client does after parsing.
+
+Usage:
+    python scripts/bench_wire_format.py --events 10000 --repeat 10
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.usgs_feed import FeedColumns
+from app.services.wire_format import columns_payload, encode_columns, msgpack
+
+def synthetic_columns(count: int) -> FeedColumns:
+    now_ms = int(time.time() * 1000)
+    time_ms = np.sort(np.array([now_ms - random.randint(0, 7 * 86400000) for _ in range(count)], dtype=np.int64))[::-1]
+    return FeedColumns(
+        np.array([f'us{i:08d}' for i in range(count)], dtype=object),
+        np.array([f'{random.randint(1, 300)} km N of Somewhere' for _ in range(count)], dtype=object),
+        np.round(np.random.uniform(2.5, 8.0, count), 1),
+        np.round(np.random.uniform(0, 700, count), 3),
+        np.round(np.random.uniform(-90, 90, count), 4),
+        np.round(np.random.uniform(-180, 180, count), 4),
+        time_ms,
+        np.full(count, now_ms, dtype=np.int64)
+    )
+
+def decode_records(body: bytes) -> list:
+    return json.loads(body)
+
+def rebuild(payload: dict) -> list:
+    scale = payload['scale']
+    coordinates, magnitude, depth = scale['coordinates'], scale['magnitude'], scale['depth']
+    records = []
+    event_ms = 0
+    for index in range(payload['count']):
+        event_ms += payload['time'][index]
+        records.append({
+            'id': payload['id'][index],
+            'place': payload['place'][index],
+            'magnitude': payload['magnitude'][index] / magnitude,
+            'depth': payload['depth'][index] / depth,
+            'latitude': payload['latitude'][index] / coordinates,
+            'longitude': payload['longitude'][index] / coordinates,
+            'event_time': event_ms
+        })
+    return records
+
+def decode_columns(body: bytes) -> list:
+    return rebuild(json.loads(body))
+
+def decode_msgpack(body: bytes) -> list:
+    return rebuild(msgpack.unpackb(body))
+
+def timed(function, body: bytes, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(body)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    columns = synthetic_columns(args.events)
+    payload = columns_payload(columns)
+    assert len(rebuild(payload)) == len(columns)
+
+    bodies = [('records json', json.dumps(columns.to_records()).encode('utf-8'), decode_records)]
+    bodies.append(('columns json', encode_columns(columns, 'columns')[0], decode_columns))
+    if msgpack is not None:
+        bodies.append(('columns msgpack', encode_columns(columns, 'msgpack')[0], decode_msgpack))
+
+    timings = [timed(decode, body, args.repeat) for _, body, decode in bodies]
+    baseline_bytes, baseline_ms = len(bodies[0][1]), timings[0]
+    print(f'{args.events} events, median of {args.repeat} decodes')
+    print(f'{"format":<16}{"bytes":>10}{"gzip":>10}{"decode ms":>12}')
+    for (name, body, _), decode_ms in zip(bodies, timings):
+        print(f'{name:<16}{len(body):>10}{len(gzip.compress(body)):>10}{decode_ms:>12.1f}'
+              f'  ({baseline_bytes / len(body):.1f}x smaller, {baseline_ms / decode_ms:.1f}x decode)')
+
+if __name__ == '__main__':
+    main()
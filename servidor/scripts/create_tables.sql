@@ -17,19 +17,71 @@ CREATE TABLE users (
     created_at DATETIME DEFAULT GETDATE() NOT NULL
 );
 
--- Earthquakes table
+-- Monthly partitions on event_time from EARTHQUAKE_PARTITION_START through three months ahead
+-- (scripts/maintain_earthquakes.py keeps adding future months)
+DECLARE @boundary DATETIME = '2015-01-01';
+DECLARE @last DATETIME = DATEADD(MONTH, 3, DATEFROMPARTS(YEAR(GETDATE()), MONTH(GETDATE()), 1));
+DECLARE @values NVARCHAR(MAX) = N'';
+WHILE @boundary <= @last
+BEGIN
+    SET @values += CASE WHEN @values = N'' THEN N'' ELSE N', ' END + N'''' + CONVERT(NVARCHAR(10), @boundary, 23) + N'''';
+    SET @boundary = DATEADD(MONTH, 1, @boundary);
+END
+EXEC (N'CREATE PARTITION FUNCTION PF_earthquakes_month (DATETIME) AS RANGE RIGHT FOR VALUES (' + @values + N')');
+GO
+
+CREATE PARTITION SCHEME PS_earthquakes_month AS PARTITION PF_earthquakes_month ALL TO ([PRIMARY]);
+GO
+
+-- Earthquakes table (clustered on event_time across the monthly partitions)
 CREATE TABLE earthquakes (
-    id INT IDENTITY(1,1) PRIMARY KEY,
+    id INT IDENTITY(1,1) PRIMARY KEY NONCLUSTERED,
     place NVARCHAR(255) NOT NULL,
     magnitude FLOAT NOT NULL,
     depth FLOAT NOT NULL,
     latitude FLOAT NOT NULL,
     longitude FLOAT NOT NULL,
+    grid_cell INT NOT NULL,
     event_time DATETIME NOT NULL,
     source_id NVARCHAR(100) UNIQUE NOT NULL,
+    updated_at DATETIME,
     created_at DATETIME DEFAULT GETDATE() NOT NULL
 );
 
+-- Earthquake rollups (maintained by TR_earthquakes_rollup)
+CREATE TABLE earthquake_rollups (
+    day DATE NOT NULL,
+    region INT NOT NULL,
+    magnitude_bin INT NOT NULL,
+    depth_bin INT NOT NULL,
+    event_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, region, magnitude_bin, depth_bin)
+);
+
+-- Write counters used for ETags (maintained by TR_<table>_version)
+CREATE TABLE table_versions (
+    table_name NVARCHAR(64) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO table_versions (table_name, version) VALUES ('earthquakes', 0), ('news', 0), ('users', 0);
+
+-- Content-addressed uploads and how many rows reference them (see services/upload_store.py)
+CREATE TABLE stored_files (
+    path NVARCHAR(255) PRIMARY KEY,
+    ref_count INT NOT NULL DEFAULT 0,
+    released_at DATETIME
+);
+
+-- Refresh-token sessions: the jti column holds the only refresh token of each family still accepted
+CREATE TABLE refresh_tokens (
+    family NVARCHAR(36) PRIMARY KEY,
+    user_id INT NOT NULL,
+    jti NVARCHAR(36) NOT NULL,
+    expires_at DATETIME NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+CREATE INDEX ix_refresh_tokens_user_id ON refresh_tokens(user_id);
+
 -- News table
 CREATE TABLE news (
     id INT IDENTITY(1,1) PRIMARY KEY,
@@ -43,8 +95,69 @@ CREATE TABLE news (
 -- Create indexes for better performance
 CREATE INDEX IX_users_email ON users(email);
 CREATE INDEX IX_users_role ON users(role);
+CREATE INDEX IX_users_last_name ON users(last_name, first_name);
+CREATE INDEX IX_users_first_name ON users(first_name);
+CREATE INDEX IX_users_created_at ON users(created_at);
 CREATE INDEX IX_earthquakes_magnitude ON earthquakes(magnitude);
-CREATE INDEX IX_earthquakes_event_time ON earthquakes(event_time);
+CREATE CLUSTERED INDEX CIX_earthquakes_event_time ON earthquakes(event_time, id) ON PS_earthquakes_month(event_time);
 CREATE INDEX IX_earthquakes_source_id ON earthquakes(source_id);
+CREATE INDEX IX_earthquakes_updated_at ON earthquakes(updated_at);
+CREATE INDEX IX_earthquakes_grid_cell_event_time ON earthquakes(grid_cell, event_time) ON PS_earthquakes_month(event_time);
 CREATE INDEX IX_news_date_posted ON news(date_posted);
 CREATE INDEX IX_news_author_id ON news(author_id);
+GO
+
+-- Keep earthquake_rollups in step with earthquakes (see app/models/rollup.py)
+CREATE TRIGGER TR_earthquakes_rollup ON earthquakes AFTER INSERT, UPDATE, DELETE AS
+BEGIN
+    SET NOCOUNT ON;
+    -- Retention compaction deletes old events but keeps them counted here
+    IF CAST(SESSION_CONTEXT(N'earthquake_compaction') AS INT) = 1 RETURN;
+    MERGE earthquake_rollups WITH (HOLDLOCK) AS r
+    USING (
+        SELECT day, region, magnitude_bin, depth_bin, SUM(delta) AS delta
+        FROM (
+            SELECT CAST(i.event_time AS DATE) AS day, CAST((CASE WHEN i.latitude >= 90 THEN 17 WHEN i.latitude < -90 THEN 0 ELSE FLOOR((i.latitude + 90) / 10) END) * 36 + (CASE WHEN i.longitude >= 180 THEN 35 WHEN i.longitude < -180 THEN 0 ELSE FLOOR((i.longitude + 180) / 10) END) AS INT) AS region, CAST(FLOOR(i.magnitude * 10 + 0.5) AS INT) AS magnitude_bin, CASE WHEN i.depth < 10 THEN 0 WHEN i.depth < 20 THEN 1 WHEN i.depth < 35 THEN 2 WHEN i.depth < 70 THEN 3 WHEN i.depth < 150 THEN 4 WHEN i.depth < 300 THEN 5 WHEN i.depth < 500 THEN 6 WHEN i.depth < 700 THEN 7 ELSE 8 END AS depth_bin, 1 AS delta FROM inserted i
+            UNION ALL
+            SELECT CAST(d.event_time AS DATE) AS day, CAST((CASE WHEN d.latitude >= 90 THEN 17 WHEN d.latitude < -90 THEN 0 ELSE FLOOR((d.latitude + 90) / 10) END) * 36 + (CASE WHEN d.longitude >= 180 THEN 35 WHEN d.longitude < -180 THEN 0 ELSE FLOOR((d.longitude + 180) / 10) END) AS INT) AS region, CAST(FLOOR(d.magnitude * 10 + 0.5) AS INT) AS magnitude_bin, CASE WHEN d.depth < 10 THEN 0 WHEN d.depth < 20 THEN 1 WHEN d.depth < 35 THEN 2 WHEN d.depth < 70 THEN 3 WHEN d.depth < 150 THEN 4 WHEN d.depth < 300 THEN 5 WHEN d.depth < 500 THEN 6 WHEN d.depth < 700 THEN 7 ELSE 8 END AS depth_bin, -1 AS delta FROM deleted d
+        ) AS changes
+        GROUP BY day, region, magnitude_bin, depth_bin
+        HAVING SUM(delta) <> 0
+    ) AS c
+    ON r.day = c.day AND r.region = c.region AND r.magnitude_bin = c.magnitude_bin AND r.depth_bin = c.depth_bin
+    WHEN MATCHED THEN UPDATE SET event_count = r.event_count + c.delta
+    WHEN NOT MATCHED THEN INSERT (day, region, magnitude_bin, depth_bin, event_count)
+        VALUES (c.day, c.region, c.magnitude_bin, c.depth_bin, c.delta);
+END
+GO
+
+-- Bump table_versions on every write (see app/models/table_version.py)
+CREATE TRIGGER TR_earthquakes_version ON earthquakes AFTER INSERT, UPDATE, DELETE AS
+BEGIN
+    SET NOCOUNT ON;
+    MERGE table_versions WITH (HOLDLOCK) AS v
+    USING (SELECT 'earthquakes' AS table_name) AS t ON v.table_name = t.table_name
+    WHEN MATCHED THEN UPDATE SET version = v.version + 1
+    WHEN NOT MATCHED THEN INSERT (table_name, version) VALUES (t.table_name, 1);
+END
+GO
+
+CREATE TRIGGER TR_news_version ON news AFTER INSERT, UPDATE, DELETE AS
+BEGIN
+    SET NOCOUNT ON;
+    MERGE table_versions WITH (HOLDLOCK) AS v
+    USING (SELECT 'news' AS table_name) AS t ON v.table_name = t.table_name
+    WHEN MATCHED THEN UPDATE SET version = v.version + 1
+    WHEN NOT MATCHED THEN INSERT (table_name, version) VALUES (t.table_name, 1);
+END
+GO
+
+CREATE TRIGGER TR_users_version ON users AFTER INSERT, UPDATE, DELETE AS
+BEGIN
+    SET NOCOUNT ON;
+    MERGE table_versions WITH (HOLDLOCK) AS v
+    USING (SELECT 'users' AS table_name) AS t ON v.table_name = t.table_name
+    WHEN MATCHED THEN UPDATE SET version = v.version + 1
+    WHEN NOT MATCHED THEN INSERT (table_name, version) VALUES (t.table_name, 1);
+END
+GO
@@ -0,0 +1,68 @@
+"""Export filtered earthquake history to CSV, NDJSON or Parquet.
+
+Streams rows from the database configured in .env (SQLALCHEMY_DATABASE_URI)
+with a server-side cursor, so memory stays bounded for any table size.
+
+Usage:
+    python scripts/export_earthquakes.py --format parquet --output quakes.parquet \\
+        --start-date 2024-01-01 --end-date 2024-12-31 --min-magnitude 4.5
+    python scripts/export_earthquakes.py --format csv --compression gzip > quakes.csv.gz
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.db.session import SessionLocal
+from app.services.export import EXPORT_FORMATS, export_chunks, export_query
+
+class _CountingRows:
+    """Pass rows through while counting them for the throughput report"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.count = 0
+
+    def __iter__(self):
+        for row in self.rows:
+            self.count += 1
+            yield row
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+    parser.add_argument('--compression', help='gzip for csv/ndjson; zstd, snappy, gzip, brotli, lz4 or none for parquet')
+    parser.add_argument('--output', help='file to write (default: stdout)')
+    parser.add_argument('--start-date', dest='startDate')
+    parser.add_argument('--end-date', dest='endDate')
+    parser.add_argument('--min-magnitude', dest='minMagnitude')
+    parser.add_argument('--min-latitude', dest='minLatitude')
+    parser.add_argument('--max-latitude', dest='maxLatitude')
+    parser.add_argument('--min-longitude', dest='minLongitude')
+    parser.add_argument('--max-longitude', dest='maxLongitude')
+    args = parser.parse_args()
+
+    filters = {key: value for key, value in vars(args).items() if value is not None}
+    db = SessionLocal()
+    output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    started = time.perf_counter()
+
+    try:
+        rows = _CountingRows(export_query(db, filters))
+        written = 0
+        for chunk in export_chunks(rows, args.format, args.compression):
+            output.write(chunk)
+            written += len(chunk)
+    finally:
+        db.close()
+        if args.output:
+            output.close()
+
+    elapsed = time.perf_counter() - started
+    print(f'{rows.count} rows, {written / 1e6:.1f} MB in {elapsed:.1f}s '
+          f'({rows.count / elapsed if elapsed else 0:.0f} rows/s)', file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+"""Fixed-concurrency load test for the API with JSON results.
+
+Drives /live, /history, /save, /login and /news with a fixed number of
+workers for a fixed number of requests (or seconds) per scenario, and
+reports p50/p95/p99 latency and requests per second. Request parameters
+come from a seeded RNG, so two runs send the same sequence. Point the
+server at scripts/usgs_standin.py to take the real USGS out of the loop.
+
+Usage:
+    python scripts/load_test.py --base-url http://127.0.0.1:8000 \\
+        --email bench@example.com --password secret123 \\
+        --concurrency 16 --requests 2000 --output results.json
+    python scripts/load_test.py ... --compare baseline.json
+
+The bench user is registered on first use.
+"""
+import argparse
+import json
+import math
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import requests
+
+SCENARIOS = ('live', 'history', 'save', 'login', 'news')
+
+class Scenario:
+    """Builds the requests of one endpoint from a seeded RNG"""
+
+    def __init__(self, name: str, base_url: str, token: str, credentials: dict, seed: int, anchor: datetime):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.headers = {'Authorization': f'Bearer {token}', 'Accept-Encoding': 'gzip'}
+        self.credentials = credentials
+        self.seed = seed
+        self.anchor = anchor
+        # Saved ids must differ between runs or every repeat would hit the 409 path
+        self.run_id = f'{int(time.time()):x}'
+
+    def requests_for(self, count: int) -> list:
+        rng = random.Random(f'{self.seed}-{self.name}')
+        return [getattr(self, f'_{self.name}')(rng, index) for index in range(count)]
+
+    def _live(self, rng, index):
+        end = self.anchor - timedelta(days=rng.randint(0, 20))
+        south, west = rng.uniform(-60, 40), rng.uniform(-180, 140)
+        params = {
+            'minMagnitude': rng.choice((2.5, 4.0, 5.0)),
+            'startDate': (end - timedelta(days=7)).strftime('%Y-%m-%d'),
+            'endDate': end.strftime('%Y-%m-%d'),
+            'minLatitude': round(south, 2), 'maxLatitude': round(south + 20, 2),
+            'minLongitude': round(west, 2), 'maxLongitude': round(west + 40, 2),
+            'source': 'usgs'
+        }
+        return 'GET', f'{self.base_url}/api/earthquakes/live', {'params': params, 'headers': self.headers}
+
+    def _history(self, rng, index):
+        params = {'minMagnitude': rng.choice((2.5, 4.0, 5.0)), 'limit': rng.choice((100, 500, 1000))}
+        return 'GET', f'{self.base_url}/api/earthquakes/history', {'params': params, 'headers': self.headers}
+
+    def _save(self, rng, index):
+        payload = {
+            'id': f'bench-{self.run_id}-{index}',
+            'place': 'Load test',
+            'magnitude': round(rng.uniform(2.5, 7.5), 1),
+            'depth': round(rng.uniform(0, 300), 1),
+            'latitude': round(rng.uniform(-80, 80), 4),
+            'longitude': round(rng.uniform(-180, 180), 4),
+            'event_time': (self.anchor - timedelta(seconds=rng.randint(0, 86400 * 365))).isoformat()
+        }
+        return 'POST', f'{self.base_url}/api/earthquakes/save', {'json': payload, 'headers': self.headers}
+
+    def _login(self, rng, index):
+        return 'POST', f'{self.base_url}/api/auth/login', {'json': self.credentials}
+
+    def _news(self, rng, index):
+        return 'GET', f'{self.base_url}/api/news/', {'headers': {'Accept-Encoding': 'gzip'}}
+
+def percentile(samples: list, q: float) -> float:
+    """Nearest-rank percentile of sorted samples"""
+    if not samples:
+        return None
+    # Smallest value with at least q% of the samples at or below it
+    rank = max(1, math.ceil(q * len(samples) / 100))
+    return samples[min(rank, len(samples)) - 1]
+
+def run_scenario(scenario: Scenario, concurrency: int, count: int, duration: float, warmup: int, timeout: float,
+                 planned: list = None) -> dict:
+    """Send count requests (or until duration runs out); planned, if given, is a prebuilt requests_for(count)"""
+    if planned is None:
+        planned = scenario.requests_for(count)
+    local = threading.local()
+
+    def session() -> requests.Session:
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=1)
+            local.session.mount('http://', adapter)
+            local.session.mount('https://', adapter)
+        return local.session
+
+    def send(request) -> tuple:
+        method, url, kwargs = request
+        started = time.perf_counter()
+        try:
+            response = session().request(method, url, timeout=timeout, **kwargs)
+            status = response.status_code
+            size = len(response.content)
+        except requests.RequestException:
+            status, size = None, 0
+        return time.perf_counter() - started, status, size
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(send, planned[:warmup]))
+
+        deadline = time.perf_counter() + duration if duration else None
+        cursor = iter(planned[warmup:])
+        lock = threading.Lock()
+        results = []
+
+        def worker():
+            while deadline is None or time.perf_counter() < deadline:
+                with lock:
+                    request = next(cursor, None)
+                if request is None:
+                    return
+                results.append(send(request))
+
+        started = time.perf_counter()
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency * 1000 for latency, status, _ in results if status is not None and status < 400)
+    statuses = {}
+    for _, status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        'requests': len(results),
+        'errors': len(results) - len(latencies),
+        'statuses': statuses,
+        'elapsed_s': round(elapsed, 3),
+        'rps': round(len(results) / elapsed, 1) if elapsed else None,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50), 2) if latencies else None,
+            'p95': round(percentile(latencies, 95), 2) if latencies else None,
+            'p99': round(percentile(latencies, 99), 2) if latencies else None,
+            'mean': round(statistics.fmean(latencies), 2) if latencies else None,
+            'max': round(latencies[-1], 2) if latencies else None
+        },
+        'bytes_per_response': round(sum(size for _, _, size in results) / len(results)) if results else 0
+    }
+
+def get_token(base_url: str, credentials: dict) -> str:
+    response = requests.post(f'{base_url}/api/auth/login', json=credentials, timeout=30)
+    if response.status_code == 401:
+        requests.post(f'{base_url}/api/auth/register', data=dict(
+            credentials, first_name='Bench', last_name='User', date_of_birth='1990-01-01'
+        ), timeout=30).raise_for_status()
+        response = requests.post(f'{base_url}/api/auth/login', json=credentials, timeout=30)
+    response.raise_for_status()
+    return response.json()['access_token']
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+def compare(current: dict, baseline: dict):
+    print(f'\n{"scenario":<10}{"metric":<8}{"baseline":>12}{"current":>12}{"change":>10}')
+    for name, result in current['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        pairs = [('rps', previous['rps'], result['rps'])]
+        pairs += [(q, previous['latency_ms'][q], result['latency_ms'][q]) for q in ('p50', 'p95', 'p99')]
+        for metric, before, after in pairs:
+            change = f'{(after - before) / before * 100:+.1f}%' if before and after is not None else '-'
+            print(f'{name:<10}{metric:<8}{before if before is not None else "-":>12}'
+                  f'{after if after is not None else "-":>12}{change:>10}')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--email', default='bench@example.com')
+    parser.add_argument('--password', default='bench-password')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=1000, help='requests per scenario')
+    parser.add_argument('--duration', type=float, help='stop each scenario after this many seconds')
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--anchor-date', default=datetime.utcnow().strftime('%Y-%m-%d'),
+                        help='date the generated time windows end on (match the stand-in catalogue)')
+    parser.add_argument('--output', help='write JSON results here (default: stdout)')
+    parser.add_argument('--compare', help='previous JSON results to diff against')
+    args = parser.parse_args()
+
+    credentials = {'email': args.email, 'password': args.password}
+    token = get_token(args.base_url, credentials)
+
+    report = {
+        'meta': {
+            'started_at': datetime.utcnow().isoformat() + 'Z',
+            'base_url': args.base_url,
+            'git_revision': git_revision(),
+            'concurrency': args.concurrency,
+            'requests': args.requests,
+            'duration': args.duration,
+            'warmup': args.warmup,
+            'seed': args.seed,
+            'anchor_date': args.anchor_date
+        },
+        'scenarios': {}
+    }
+    for name in args.scenarios:
+        scenario = Scenario(name, args.base_url, token, credentials, args.seed,
+                            datetime.strptime(args.anchor_date, '%Y-%m-%d'))
+        result = run_scenario(scenario, args.concurrency, args.requests + args.warmup,
+                              args.duration, args.warmup, args.timeout)
+        report['scenarios'][name] = result
+        latency = result['latency_ms']
+        print(f'{name:<8} {result["rps"]:>8} rps  p50 {latency["p50"]} ms  p95 {latency["p95"]} ms  '
+              f'p99 {latency["p99"]} ms  errors {result["errors"]}', file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + '\n')
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as handle:
+            compare(report, json.load(handle))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""Earthquake archive maintenance: partitions and retention compaction.
+
+Adds monthly partitions ahead of incoming data and compacts events older
+than the retention window below a magnitude threshold. Compacted events are
+deleted from earthquakes but stay counted in earthquake_rollups, so /stats
+is unchanged. Also deletes expired login sessions from refresh_tokens.
+Run it daily (cron, SQL Agent or a Kubernetes CronJob).
+
+Usage:
+    python scripts/maintain_earthquakes.py                      # settings from .env
+    python scripts/maintain_earthquakes.py --retention-days 730 --max-magnitude 4.0
+    python scripts/maintain_earthquakes.py --dry-run
+    python scripts/maintain_earthquakes.py --partitions
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.refresh_tokens import purge_expired
+from app.services.retention import partition_stats, run_maintenance
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--retention-days', type=int, help='default: RETENTION_DAYS')
+    parser.add_argument('--max-magnitude', type=float, help='compact events below this (default: RETENTION_MAX_MAGNITUDE)')
+    parser.add_argument('--dry-run', action='store_true', help='only count what would be compacted')
+    parser.add_argument('--partitions', action='store_true', help='print rows per partition and exit')
+    args = parser.parse_args()
+
+    if args.partitions:
+        print(json.dumps(partition_stats(), indent=2))
+        return
+
+    started = time.perf_counter()
+    summary = run_maintenance(args.retention_days, args.max_magnitude, dry_run=args.dry_run)
+    if not args.dry_run:
+        summary['expired_sessions_purged'] = purge_expired()
+    summary['elapsed_s'] = round(time.perf_counter() - started, 2)
+    print(json.dumps(summary, indent=2))
+
+if __name__ == '__main__':
+    main()
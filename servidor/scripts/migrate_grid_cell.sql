@@ -0,0 +1,17 @@
+-- Add the spatial grid cell column to an existing earthquakes table.
+-- Cell id = FLOOR(latitude + 90) * 360 + FLOOR(longitude + 180) for 1-degree cells
+-- (must match GRID_CELL_DEGREES in app/utils/geo.py).
+
+ALTER TABLE earthquakes ADD grid_cell INT NULL;
+GO
+
+UPDATE earthquakes SET grid_cell =
+    (CASE WHEN latitude >= 90 THEN 179 WHEN latitude < -90 THEN 0 ELSE FLOOR(latitude + 90) END) * 360
+    + (CASE WHEN longitude >= 180 THEN 359 WHEN longitude < -180 THEN 0 ELSE FLOOR(longitude + 180) END);
+GO
+
+ALTER TABLE earthquakes ALTER COLUMN grid_cell INT NOT NULL;
+GO
+
+CREATE INDEX IX_earthquakes_grid_cell_event_time ON earthquakes(grid_cell, event_time);
+GO
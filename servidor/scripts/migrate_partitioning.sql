@@ -0,0 +1,62 @@
+-- Move an existing earthquakes table onto monthly event_time partitions and
+-- let retention compaction keep deleted events in earthquake_rollups.
+-- Run once, in a maintenance window (the table is rebuilt).
+
+-- Monthly partitions on event_time from EARTHQUAKE_PARTITION_START through three months ahead
+-- (scripts/maintain_earthquakes.py keeps adding future months)
+DECLARE @boundary DATETIME = '2015-01-01';
+DECLARE @last DATETIME = DATEADD(MONTH, 3, DATEFROMPARTS(YEAR(GETDATE()), MONTH(GETDATE()), 1));
+DECLARE @values NVARCHAR(MAX) = N'';
+WHILE @boundary <= @last
+BEGIN
+    SET @values += CASE WHEN @values = N'' THEN N'' ELSE N', ' END + N'''' + CONVERT(NVARCHAR(10), @boundary, 23) + N'''';
+    SET @boundary = DATEADD(MONTH, 1, @boundary);
+END
+EXEC (N'CREATE PARTITION FUNCTION PF_earthquakes_month (DATETIME) AS RANGE RIGHT FOR VALUES (' + @values + N')');
+GO
+
+CREATE PARTITION SCHEME PS_earthquakes_month AS PARTITION PF_earthquakes_month ALL TO ([PRIMARY]);
+GO
+
+-- The primary key becomes nonclustered; the clustered index moves to (event_time, id)
+DECLARE @pk SYSNAME = (
+    SELECT name FROM sys.key_constraints WHERE parent_object_id = OBJECT_ID('earthquakes') AND type = 'PK'
+);
+EXEC (N'ALTER TABLE earthquakes DROP CONSTRAINT ' + QUOTENAME(@pk));
+ALTER TABLE earthquakes ADD CONSTRAINT PK_earthquakes PRIMARY KEY NONCLUSTERED (id);
+GO
+
+CREATE CLUSTERED INDEX CIX_earthquakes_event_time ON earthquakes(event_time, id) ON PS_earthquakes_month(event_time);
+GO
+
+-- Redundant with the clustered index
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_earthquakes_event_time' AND object_id = OBJECT_ID('earthquakes'))
+    DROP INDEX IX_earthquakes_event_time ON earthquakes;
+GO
+
+CREATE INDEX IX_earthquakes_grid_cell_event_time ON earthquakes(grid_cell, event_time)
+    WITH (DROP_EXISTING = ON) ON PS_earthquakes_month(event_time);
+GO
+
+ALTER TRIGGER TR_earthquakes_rollup ON earthquakes AFTER INSERT, UPDATE, DELETE AS
+BEGIN
+    SET NOCOUNT ON;
+    -- Retention compaction deletes old events but keeps them counted here
+    IF CAST(SESSION_CONTEXT(N'earthquake_compaction') AS INT) = 1 RETURN;
+    MERGE earthquake_rollups WITH (HOLDLOCK) AS r
+    USING (
+        SELECT day, region, magnitude_bin, depth_bin, SUM(delta) AS delta
+        FROM (
+            SELECT CAST(i.event_time AS DATE) AS day, CAST((CASE WHEN i.latitude >= 90 THEN 17 WHEN i.latitude < -90 THEN 0 ELSE FLOOR((i.latitude + 90) / 10) END) * 36 + (CASE WHEN i.longitude >= 180 THEN 35 WHEN i.longitude < -180 THEN 0 ELSE FLOOR((i.longitude + 180) / 10) END) AS INT) AS region, CAST(FLOOR(i.magnitude * 10 + 0.5) AS INT) AS magnitude_bin, CASE WHEN i.depth < 10 THEN 0 WHEN i.depth < 20 THEN 1 WHEN i.depth < 35 THEN 2 WHEN i.depth < 70 THEN 3 WHEN i.depth < 150 THEN 4 WHEN i.depth < 300 THEN 5 WHEN i.depth < 500 THEN 6 WHEN i.depth < 700 THEN 7 ELSE 8 END AS depth_bin, 1 AS delta FROM inserted i
+            UNION ALL
+            SELECT CAST(d.event_time AS DATE) AS day, CAST((CASE WHEN d.latitude >= 90 THEN 17 WHEN d.latitude < -90 THEN 0 ELSE FLOOR((d.latitude + 90) / 10) END) * 36 + (CASE WHEN d.longitude >= 180 THEN 35 WHEN d.longitude < -180 THEN 0 ELSE FLOOR((d.longitude + 180) / 10) END) AS INT) AS region, CAST(FLOOR(d.magnitude * 10 + 0.5) AS INT) AS magnitude_bin, CASE WHEN d.depth < 10 THEN 0 WHEN d.depth < 20 THEN 1 WHEN d.depth < 35 THEN 2 WHEN d.depth < 70 THEN 3 WHEN d.depth < 150 THEN 4 WHEN d.depth < 300 THEN 5 WHEN d.depth < 500 THEN 6 WHEN d.depth < 700 THEN 7 ELSE 8 END AS depth_bin, -1 AS delta FROM deleted d
+        ) AS changes
+        GROUP BY day, region, magnitude_bin, depth_bin
+        HAVING SUM(delta) <> 0
+    ) AS c
+    ON r.day = c.day AND r.region = c.region AND r.magnitude_bin = c.magnitude_bin AND r.depth_bin = c.depth_bin
+    WHEN MATCHED THEN UPDATE SET event_count = r.event_count + c.delta
+    WHEN NOT MATCHED THEN INSERT (day, region, magnitude_bin, depth_bin, event_count)
+        VALUES (c.day, c.region, c.magnitude_bin, c.depth_bin, c.delta);
+END
+GO
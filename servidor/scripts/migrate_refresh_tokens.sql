@@ -0,0 +1,14 @@
+-- Add refresh_tokens (one row per login session) to an existing database.
+-- Run once; clients obtain refresh tokens at their next login.
+
+CREATE TABLE refresh_tokens (
+    family NVARCHAR(36) PRIMARY KEY,
+    user_id INT NOT NULL,
+    jti NVARCHAR(36) NOT NULL,
+    expires_at DATETIME NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+GO
+
+CREATE INDEX ix_refresh_tokens_user_id ON refresh_tokens(user_id);
+GO
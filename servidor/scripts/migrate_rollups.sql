@@ -0,0 +1,43 @@
+-- Add earthquake_rollups to an existing database and backfill it.
+-- Run once; afterwards TR_earthquakes_rollup keeps it up to date.
+
+CREATE TABLE earthquake_rollups (
+    day DATE NOT NULL,
+    region INT NOT NULL,
+    magnitude_bin INT NOT NULL,
+    depth_bin INT NOT NULL,
+    event_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, region, magnitude_bin, depth_bin)
+);
+GO
+
+CREATE TRIGGER TR_earthquakes_rollup ON earthquakes AFTER INSERT, UPDATE, DELETE AS
+BEGIN
+    SET NOCOUNT ON;
+    MERGE earthquake_rollups WITH (HOLDLOCK) AS r
+    USING (
+        SELECT day, region, magnitude_bin, depth_bin, SUM(delta) AS delta
+        FROM (
+            SELECT CAST(i.event_time AS DATE) AS day, CAST((CASE WHEN i.latitude >= 90 THEN 17 WHEN i.latitude < -90 THEN 0 ELSE FLOOR((i.latitude + 90) / 10) END) * 36 + (CASE WHEN i.longitude >= 180 THEN 35 WHEN i.longitude < -180 THEN 0 ELSE FLOOR((i.longitude + 180) / 10) END) AS INT) AS region, CAST(FLOOR(i.magnitude * 10 + 0.5) AS INT) AS magnitude_bin, CASE WHEN i.depth < 10 THEN 0 WHEN i.depth < 20 THEN 1 WHEN i.depth < 35 THEN 2 WHEN i.depth < 70 THEN 3 WHEN i.depth < 150 THEN 4 WHEN i.depth < 300 THEN 5 WHEN i.depth < 500 THEN 6 WHEN i.depth < 700 THEN 7 ELSE 8 END AS depth_bin, 1 AS delta FROM inserted i
+            UNION ALL
+            SELECT CAST(d.event_time AS DATE) AS day, CAST((CASE WHEN d.latitude >= 90 THEN 17 WHEN d.latitude < -90 THEN 0 ELSE FLOOR((d.latitude + 90) / 10) END) * 36 + (CASE WHEN d.longitude >= 180 THEN 35 WHEN d.longitude < -180 THEN 0 ELSE FLOOR((d.longitude + 180) / 10) END) AS INT) AS region, CAST(FLOOR(d.magnitude * 10 + 0.5) AS INT) AS magnitude_bin, CASE WHEN d.depth < 10 THEN 0 WHEN d.depth < 20 THEN 1 WHEN d.depth < 35 THEN 2 WHEN d.depth < 70 THEN 3 WHEN d.depth < 150 THEN 4 WHEN d.depth < 300 THEN 5 WHEN d.depth < 500 THEN 6 WHEN d.depth < 700 THEN 7 ELSE 8 END AS depth_bin, -1 AS delta FROM deleted d
+        ) AS changes
+        GROUP BY day, region, magnitude_bin, depth_bin
+        HAVING SUM(delta) <> 0
+    ) AS c
+    ON r.day = c.day AND r.region = c.region AND r.magnitude_bin = c.magnitude_bin AND r.depth_bin = c.depth_bin
+    WHEN MATCHED THEN UPDATE SET event_count = r.event_count + c.delta
+    WHEN NOT MATCHED THEN INSERT (day, region, magnitude_bin, depth_bin, event_count)
+        VALUES (c.day, c.region, c.magnitude_bin, c.depth_bin, c.delta);
+END
+GO
+
+-- Backfill from existing rows (same binning as the trigger)
+INSERT INTO earthquake_rollups (day, region, magnitude_bin, depth_bin, event_count)
+SELECT day, region, magnitude_bin, depth_bin, COUNT(*)
+FROM (
+    SELECT CAST(i.event_time AS DATE) AS day, CAST((CASE WHEN i.latitude >= 90 THEN 17 WHEN i.latitude < -90 THEN 0 ELSE FLOOR((i.latitude + 90) / 10) END) * 36 + (CASE WHEN i.longitude >= 180 THEN 35 WHEN i.longitude < -180 THEN 0 ELSE FLOOR((i.longitude + 180) / 10) END) AS INT) AS region, CAST(FLOOR(i.magnitude * 10 + 0.5) AS INT) AS magnitude_bin, CASE WHEN i.depth < 10 THEN 0 WHEN i.depth < 20 THEN 1 WHEN i.depth < 35 THEN 2 WHEN i.depth < 70 THEN 3 WHEN i.depth < 150 THEN 4 WHEN i.depth < 300 THEN 5 WHEN i.depth < 500 THEN 6 WHEN i.depth < 700 THEN 7 ELSE 8 END AS depth_bin
+    FROM earthquakes i
+) AS bins
+GROUP BY day, region, magnitude_bin, depth_bin;
+GO
@@ -0,0 +1,13 @@
+-- Add stored_files and count the references of photos uploaded before it existed.
+-- Run once; unreferenced files are then deleted by the upload collector.
+
+CREATE TABLE stored_files (
+    path NVARCHAR(255) PRIMARY KEY,
+    ref_count INT NOT NULL DEFAULT 0,
+    released_at DATETIME
+);
+GO
+
+INSERT INTO stored_files (path, ref_count)
+SELECT photo_path, COUNT(*) FROM users WHERE photo_path IS NOT NULL GROUP BY photo_path;
+GO
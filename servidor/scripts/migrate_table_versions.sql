@@ -0,0 +1,41 @@
+-- Add table_versions and its triggers to an existing database.
+-- Run once; the seed rows enable ETag/304 handling right away.
+
+CREATE TABLE table_versions (
+    table_name NVARCHAR(64) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+GO
+
+INSERT INTO table_versions (table_name, version) VALUES ('earthquakes', 1), ('news', 1), ('users', 1);
+GO
+
+CREATE TRIGGER TR_earthquakes_version ON earthquakes AFTER INSERT, UPDATE, DELETE AS
+BEGIN
+    SET NOCOUNT ON;
+    MERGE table_versions WITH (HOLDLOCK) AS v
+    USING (SELECT 'earthquakes' AS table_name) AS t ON v.table_name = t.table_name
+    WHEN MATCHED THEN UPDATE SET version = v.version + 1
+    WHEN NOT MATCHED THEN INSERT (table_name, version) VALUES (t.table_name, 1);
+END
+GO
+
+CREATE TRIGGER TR_news_version ON news AFTER INSERT, UPDATE, DELETE AS
+BEGIN
+    SET NOCOUNT ON;
+    MERGE table_versions WITH (HOLDLOCK) AS v
+    USING (SELECT 'news' AS table_name) AS t ON v.table_name = t.table_name
+    WHEN MATCHED THEN UPDATE SET version = v.version + 1
+    WHEN NOT MATCHED THEN INSERT (table_name, version) VALUES (t.table_name, 1);
+END
+GO
+
+CREATE TRIGGER TR_users_version ON users AFTER INSERT, UPDATE, DELETE AS
+BEGIN
+    SET NOCOUNT ON;
+    MERGE table_versions WITH (HOLDLOCK) AS v
+    USING (SELECT 'users' AS table_name) AS t ON v.table_name = t.table_name
+    WHEN MATCHED THEN UPDATE SET version = v.version + 1
+    WHEN NOT MATCHED THEN INSERT (table_name, version) VALUES (t.table_name, 1);
+END
+GO
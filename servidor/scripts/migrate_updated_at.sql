@@ -0,0 +1,8 @@
+-- Add the USGS 'updated' timestamp used by incremental ingestion to an existing earthquakes table.
+-- Rows stored before this stay NULL until the worker sees an update for them.
+
+ALTER TABLE earthquakes ADD updated_at DATETIME NULL;
+GO
+
+CREATE INDEX IX_earthquakes_updated_at ON earthquakes(updated_at);
+GO
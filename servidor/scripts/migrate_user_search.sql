@@ -0,0 +1,7 @@
+-- Indexes behind the paginated admin user search (prefix LIKE and sorting).
+-- Run once on existing databases; email is already indexed.
+
+CREATE INDEX IX_users_last_name ON users(last_name, first_name);
+CREATE INDEX IX_users_first_name ON users(first_name);
+CREATE INDEX IX_users_created_at ON users(created_at);
+GO
@@ -27,13 +27,14 @@ INSERT INTO news (title, content, author_id) VALUES
 );
 
 -- Insert sample earthquake data (optional - will be populated from USGS API)
-INSERT INTO earthquakes (place, magnitude, depth, latitude, longitude, event_time, source_id) VALUES
+INSERT INTO earthquakes (place, magnitude, depth, latitude, longitude, grid_cell, event_time, source_id) VALUES
 (
     'Pacific Ocean, near Japan',
     6.2,
     35.5,
     35.6762,
     139.6503,
+    45319,
     DATEADD(hour, -2, GETDATE()),
     'sample_earthquake_001'
 ),
@@ -43,6 +44,7 @@ INSERT INTO earthquakes (place, magnitude, depth, latitude, longitude, event_tim
     12.3,
     34.0522,
     -118.2437,
+    44701,
     DATEADD(hour, -5, GETDATE()),
     'sample_earthquake_002'
 );
@@ -0,0 +1,215 @@
+"""Offline stand-in for the USGS FDSN event service.
+
+Serves /fdsnws/event/1/query and /fdsnws/event/1/count from a synthetic
+(seeded, so repeatable) or recorded GeoJSON catalogue, with configurable
+latency and failure rate. Supports the parameters the server sends:
+starttime, endtime, updatedafter, minmagnitude, min/max latitude and
+longitude (maxlongitude > 180 for boxes across the date line), latitude/
+longitude/maxradiuskm, limit and orderby. Responses carry an ETag and
+honour If-None-Match.
+
+Usage:
+    python scripts/usgs_standin.py --events 50000 --days 30 --port 8081
+    python scripts/usgs_standin.py --recording feed.geojson --latency-ms 120 --jitter-ms 40
+
+Then start the server with
+    USGS_API_URL=http://127.0.0.1:8081/fdsnws/event/1/query
+"""
+import argparse
+import hashlib
+import json
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+class Catalogue:
+    """Events held as NumPy columns so every query is a vectorized mask"""
+
+    def __init__(self, features: list):
+        self.features = features
+        props = [feature['properties'] for feature in features]
+        coords = [feature['geometry']['coordinates'] for feature in features]
+        self.magnitude = np.array([prop['mag'] for prop in props], dtype=np.float64)
+        self.time_ms = np.array([prop['time'] for prop in props], dtype=np.int64)
+        self.updated_ms = np.array([prop.get('updated') or prop['time'] for prop in props], dtype=np.int64)
+        self.longitude = np.array([point[0] for point in coords], dtype=np.float64)
+        self.latitude = np.array([point[1] for point in coords], dtype=np.float64)
+        # Serialize once; responses are joined from pre-encoded features
+        self.encoded = [json.dumps(feature).encode('utf-8') for feature in features]
+        self.version = hashlib.sha1(b''.join(self.encoded[:1000])).hexdigest()[:12] + f'-{len(features)}'
+
+    @staticmethod
+    def synthetic(count: int, days: int, seed: int, anchor: datetime) -> 'Catalogue':
+        rng = random.Random(seed)
+        now_ms = int(anchor.replace(tzinfo=timezone.utc).timestamp() * 1000) + 86400000  # end of anchor day
+        features = []
+        for i in range(count):
+            event_ms = now_ms - rng.randint(0, days * 86400000)
+            features.append({
+                'type': 'Feature',
+                'id': f'sx{i:08d}',
+                'properties': {
+                    # Gutenberg-Richter-like magnitudes (b ~ 1) above M2.5
+                    'mag': round(min(2.5 + rng.expovariate(2.3), 9.0), 1),
+                    'place': f'{rng.randint(1, 300)} km {rng.choice("NSEW")} of Synthetic {i % 500}',
+                    'time': event_ms,
+                    'updated': event_ms + rng.randint(0, 3600000),
+                    'status': 'reviewed',
+                    'type': 'earthquake'
+                },
+                'geometry': {
+                    'type': 'Point',
+                    'coordinates': [
+                        round(rng.uniform(-180, 180), 4),
+                        round(rng.uniform(-80, 80), 4),
+                        round(rng.uniform(0, 700), 2)
+                    ]
+                }
+            })
+        return Catalogue(features)
+
+    @staticmethod
+    def recorded(path: str) -> 'Catalogue':
+        with open(path, 'rb') as handle:
+            data = json.load(handle)
+        return Catalogue([
+            feature for feature in data.get('features', [])
+            if feature.get('properties', {}).get('mag') is not None
+            and len((feature.get('geometry') or {}).get('coordinates') or ()) >= 3
+        ])
+
+    def select(self, query: dict) -> np.ndarray:
+        """Indices of events matching FDSN query parameters, newest first"""
+        mask = np.ones(len(self.features), dtype=bool)
+        if 'starttime' in query:
+            mask &= self.time_ms >= _epoch_ms(query['starttime'])
+        if 'endtime' in query:
+            mask &= self.time_ms <= _epoch_ms(query['endtime'])
+        if 'updatedafter' in query:
+            mask &= self.updated_ms > _epoch_ms(query['updatedafter'])
+        if 'minmagnitude' in query:
+            mask &= self.magnitude >= float(query['minmagnitude'])
+        if 'maxmagnitude' in query:
+            mask &= self.magnitude <= float(query['maxmagnitude'])
+        if 'minlatitude' in query:
+            mask &= self.latitude >= float(query['minlatitude'])
+        if 'maxlatitude' in query:
+            mask &= self.latitude <= float(query['maxlatitude'])
+        if 'minlongitude' in query or 'maxlongitude' in query:
+            west = float(query.get('minlongitude', -180))
+            east = float(query.get('maxlongitude', 180))
+            if east > 180:
+                mask &= (self.longitude >= west) | (self.longitude <= east - 360)
+            else:
+                mask &= (self.longitude >= west) & (self.longitude <= east)
+        if 'maxradiuskm' in query:
+            mask &= _haversine_km(
+                float(query['latitude']), float(query['longitude']), self.latitude, self.longitude
+            ) <= float(query['maxradiuskm'])
+
+        indices = np.flatnonzero(mask)
+        if query.get('orderby') == 'time-asc':
+            indices = indices[np.argsort(self.time_ms[indices], kind='stable')]
+        else:
+            indices = indices[np.argsort(-self.time_ms[indices], kind='stable')]
+        if 'limit' in query:
+            indices = indices[:int(query['limit'])]
+        return indices
+
+def _epoch_ms(value: str) -> int:
+    parsed = datetime.fromisoformat(value.replace('Z', ''))
+    return int(parsed.replace(tzinfo=parsed.tzinfo or timezone.utc).timestamp() * 1000)
+
+def _haversine_km(lat: float, lon: float, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+def make_handler(catalogue: Catalogue, options):
+    rng = random.Random(options.seed)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            if options.verbose:
+                super().log_message(format, *args)
+
+        def _send(self, status: int, body: bytes, headers: dict = None):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            delay = options.latency_ms + rng.uniform(-options.jitter_ms, options.jitter_ms)
+            time.sleep(max(0.0, delay) / 1000)
+
+            if options.error_rate and rng.random() < options.error_rate:
+                return self._send(503, b'Service temporarily unavailable', {'Content-Type': 'text/plain'})
+            if url.path not in ('/fdsnws/event/1/query', '/fdsnws/event/1/count'):
+                return self._send(404, b'Not found', {'Content-Type': 'text/plain'})
+
+            try:
+                indices = catalogue.select(query)
+            except (KeyError, ValueError) as e:
+                return self._send(400, f'Bad request: {e}'.encode('utf-8'), {'Content-Type': 'text/plain'})
+
+            if url.path.endswith('/count'):
+                body = json.dumps({'count': int(len(indices)), 'maxAllowed': options.max_events}).encode('utf-8')
+                return self._send(200, body, {'Content-Type': 'application/json'})
+
+            if len(indices) > options.max_events:
+                message = f'{len(indices)} matching events exceeds search limit of {options.max_events}'
+                return self._send(400, message.encode('utf-8'), {'Content-Type': 'text/plain'})
+
+            etag = '"%s"' % hashlib.sha1(f'{catalogue.version}|{sorted(query.items())}'.encode('utf-8')).hexdigest()
+            if self.headers.get('If-None-Match') == etag:
+                return self._send(304, b'', {'ETag': etag})
+
+            body = (b'{"type":"FeatureCollection","metadata":{"count":%d},"features":[' % len(indices)
+                    + b','.join(catalogue.encoded[index] for index in indices.tolist()) + b']}')
+            self._send(200, body, {'Content-Type': 'application/json', 'ETag': etag})
+
+    return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--recording', help='GeoJSON FeatureCollection to serve instead of synthetic events')
+    parser.add_argument('--events', type=int, default=20000)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--anchor-date', default=datetime.utcnow().strftime('%Y-%m-%d'),
+                        help='last day of the synthetic catalogue; fix it for byte-identical reruns')
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    parser.add_argument('--max-events', type=int, default=20000, help='per-request limit, like USGS')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    catalogue = Catalogue.recorded(args.recording) if args.recording else \
+        Catalogue.synthetic(args.events, args.days, args.seed, datetime.strptime(args.anchor_date, '%Y-%m-%d'))
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(catalogue, args))
+    print(f'USGS stand-in: {len(catalogue.features)} events on http://{args.host}:{args.port}/fdsnws/event/1/query',
+          file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
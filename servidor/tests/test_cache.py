@@ -0,0 +1,116 @@
+import threading
+import time
+import pytest
+from app.core import cache as cache_module
+from app.core.cache import TTLCache
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic for the cache module"""
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+    return now
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(ttl=10, max_entries=4)
+    cache.set('a', 1)
+    clock[0] += 9.9
+    assert cache.get('a') == 1
+    clock[0] += 0.1
+    assert cache.get('a', 'missing') == 'missing'
+    assert cache.stats()['entries'] == 0
+
+def test_expired_entry_is_reloaded(clock):
+    cache = TTLCache(ttl=10, max_entries=4)
+    calls = []
+    assert cache.get_or_load('a', lambda: calls.append(1) or len(calls)) == 1
+    assert cache.get_or_load('a', lambda: calls.append(1) or len(calls)) == 1
+    clock[0] += 10
+    assert cache.get_or_load('a', lambda: calls.append(1) or len(calls)) == 2
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(ttl=60, max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # 'b' is now the oldest
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache(ttl=60, max_entries=4)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'value'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load('k', loader))) for _ in range(8)]
+    threads[0].start()
+    assert started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    while cache.stats()['coalesced'] < 7:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results == ['value'] * 8
+    assert cache.get('k') == 'value'
+
+def test_loader_error_reaches_waiters_and_is_not_cached():
+    cache = TTLCache(ttl=60, max_entries=4)
+
+    def failing():
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError):
+        cache.get_or_load('k', failing)
+    assert cache.get_or_load('k', lambda: 'ok') == 'ok'
+
+def test_invalidate_drops_entries():
+    cache = TTLCache(ttl=60, max_entries=4)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.invalidate('a')
+    assert cache.get('a') is None
+    assert cache.get('b') == 2
+    cache.invalidate()
+    assert cache.get('b') is None
+
+def test_load_racing_an_invalidate_is_not_stored():
+    cache = TTLCache(ttl=60, max_entries=4)
+    started = threading.Event()
+    release = threading.Event()
+    version = ['old']
+
+    def slow_loader():
+        value = version[0]
+        started.set()
+        release.wait(5)
+        return value
+
+    results = []
+    thread = threading.Thread(target=lambda: results.append(cache.get_or_load('k', slow_loader)))
+    thread.start()
+    assert started.wait(5)
+
+    # A write lands while the old value is being loaded
+    version[0] = 'new'
+    cache.invalidate()
+    # Callers after the invalidate start their own load instead of joining the stale one
+    assert cache.get_or_load('k', lambda: version[0]) == 'new'
+
+    release.set()
+    thread.join(5)
+    assert results == ['old']
+    assert cache.get('k') == 'new'